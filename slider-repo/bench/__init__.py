@@ -0,0 +1,11 @@
+"""Compiler and runtime benchmarks; run from the repo root as `python -m bench.<name>`.
+
+- throughput: lex/parse/sema/irgen/opt lines/s, MB/s and peak RSS for 1k..1M-line
+  corpora, with saved baselines and a regression threshold
+- lex_throughput: lexer MB/s and tokens/s, against the replaced scanner (baseline_lexer)
+- frontend_memory: token and AST memory footprint
+- say_output: lines/s of JIT-ed programs printing literal, integer and float lines
+- array_kernels: GB/s of STREAM-style [f64] kernels with loop-guarded and per-access bounds checks
+- checksum: GB/s of the checksum32/64 intrinsics against a C reference, 1 KB..1 GB
+- acs_runtime: C micro-benchmarks of the ACS runtime (bench/acs/*.c): `select`, `pipe`, `sched`, `timers`
+"""
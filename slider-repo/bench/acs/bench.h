@@ -0,0 +1,27 @@
+/* Shared helpers for the ACS runtime benchmarks. */
+#pragma once
+#include <pthread.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <time.h>
+
+static inline long long bench_now_ns(void){
+    struct timespec ts; clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec*1000000000LL + ts.tv_nsec;
+}
+static inline void bench_spin_ns(long long ns){
+    long long end=bench_now_ns()+ns; while(bench_now_ns()<end) {}
+}
+static int bench_cmp_ll(const void* a, const void* b){
+    long long x=*(const long long*)a, y=*(const long long*)b; return (x>y)-(x<y);
+}
+/* p50/p99/max of n samples in nanoseconds, printed in microseconds */
+static inline void bench_report_latency(const char* name, int param, long long* ns, long long n){
+    if(n==0){ printf("%-10s %6d  no samples\n", name, param); return; }
+    qsort(ns, (size_t)n, sizeof(long long), bench_cmp_ll);
+    printf("%-10s %6d  latency us  p50 %8.2f  p99 %8.2f  max %9.2f  (n=%lld)\n", name, param,
+           ns[n/2]/1e3, ns[(n*99)/100]/1e3, ns[n-1]/1e3, n);
+}
+static inline void bench_report_rate(const char* name, int param, long long n, long long ns, const char* unit){
+    printf("%-10s %6d  %12.0f %s/s  (%lld in %.1f ms)\n", name, param, n*1e9/(double)ns, unit, n, ns/1e6);
+}
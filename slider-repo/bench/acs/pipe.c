@@ -0,0 +1,55 @@
+/* Producer/consumer channel throughput: single-value and batched send/recv,
+   one-to-one and four-to-four. Built and run by `python -m bench.acs_runtime pipe`. */
+#include "acs_v1.h"
+#include "bench.h"
+
+#define BATCH 64
+
+static long long msgs = 4000000;
+
+typedef struct { acs_chan_t* ch; long long count; int batch; long long sum; } end_t;
+
+static void* produce(void* p){
+    end_t* a=(end_t*)p; long long buf[BATCH];
+    if(a->batch==1){ for(long long k=0;k<a->count;k++) acs_send_i64(a->ch, k); return NULL; }
+    for(long long k=0;k<a->count;){
+        int n=(int)(a->count-k < a->batch ? a->count-k : a->batch);
+        for(int j=0;j<n;j++) buf[j]=k+j;
+        acs_send_i64_many(a->ch, buf, n); k+=n;
+    }
+    return NULL;
+}
+static void* consume(void* p){
+    end_t* a=(end_t*)p; long long buf[BATCH], sum=0;
+    for(;;){
+        int n=acs_recv_i64_many(a->ch, buf, a->batch, -1);
+        if(n<0) break;
+        for(int j=0;j<n;j++) sum+=buf[j];
+    }
+    a->sum=sum; return NULL;
+}
+
+static void run(int producers, int consumers, int batch){
+    acs_chan_t* ch=acs_chan_new(1024);
+    end_t pe[8], ce[8]; pthread_t pt[8], ct[8];
+    long long t0=bench_now_ns();
+    for(int i=0;i<consumers;i++){ ce[i]=(end_t){ch, 0, batch, 0}; pthread_create(&ct[i], NULL, consume, &ce[i]); }
+    for(int i=0;i<producers;i++){ pe[i]=(end_t){ch, msgs/producers, batch, 0}; pthread_create(&pt[i], NULL, produce, &pe[i]); }
+    for(int i=0;i<producers;i++) pthread_join(pt[i], NULL);
+    acs_close(ch);
+    long long sum=0;
+    for(int i=0;i<consumers;i++){ pthread_join(ct[i], NULL); sum+=ce[i].sum; }
+    long long t1=bench_now_ns();
+    long long per=msgs/producers, want=producers*(per*(per-1)/2);
+    char name[32]; snprintf(name, sizeof name, "%dp%dc/%d", producers, consumers, batch);
+    bench_report_rate(name, 1024, per*producers, t1-t0, "msgs");
+    if(sum!=want) printf("  checksum mismatch: %lld != %lld\n", sum, want);
+    acs_chan_free(ch);
+}
+
+int main(int argc, char** argv){
+    if(argc>1) msgs=atoll(argv[1]);
+    run(1, 1, 1); run(1, 1, BATCH);
+    run(4, 4, 1); run(4, 4, BATCH);
+    return 0;
+}
@@ -0,0 +1,67 @@
+/* Task spawn latency and throughput: the worker pool (acs_spawn) against a thread
+   per task (acs_spawn_thread), plus a recursive fan-out that exercises stealing
+   and nested joins. Built and run by `python -m bench.acs_runtime sched [tasks]`;
+   set ACS_WORKERS / ACS_PIN to vary the pool. */
+#include "acs_v1.h"
+#include "bench.h"
+#include <stdatomic.h>
+
+static long long tasks = 200000;
+static _Atomic long long hits;
+
+typedef struct { acs_wg_t* wg; long long t0; long long* lat; } probe_t;
+
+static void* tiny(void* p){ atomic_fetch_add_explicit(&hits, 1, memory_order_relaxed); acs_wg_done((acs_wg_t*)p); return NULL; }
+static void* probe(void* p){
+    probe_t* a=(probe_t*)p; *a->lat=bench_now_ns()-a->t0; acs_wg_done(a->wg); return NULL;
+}
+
+typedef int (*spawn_fn)(acs_task_fn, void*);
+
+static void throughput(const char* name, spawn_fn spawn, long long n){
+    acs_wg_t* wg=acs_wg_new(); atomic_store(&hits, 0);
+    long long t0=bench_now_ns();
+    acs_wg_add(wg, n);
+    for(long long k=0;k<n;k++) spawn(tiny, wg);
+    acs_wg_wait(wg, -1);
+    bench_report_rate(name, (int)n, atomic_load(&hits), bench_now_ns()-t0, "tasks");
+    acs_wg_free(wg);
+}
+static void latency(const char* name, spawn_fn spawn, long long n){
+    long long* lat=(long long*)malloc(sizeof(long long)*n);
+    acs_wg_t* wg=acs_wg_new();
+    for(long long k=0;k<n;k++){      /* one at a time, so each spawn finds the pool idle */
+        probe_t a={wg, 0, &lat[k]};
+        acs_wg_add(wg, 1); a.t0=bench_now_ns(); spawn(probe, &a);
+        acs_wg_wait(wg, -1);
+    }
+    bench_report_latency(name, (int)n, lat, n);
+    acs_wg_free(wg); free(lat);
+}
+
+typedef struct { int depth; long long* out; } tree_t;
+static void* tree(void* p){
+    tree_t* a=(tree_t*)p;
+    if(a->depth==0){ *a->out=1; return NULL; }
+    long long l=0, r=0; tree_t la={a->depth-1, &l}, ra={a->depth-1, &r};
+    acs_wg_t* wg=acs_wg_new();
+    acs_spawn_wg(wg, tree, &la); acs_spawn_wg(wg, tree, &ra);
+    acs_wg_wait(wg, -1); acs_wg_free(wg);
+    *a->out=l+r; return NULL;
+}
+
+int main(int argc, char** argv){
+    if(argc>1) tasks=atoll(argv[1]);
+    printf("pool: %d worker(s)\n", acs_sched_workers());
+    latency("spawn/pool", acs_spawn, 2000);
+    latency("spawn/thr", acs_spawn_thread, 2000);
+    throughput("tasks/pool", acs_spawn, tasks);
+    throughput("tasks/thr", acs_spawn_thread, tasks/10);
+    long long leaves=0; tree_t root={16, &leaves};
+    acs_wg_t* wg=acs_wg_new(); long long t0=bench_now_ns();
+    acs_spawn_wg(wg, tree, &root); acs_wg_wait(wg, -1);
+    bench_report_rate("tree/pool", 16, 2*leaves-1, bench_now_ns()-t0, "tasks");
+    if(leaves!=1<<16) printf("  tree mismatch: %lld leaves\n", leaves);
+    acs_wg_free(wg);
+    return 0;
+}
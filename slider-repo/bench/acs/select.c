@@ -0,0 +1,51 @@
+/* Group select wake-up latency and throughput over 1, 8 and 64 channels.
+   Built and run by `python -m bench.acs_runtime select`. */
+#include "acs_v1.h"
+#include "bench.h"
+
+static long long msgs = 20000;
+
+typedef struct { acs_chan_t** chans; int n; long long count; int spaced; } producer_t;
+
+static void* produce(void* p){
+    producer_t* a=(producer_t*)p;
+    for(long long k=0;k<a->count;k++){
+        if(a->spaced) bench_spin_ns(20000);    /* let the selector block between messages */
+        acs_send_i64(a->chans[k % a->n], bench_now_ns());
+    }
+    for(int i=0;i<a->n;i++) acs_close(a->chans[i]);
+    return NULL;
+}
+
+static void run(int n, int spaced){
+    acs_chan_t* chans[64]; acs_group_t* g=acs_group_new();
+    for(int i=0;i<n;i++){ chans[i]=acs_chan_new(1024); acs_group_add(g, chans[i]); }
+    producer_t a={chans, n, spaced ? msgs/10 : msgs, spaced};
+    long long* lat=(long long*)malloc(sizeof(long long)*a.count);
+    pthread_t th; long long t0=bench_now_ns();
+    pthread_create(&th, NULL, produce, &a);
+    long long got=0, waited=0;
+    for(;;){
+        long long r=acs_group_select_recv_i64_packed(g, 1000);
+        int st=acs_unpack_sel_status(r);
+        if(st==2) break;
+        if(st==1){ waited++; continue; }
+        lat[got++]=bench_now_ns()-acs_unpack_sel_value(r);
+    }
+    long long t1=bench_now_ns();
+    pthread_join(th, NULL);
+    if(spaced) bench_report_latency("select", n, lat, got);
+    else bench_report_rate("select", n, got, t1-t0, "msgs");
+    if(waited) printf("  (%lld select timeouts)\n", waited);
+    free(lat);
+    acs_group_free(g);
+    for(int i=0;i<n;i++) acs_chan_free(chans[i]);
+}
+
+int main(int argc, char** argv){
+    if(argc>1) msgs=atoll(argv[1]);
+    static const int sizes[]={1, 8, 64};
+    for(int k=0;k<3;k++) run(sizes[k], 1);
+    for(int k=0;k<3;k++) run(sizes[k], 0);
+    return 0;
+}
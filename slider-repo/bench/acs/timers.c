@@ -0,0 +1,50 @@
+/* Thread count and tick jitter with many active timers: N background timers
+   (period 10..100 ms) plus 64 probe timers selected through one group, whose
+   ticks are compared with their ideal deadlines. Built and run by
+   `python -m bench.acs_runtime timers [timers] [seconds]`. */
+#include "acs_v1.h"
+#include "bench.h"
+#include <string.h>
+
+#define PROBES 64
+#define PROBE_MS 50
+
+static int threads(void){
+    FILE* f=fopen("/proc/self/status", "r"); char line[256]; int n=-1;
+    if(!f) return -1;
+    while(fgets(line, sizeof line, f)) if(!strncmp(line, "Threads:", 8)) n=atoi(line+8);
+    fclose(f); return n;
+}
+
+int main(int argc, char** argv){
+    int ntimers = argc>1 ? atoi(argv[1]) : 10000;
+    int seconds = argc>2 ? atoi(argv[2]) : 2;
+    acs_chan_t** bg=(acs_chan_t**)malloc(sizeof(acs_chan_t*)*(size_t)ntimers);
+    long long t0=bench_now_ns();
+    for(int i=0;i<ntimers;i++) bg[i]=acs_timer_new(10 + i%91, 1);
+    printf("created %d timers in %.1f ms, threads: %d\n", ntimers, (bench_now_ns()-t0)/1e6, threads());
+
+    acs_group_t* g=acs_group_new(); acs_chan_t* probe[PROBES]; long long start[PROBES];
+    for(int i=0;i<PROBES;i++){ start[i]=bench_now_ns(); probe[i]=acs_timer_new(PROBE_MS, 1); acs_group_add(g, probe[i]); }
+    long long cap=(long long)PROBES*(seconds*1000/PROBE_MS+2), n=0;
+    long long* late=(long long*)malloc(sizeof(long long)*(size_t)cap);
+    long long end=bench_now_ns()+seconds*1000000000LL;
+    while(bench_now_ns()<end && n<cap){
+        long long r=acs_group_select_recv_i64_packed(g, 100);
+        if(acs_unpack_sel_status(r)) continue;
+        int i=acs_unpack_sel_index(r);
+        late[n++]=bench_now_ns()-(start[i]+acs_unpack_sel_value(r)*PROBE_MS*1000000LL);
+    }
+    bench_report_latency("tick late", ntimers, late, n);
+    printf("threads while running: %d\n", threads());
+
+    int stopped=0;
+    for(int i=0;i<PROBES;i++) stopped+=acs_timer_stop(probe[i]);
+    for(int i=0;i<ntimers;i++) stopped+=acs_timer_stop(bg[i]);
+    printf("stopped %d timers\n", stopped);
+    acs_group_free(g);
+    for(int i=0;i<PROBES;i++) acs_chan_free(probe[i]);
+    for(int i=0;i<ntimers;i++) acs_chan_free(bg[i]);
+    free(bg); free(late);
+    return 0;
+}
@@ -0,0 +1,38 @@
+"""ACS runtime micro-benchmarks: python -m bench.acs_runtime NAME [args...]
+
+Each NAME is a C program bench/acs/NAME.c linked statically against
+runtime/acs_v1.c, built with $CC (default cc) -O2 into build/bench/ and run
+with the remaining arguments. `--list` shows the available programs.
+"""
+import argparse, glob, os, subprocess, sys
+from sdrc.runtime import RUNTIME_DIR, RUNTIME_SRC, source_hash
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "acs")
+
+def available() -> list:
+    return sorted(os.path.splitext(os.path.basename(p))[0] for p in glob.glob(os.path.join(BENCH_DIR, "*.c")))
+
+def build(name: str, out_dir: str = "build/bench") -> str:
+    """Compile bench/acs/<name>.c with the runtime; rebuilt when either changes."""
+    src = os.path.join(BENCH_DIR, f"{name}.c")
+    out = os.path.join(out_dir, f"acs-{name}-{source_hash()}")
+    deps = [src, os.path.join(BENCH_DIR, "bench.h")]
+    if os.path.exists(out) and all(os.path.getmtime(d) <= os.path.getmtime(out) for d in deps): return out
+    os.makedirs(out_dir, exist_ok=True)
+    cc = os.environ.get("CC", "cc")
+    subprocess.run([cc, "-O2", f"-I{RUNTIME_DIR}", f"-I{BENCH_DIR}", src, RUNTIME_SRC, "-o", out, "-lpthread"], check=True)
+    return out
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.acs_runtime")
+    ap.add_argument("name", nargs="?", help="benchmark program (see --list)")
+    ap.add_argument("args", nargs=argparse.REMAINDER, help="arguments passed to the program")
+    ap.add_argument("--list", action="store_true", help="list the benchmark programs")
+    args = ap.parse_args(argv)
+    if args.list or not args.name:
+        print("\n".join(available())); return 0
+    if args.name not in available(): ap.error(f"unknown benchmark {args.name!r}; expected one of {', '.join(available())}")
+    return subprocess.run([build(args.name), *args.args]).returncode
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+"""Array kernel bandwidth: python -m bench.array_kernels [elements]
+
+JIT-compiles STREAM-style kernels over [f64](n) arrays (copy, scale, add, triad,
+a 3-point stencil and an i64 sum) and runs each with its bounds checks moved to loop guards
+(bounds.BoundsChecks, as `sdrc` does) and with a check on every access; reports
+GB/s of array traffic for both.
+"""
+import argparse, ctypes, sys, time
+import llvmlite.binding as llvm
+from sdrc.lexer import Lexer
+from sdrc.parser import Parser
+from sdrc.fold import ConstFolder
+from sdrc.typecheck import TypeChecker
+from sdrc.resolve import Resolver
+from sdrc.bounds import BoundsChecks
+from sdrc.irgen import IRGen
+from sdrc import jit
+
+# name -> (loop range, loop body, arrays streamed per element)
+KERNELS = {
+    "copy":    ("0..len(a)", "c[i] = a[i]", 2),
+    "scale":   ("0..len(a)", "b[i] = 3.0 * c[i]", 2),
+    "add":     ("0..len(a)", "c[i] = a[i] + b[i]", 3),
+    "triad":   ("0..len(a)", "a[i] = b[i] + 3.0 * c[i]", 3),
+    "stencil": ("1..len(a) - 1", "b[i] = a[i - 1] + a[i] + a[i + 1]", 2),
+    "sum":     ("0..len(a)", "s = s + x[i]", 1),
+}
+
+def source(reps: int) -> str:
+    # each length comes from its own extern call, so LLVM cannot relate them and
+    # prove the accesses in range by itself
+    out = ["fn main() -> i32:", "    let n = elements()",
+           "    let a = [f64](n)", "    let b = [f64](elements())", "    let c = [f64](elements())", "    let x = [i64](elements())",
+           "    var s = 0",
+           "    for i in 0..n:", "        a[i] = 1.0", "        b[i] = 2.0", "        x[i] = i"]
+    for name, (rng, body, _) in KERNELS.items():
+        out += [f"    let t_{name} = clock_ns()", f"    for r in 0..{reps}:", f"        for i in {rng}:", f"            {body}",
+                f"    record(t_{name}, clock_ns())"]
+    out += ["    say(s, a[n - 1], c[n - 1])", "    return 0"]
+    return "\n".join(out) + "\n"
+
+_times = []
+
+# externs of the generated program; undeclared, so Slider types them as returning i64
+@ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_int64, ctypes.c_int64)
+def _record(t0, t1): _times.append((t1 - t0) / 1e9); return 0
+
+@ctypes.CFUNCTYPE(ctypes.c_int64)
+def _clock_ns(): return time.perf_counter_ns()
+
+_n = 0
+@ctypes.CFUNCTYPE(ctypes.c_int64)
+def _elements(): return _n
+
+def run(n: int, reps: int, hoist: bool) -> list:
+    global _n
+    _n = n
+    mod = ConstFolder().run(TypeChecker().check(Parser(Lexer(source(reps)).lex()).parse()))
+    Resolver().run(mod)
+    if hoist: BoundsChecks().run(mod)
+    module = IRGen("bench_arrays").gen_module(mod)
+    for name, fn in (("record", _record), ("clock_ns", _clock_ns), ("elements", _elements)):
+        llvm.add_symbol(name, ctypes.cast(fn, ctypes.c_void_p).value)
+    _times.clear()
+    engine = jit.jit_compile(module)
+    jit.call_main(engine, module)
+    return list(_times)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.array_kernels")
+    ap.add_argument("elements", nargs="?", type=int, default=4_000_000)
+    ap.add_argument("--reps", type=int, default=20, help="passes over the arrays per kernel")
+    args = ap.parse_args(argv)
+    hoisted = run(args.elements, args.reps, True); checked = run(args.elements, args.reps, False)
+    print(f"{'kernel':<8} {'guards GB/s':>12} {'checked GB/s':>13}   ({args.elements} elements)")
+    for (name, (_, _, arrays)), th, tc in zip(KERNELS.items(), hoisted, checked):
+        traffic = 8 * arrays * args.elements * args.reps / 1e9
+        print(f"{name:<8} {traffic / th:12.2f} {traffic / tc:13.2f}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+/* C reference for the checksum32/64 intrinsics: the same slicing-by-8 CRC-32
+   (IEEE) and CRC-64/XZ, built as a shared library by `python -m bench.checksum`. */
+#include <stddef.h>
+#include <stdint.h>
+#include <string.h>
+
+static uint32_t t32[8][256];
+static uint64_t t64[8][256];
+
+void ref_init(void){
+    for(int i=0;i<256;i++){
+        uint32_t c=(uint32_t)i; uint64_t d=(uint64_t)i;
+        for(int k=0;k<8;k++){
+            c = c&1 ? (c>>1)^0xEDB88320u : c>>1;
+            d = d&1 ? (d>>1)^0xC96C5795D7870F42ull : d>>1;
+        }
+        t32[0][i]=c; t64[0][i]=d;
+    }
+    for(int k=1;k<8;k++) for(int i=0;i<256;i++){
+        t32[k][i]=(t32[k-1][i]>>8)^t32[0][t32[k-1][i]&0xFF];
+        t64[k][i]=(t64[k-1][i]>>8)^t64[0][t64[k-1][i]&0xFF];
+    }
+}
+
+static uint64_t word(const unsigned char* p){ uint64_t w; memcpy(&w, p, 8); return w; }  /* little-endian hosts */
+
+int64_t ref_crc32(const unsigned char* p, int64_t n){
+    uint32_t crc=0xFFFFFFFFu;
+    for(; n>=8; p+=8, n-=8){
+        uint64_t w=word(p)^crc;
+        crc=t32[7][w&0xFF]^t32[6][(w>>8)&0xFF]^t32[5][(w>>16)&0xFF]^t32[4][(w>>24)&0xFF]
+           ^t32[3][(w>>32)&0xFF]^t32[2][(w>>40)&0xFF]^t32[1][(w>>48)&0xFF]^t32[0][w>>56];
+    }
+    for(; n; p++, n--) crc=t32[0][(crc^*p)&0xFF]^(crc>>8);
+    return (int64_t)(crc^0xFFFFFFFFu);
+}
+
+int64_t ref_crc64(const unsigned char* p, int64_t n){
+    uint64_t crc=~0ull;
+    for(; n>=8; p+=8, n-=8){
+        uint64_t w=word(p)^crc;
+        crc=t64[7][w&0xFF]^t64[6][(w>>8)&0xFF]^t64[5][(w>>16)&0xFF]^t64[4][(w>>24)&0xFF]
+           ^t64[3][(w>>32)&0xFF]^t64[2][(w>>40)&0xFF]^t64[1][(w>>48)&0xFF]^t64[0][w>>56];
+    }
+    for(; n; p++, n--) crc=t64[0][(crc^*p)&0xFF]^(crc>>8);
+    return (int64_t)~crc;
+}
@@ -0,0 +1,86 @@
+"""checksum32/64 throughput: python -m bench.checksum [--max SIZE]
+
+JIT-compiles Slider functions that return `checksum32(p, n)` / `checksum64(p, n)`
+and times them on 1 KB .. --max (default 1 GB) buffers against the same
+slicing-by-8 in C (bench/c/checksum_ref.c, $CC -O2) and, for CRC-32, against
+Python's zlib.crc32. Results are checked against each other; GB/s is the best
+of --repeat passes over at least --min-bytes per size.
+"""
+import argparse, ctypes, hashlib, os, subprocess, sys, time, zlib
+from sdrc.lexer import Lexer
+from sdrc.parser import Parser
+from sdrc.typecheck import TypeChecker
+from sdrc.irgen import IRGen
+from sdrc import jit
+
+REF_SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "c", "checksum_ref.c")
+SRC = """fn crc32(p: ptr, n: i64) -> i64:
+    return checksum32(p, n)
+fn crc64(p: ptr, n: i64) -> i64:
+    return checksum64(p, n)
+"""
+FN = ctypes.CFUNCTYPE(ctypes.c_int64, ctypes.c_void_p, ctypes.c_int64)
+
+def build_ref(out_dir: str = "build/bench") -> ctypes.CDLL:
+    with open(REF_SRC, "rb") as f: h = hashlib.sha256(f.read()).hexdigest()[:16]
+    out = os.path.join(out_dir, f"checksum_ref-{h}.so")
+    if not os.path.exists(out):
+        os.makedirs(out_dir, exist_ok=True)
+        cc = os.environ.get("CC", "cc")
+        subprocess.run([cc, "-O2", "-shared", "-fPIC", REF_SRC, "-o", out], check=True)
+    lib = ctypes.CDLL(os.path.abspath(out)); lib.ref_init()
+    return lib
+
+def jit_fns():
+    module = IRGen("bench_checksum").gen_module(TypeChecker().check(Parser(Lexer(SRC).lex()).parse()))
+    engine = jit.jit_compile(module)
+    return engine, {name: FN(engine.get_function_address(name)) for name in ("crc32", "crc64")}
+
+def parse_size(s: str) -> int:
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    return int(s[:-1]) * units[s[-1].upper()] if s[-1].upper() in units else int(s)
+
+def label(n: int) -> str:
+    for u, k in (("G", 30), ("M", 20), ("K", 10)):
+        if n >= 1 << k: return f"{n >> k}{u}B"
+    return f"{n}B"
+
+def best(fn, reps: int, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(reps): fn()
+        times.append(time.perf_counter() - t0)
+    return min(times) / reps
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.checksum")
+    ap.add_argument("--max", type=parse_size, default=1 << 30, help="largest buffer (default 1G)")
+    ap.add_argument("--min-bytes", type=parse_size, default=256 << 20, help="bytes hashed per timed pass (default 256M)")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N passes")
+    args = ap.parse_args(argv)
+    ref = build_ref()
+    ref.ref_crc32.restype = ref.ref_crc64.restype = ctypes.c_int64
+    ref.ref_crc32.argtypes = ref.ref_crc64.argtypes = [ctypes.c_void_p, ctypes.c_int64]
+    _engine, sdr = jit_fns()
+    seed = os.urandom(1 << 20)
+    data = bytearray(seed * max(1, args.max // len(seed)) + seed[:args.max % len(seed)]) if args.max >= len(seed) else bytearray(seed[:args.max])
+    base = ctypes.addressof((ctypes.c_char * len(data)).from_buffer(data))
+    print(f"{'size':>6} {'crc32 sdr':>10} {'crc32 C':>10} {'zlib':>10} {'crc64 sdr':>10} {'crc64 C':>10}   (GB/s)")
+    size = 1 << 10
+    while size <= args.max:
+        view = memoryview(data)[:size]
+        want32 = zlib.crc32(view)
+        got = (sdr["crc32"](base, size), ref.ref_crc32(base, size), sdr["crc64"](base, size), ref.ref_crc64(base, size))
+        if got[0] != want32 or got[1] != want32 or got[2] != got[3]:
+            print(f"{label(size)}: checksum mismatch {got} (zlib {want32})"); return 1
+        reps = max(1, args.min_bytes // size)
+        rates = [size / best(f, reps, args.repeat) / 1e9 for f in (
+            lambda: sdr["crc32"](base, size), lambda: ref.ref_crc32(base, size), lambda: zlib.crc32(view),
+            lambda: sdr["crc64"](base, size), lambda: ref.ref_crc64(base, size))]
+        print(f"{label(size):>6} " + " ".join(f"{r:10.2f}" for r in rates))
+        size <<= 4 if size < 1 << 20 else 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
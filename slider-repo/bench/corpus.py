@@ -0,0 +1,94 @@
+import random
+
+DIGITS12 = "0123456789te"
+
+# statement mix per shape: (weight, kind); "mixed" blends them all
+SHAPES = {
+    "mixed":   ((50, "let"), (15, "for"), (15, "if"), (10, "sink"), (4, "nest"), (3, "long"), (3, "say")),
+    "flat":    ((50, "let"), (15, "for"), (15, "if"), (20, "sink")),
+    "nested":  ((30, "let"), (70, "nest")),
+    "longexpr": ((20, "let"), (80, "long")),
+    "b12":     ((100, "table"),),
+    "say":     ((30, "let"), (70, "say")),
+}
+
+def b12(rng: random.Random, width: int = 4) -> str:
+    # a leading t/e would lex as an identifier, so base-12 literals start with a decimal digit
+    return rng.choice("123456789") + "".join(rng.choice(DIGITS12) for _ in range(width - 1))
+
+def expr(rng: random.Random, names, depth: int = 2) -> str:
+    if depth == 0 or rng.random() < 0.3:
+        r = rng.random()
+        if r < 0.4 and names: return rng.choice(names)
+        if r < 0.7: return str(rng.randrange(1000))
+        return b12(rng) + ".b12"
+    op = rng.choice("+-*")
+    return f"{expr(rng, names, depth - 1)} {op} {expr(rng, names, depth - 1)}"
+
+def long_expr(rng: random.Random, names, terms: int) -> str:
+    out = [expr(rng, names, 0)]
+    for _ in range(terms - 1): out += [rng.choice("+-*"), expr(rng, names, 0)]
+    return " ".join(out)
+
+class _Func:
+    def __init__(self, rng, idx, shape, max_depth, expr_terms):
+        self.rng = rng; self.idx = idx; self.max_depth = max_depth; self.expr_terms = expr_terms
+        self.weights, self.kinds = zip(*SHAPES[shape])
+        self.names = ["a", "b"]; self.out = [f"fn f{idx}(a:i64, b:i64):"]
+
+    def let(self, pad, names, e=None):
+        name = f"v{len(self.names)}"
+        self.out.append(f"{pad}let {name}:i64 = {e or expr(self.rng, names)}"); self.names.append(name)
+
+    def stmt(self, pad, depth):
+        rng = self.rng; names = self.names
+        kind = rng.choices(self.kinds, self.weights)[0]
+        if kind == "let": self.let(pad, names)
+        elif kind == "for":
+            self.out.append(f"{pad}for i in 0..{rng.randrange(1, 64)}:")
+            self.out.append(f"{pad}    let {rng.choice(names)}:i64 = {expr(rng, names + ['i'])}")
+        elif kind == "if":
+            self.out.append(f"{pad}if {rng.choice(names)}:")
+            self.out.append(f"{pad}    let {rng.choice(names)}:i64 = {expr(rng, names)}")
+            self.out.append(f"{pad}else:")
+            self.out.append(f"{pad}    let {rng.choice(names)}:i64 = {expr(rng, names)}")
+        elif kind == "sink": self.out.append(f'{pad}ext_sink({rng.choice(names)}, "tick {self.idx}\\n")')
+        elif kind == "nest": self.nest(pad, depth, rng.randrange(2, self.max_depth + 1))
+        elif kind == "long": self.let(pad, names, long_expr(rng, names, rng.randrange(8, self.expr_terms + 1)))
+        elif kind == "table":
+            for _ in range(rng.randrange(4, 16)): self.let(pad, names, b12(rng, rng.randrange(2, 9)) + ".b12")
+        else:
+            args = ", ".join(rng.choice(names) for _ in range(rng.randrange(1, 4)))
+            self.out.append(f'{pad}say("f{self.idx}:", {args})')
+
+    def nest(self, pad, depth, levels):
+        """`levels` if/for blocks nested inside each other, a statement at every level."""
+        rng = self.rng
+        for k in range(levels):
+            inner = pad + "    " * (k + 1)
+            if rng.random() < 0.5: self.out.append(f"{inner[:-4]}if {rng.choice(self.names)}:")
+            else: self.out.append(f"{inner[:-4]}for i{depth + k} in 0..{rng.randrange(1, 16)}:")
+            self.out.append(f"{inner}let {rng.choice(self.names)}:i64 = {expr(rng, self.names)}")
+
+def gen_func(rng: random.Random, idx: int, body_lines: int, shape: str = "flat",
+             max_depth: int = 12, expr_terms: int = 64) -> list:
+    f = _Func(rng, idx, shape, max_depth, expr_terms)
+    while len(f.out) < body_lines: f.stmt("    ", 0)
+    f.out.append("")
+    return f.out
+
+def generate(lines: int, seed: int = 12, shape: str = "flat", max_depth: int = 12, expr_terms: int = 64) -> str:
+    """Return a synthetic .sdr module of roughly `lines` lines.
+
+    `shape` picks the statement mix (see SHAPES): "flat" lets/loops/ifs,
+    "nested" if/for chains up to `max_depth` deep, "longexpr" expressions of
+    up to `expr_terms` operands, "b12" base-12 literal tables, "say" output
+    calls, or "mixed" for all of them. Every shape type-checks and lowers.
+    """
+    if shape not in SHAPES: raise ValueError(f"unknown corpus shape {shape!r}; expected one of {', '.join(SHAPES)}")
+    rng = random.Random(seed)
+    out = ["package bench/corpus", "", "# synthetic corpus", ""]
+    idx = 0
+    while len(out) < lines:
+        out.extend(gen_func(rng, idx, rng.randrange(8, 40), shape, max_depth, expr_terms)); idx += 1
+    return "\n".join(out) + "\n"
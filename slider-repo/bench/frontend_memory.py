@@ -0,0 +1,38 @@
+"""Front-end memory footprint: python -m bench.frontend_memory [lines] [--max-peak-mb N]
+
+Reports tracemalloc peaks for the token list and for streaming lex+parse, and
+AST nodes per MB of peak; exits non-zero if a given peak limit is exceeded.
+"""
+import argparse, sys, tracemalloc
+from sdrc.lexer import Lexer
+from sdrc.parser import Parser
+from sdrc.stats import ast_kinds
+from .corpus import generate
+
+def peak_of(fn):
+    tracemalloc.start()
+    try:
+        result = fn(); _cur, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak / 2**20
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.frontend_memory")
+    ap.add_argument("lines", nargs="?", type=int, default=100_000)
+    ap.add_argument("--max-peak-mb", type=float, default=None, help="fail if the lex+parse peak exceeds this")
+    args = ap.parse_args(argv)
+    src = generate(args.lines)
+    toks, tok_peak = peak_of(lambda: Lexer(src).lex())
+    ntok = len(toks); del toks
+    mod, parse_peak = peak_of(lambda: Parser(Lexer(src).iter_tokens()).parse())
+    nodes = sum(ast_kinds(mod).values())
+    print(f"tokens: {ntok} in {tok_peak:.1f} MB peak ({ntok / tok_peak:.0f} tokens/MB)")
+    print(f"lex+parse: {nodes} AST nodes in {parse_peak:.1f} MB peak ({nodes / parse_peak:.0f} nodes/MB)")
+    if args.max_peak_mb is not None and parse_peak > args.max_peak_mb:
+        print(f"FAIL: peak {parse_peak:.1f} MB > {args.max_peak_mb} MB", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""Lexer throughput on a synthetic corpus: python -m bench.lex_throughput [lines]
+
+Times sdrc.lexer (streaming iter_tokens() and the lex() list) against the line
+scanner it replaced, pinned in bench/baseline_lexer.py, on the same source.
+"""
+import sys, time
+from sdrc.lexer import Lexer
+from .baseline_lexer import BaselineLexer
+from .corpus import generate
+
+SCANNERS = {
+    "baseline lex()": lambda src: len(BaselineLexer(src).lex()),
+    "lex()":          lambda src: len(Lexer(src).lex()),
+    "iter_tokens()":  lambda src: sum(1 for _ in Lexer(src).iter_tokens()),
+}
+
+def measure(src: str, scan, repeat: int = 5):
+    best = float("inf"); ntok = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ntok = scan(src)
+        best = min(best, time.perf_counter() - t0)
+    return ntok, best
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    lines = int(argv[0]) if argv else 100_000
+    src = generate(lines)
+    mb = len(src.encode("utf-8")) / 1e6
+    print(f"lex {lines} lines, {mb:.2f} MB")
+    base = None
+    for name, scan in SCANNERS.items():
+        ntok, secs = measure(src, scan)
+        base = base or secs
+        print(f"{name:<15} {ntok:>9} tokens {secs * 1e3:9.1f} ms {mb / secs:7.2f} MB/s "
+              f"{ntok / secs / 1e6:6.2f} Mtok/s  x{base / secs:.2f}")
+
+if __name__ == "__main__":
+    main()
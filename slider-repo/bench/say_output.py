@@ -0,0 +1,55 @@
+"""`say` output throughput: python -m bench.say_output [lines]
+
+JIT-compiles small programs that print `lines` lines each: all literals, a
+label plus integers, and floats; runs them with stdout sent to /dev/null (or
+--to a file) and reports lines/s and MB/s per program. say output goes through C's
+stdout, which `python -u` and PYTHONUNBUFFERED also make unbuffered, so run it
+without them.
+"""
+import argparse, os, sys, time
+from sdrc.lexer import Lexer
+from sdrc.parser import Parser
+from sdrc.fold import ConstFolder
+from sdrc.typecheck import TypeChecker
+from sdrc.irgen import IRGen
+from sdrc import jit
+
+PROGRAMS = {
+    "literal": 'say("Hail, Twelve!", 144, "gross")',
+    "ints":    'say("tick", i, i * 7, 0 - i)',
+    "floats":  'say("x", f64(i) / 8.0)',
+}
+
+def source(stmt: str, lines: int) -> str:
+    return f"fn main() -> i32:\n    for i in 0..{lines}:\n        {stmt}\n    return 0\n"
+
+def compile_src(src: str):
+    mod = ConstFolder().run(TypeChecker().check(Parser(Lexer(src).lex()).parse()))
+    return IRGen("bench_say").gen_module(mod)
+
+def run_to(module, path: str) -> float:
+    """Run `main` with fd 1 redirected to `path`; returns seconds."""
+    engine = jit.jit_compile(module)
+    sys.stdout.flush()
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644); saved = os.dup(1)
+    os.dup2(fd, 1); os.close(fd)
+    try:
+        t0 = time.perf_counter(); jit.call_main(engine, module); return time.perf_counter() - t0
+    finally:
+        os.dup2(saved, 1); os.close(saved)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.say_output")
+    ap.add_argument("lines", nargs="?", type=int, default=1_000_000)
+    ap.add_argument("--to", default=os.devnull, help="where program output goes (default: /dev/null)")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs")
+    args = ap.parse_args(argv)
+    for name, stmt in PROGRAMS.items():
+        module = compile_src(source(stmt, args.lines))
+        secs = min(run_to(module, args.to) for _ in range(args.repeat))
+        size = os.path.getsize(args.to) if args.to != os.devnull else None
+        mb = f"{size / 1e6 / secs:8.1f} MB/s" if size else ""
+        print(f"{name:<8} {args.lines} lines {secs * 1e3:9.1f} ms {args.lines / secs:14,.0f} lines/s {mb}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Compiler throughput across corpus sizes: python -m bench.throughput [options]
+
+Generates corpora of --sizes lines (1k..1M), compiles each in a fresh
+process through sdrc's own pipeline, and reports lines/s and MB/s per phase
+(lex, parse, sema = fold + typecheck + resolve + tailcall + bounds, irgen, opt = IR parse +
+-O2 passes) plus peak RSS. --save-baseline writes the numbers as JSON;
+--baseline compares against such a file and exits 1 if any phase got more
+than --threshold slower (or peak RSS that much larger).
+"""
+import argparse, json, os, platform, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from sdrc.lexer import Lexer
+from sdrc.parser import Parser
+from sdrc.fold import ConstFolder
+from sdrc.typecheck import TypeChecker
+from sdrc.resolve import Resolver
+from sdrc.tailcall import TailCalls
+from sdrc.bounds import BoundsChecks
+from sdrc.irgen import IRGen
+from sdrc.optimize import target_machine, parse, run_passes
+from sdrc.stats import Stats, _max_rss
+from .corpus import SHAPES, generate
+
+PHASES = ("lex", "parse", "sema", "irgen", "opt")
+
+def parse_size(s: str) -> int:
+    s = s.strip().lower(); mult = 1
+    if s[-1:] in ("k", "m"): mult = 1000 if s[-1] == "k" else 1_000_000; s = s[:-1]
+    return int(float(s) * mult)
+
+def compile_once(src: str, phases, opt_level: int) -> dict:
+    """Time one pass of the pipeline over `src`; returns {phase: seconds}."""
+    st = Stats(memory=False)
+    with st.phase("lex"): toks = Lexer(src).lex()
+    with st.phase("parse"): mod = Parser(toks).parse()
+    del toks
+    with st.phase("sema"):
+        TypeChecker().check(mod); mod = ConstFolder().run(mod); Resolver().run(mod)
+        TailCalls().run(mod); BoundsChecks().run(mod)
+    if "irgen" in phases or "opt" in phases:
+        with st.phase("irgen"): module = IRGen("bench").gen_module(mod)
+    if "opt" in phases:
+        tm = target_machine(opt_level)
+        with st.phase("opt"): run_passes(parse(module, tm), tm, opt_level)
+    return {name: secs for name, secs, *_mem in st.phases}
+
+def measure(job) -> dict:
+    """Run in a child process so each size gets its own peak RSS."""
+    lines, shape, seed, phases, opt_level, repeat = job
+    src = generate(lines, seed, shape)
+    best = {}
+    for _ in range(repeat):
+        for name, secs in compile_once(src, phases, opt_level).items():
+            best[name] = min(secs, best.get(name, secs))
+    nlines = src.count("\n"); mb = len(src.encode("utf-8")) / 1e6
+    return {"lines": nlines, "mb": mb,
+            "phases": {p: {"seconds": s, "lines_per_s": nlines / s, "mb_per_s": mb / s}
+                       for p, s in best.items() if p in phases},
+            "peak_rss_kb": _max_rss() // 1024}
+
+def run_suite(sizes, shape="mixed", seed=12, phases=PHASES, opt_level=2, repeat=3, opt_max_lines=100_000):
+    """Return {"<lines>": result} for every size; `opt` is skipped above opt_max_lines."""
+    results = {}
+    for lines in sizes:
+        ph = tuple(p for p in phases if p != "opt" or lines <= opt_max_lines)
+        with ProcessPoolExecutor(max_workers=1) as ex:
+            results[str(lines)] = ex.submit(measure, (lines, shape, seed, ph, opt_level, repeat)).result()
+    return results
+
+def compare(results: dict, baseline: dict, threshold: float):
+    """Regression messages for phases slower, or peaks larger, than baseline by more than threshold."""
+    out = []
+    for size, res in results.items():
+        base = baseline.get(size)
+        if base is None: continue
+        for p, m in res["phases"].items():
+            b = base["phases"].get(p)
+            if b is None: continue
+            if m["lines_per_s"] < b["lines_per_s"] * (1 - threshold):
+                out.append(f"{size} lines {p}: {m['lines_per_s']:,.0f} lines/s vs baseline {b['lines_per_s']:,.0f} "
+                           f"({m['lines_per_s'] / b['lines_per_s'] - 1:+.1%})")
+        if res["peak_rss_kb"] > base["peak_rss_kb"] * (1 + threshold):
+            out.append(f"{size} lines: peak RSS {res['peak_rss_kb']} KiB vs baseline {base['peak_rss_kb']} KiB")
+    return out
+
+def print_table(results: dict):
+    print(f"{'lines':>9} {'MB':>7} {'phase':<6} {'ms':>10} {'lines/s':>12} {'MB/s':>8} {'peak RSS':>12}")
+    for res in results.values():
+        for i, (p, m) in enumerate(res["phases"].items()):
+            head = f"{res['lines']:>9} {res['mb']:>7.2f}" if i == 0 else " " * 17
+            rss = f"{res['peak_rss_kb'] / 1024:>8.1f} MiB" if i == 0 else ""
+            print(f"{head} {p:<6} {m['seconds'] * 1e3:>10.1f} {m['lines_per_s']:>12,.0f} {m['mb_per_s']:>8.2f} {rss:>12}")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="bench.throughput")
+    ap.add_argument("--sizes", default="1k,10k,100k", help="comma-separated corpus sizes in lines, e.g. 1k,10k,100k,1m")
+    ap.add_argument("--shape", choices=tuple(SHAPES), default="mixed", help="corpus statement mix")
+    ap.add_argument("--seed", type=int, default=12)
+    ap.add_argument("--phases", default=",".join(PHASES), help=f"subset of {','.join(PHASES)}")
+    ap.add_argument("-O", "--opt-level", type=int, choices=range(4), default=2, metavar="{0,1,2,3}")
+    ap.add_argument("--opt-max-lines", type=int, default=100_000, help="skip the opt phase above this many lines")
+    ap.add_argument("--repeat", type=int, default=3, help="best of N runs per size")
+    ap.add_argument("--json", action="store_true", help="print results as JSON instead of a table")
+    ap.add_argument("--save-baseline", metavar="PATH", help="write results to PATH")
+    ap.add_argument("--baseline", metavar="PATH", help="compare against a saved baseline")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed regression as a fraction (default 0.10)")
+    args = ap.parse_args(argv)
+    phases = tuple(p.strip() for p in args.phases.split(","))
+    unknown = set(phases) - set(PHASES)
+    if unknown: ap.error(f"unknown phase(s): {', '.join(sorted(unknown))}")
+    results = run_suite([parse_size(s) for s in args.sizes.split(",")], args.shape, args.seed, phases,
+                        args.opt_level, args.repeat, args.opt_max_lines)
+    if args.json: json.dump(results, sys.stdout, indent=2); print()
+    else: print_table(results)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"shape": args.shape, "seed": args.seed, "opt_level": args.opt_level,
+                       "machine": platform.platform(), "python": platform.python_version(),
+                       "results": results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f: base = json.load(f)
+        if (base["shape"], base["seed"], base["opt_level"]) != (args.shape, args.seed, args.opt_level):
+            print("[bench] warning: baseline was recorded with a different shape/seed/opt level", file=sys.stderr)
+        regressions = compare(results, base["results"], args.threshold)
+        for r in regressions: print(f"[bench] regression: {r}", file=sys.stderr)
+        if regressions: return 1
+        print(f"[bench] no regressions beyond {args.threshold:.0%} against {args.baseline}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,68 +1,209 @@
+#define _GNU_SOURCE
 #include "acs_v1.h"
 #include <pthread.h>
+#include <sched.h>
+#include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
 #include <time.h>
 #include <stdint.h>
+#include <stdatomic.h>
 
-struct acs_chan { long long* buf; size_t cap, head, tail; int closed;
-    pthread_mutex_t mu; pthread_cond_t not_empty, not_full; };
-struct acs_group { acs_chan_t** chans; int n, cap; };
+/* Channels are bounded MPMC rings (Vyukov): each cell carries a sequence number
+   saying whether it is free for position `tail` or holds the value for position
+   `head`, so senders and receivers claim slots with one CAS and never lock while
+   the ring has room or data. The mutex and condvars are only for blocking on a
+   full or empty ring; a side that finds waiters registered wakes them. */
+typedef struct { _Atomic size_t seq; long long val; } acs_cell_t;
+struct acs_chan {
+    acs_cell_t* ring; size_t mask;
+    _Alignas(64) _Atomic size_t tail;       /* next position to fill */
+    _Alignas(64) _Atomic size_t head;       /* next position to drain */
+    _Alignas(64) _Atomic int closed, send_waiters, recv_waiters, ngroups;
+    pthread_mutex_t mu; pthread_cond_t not_empty, not_full;
+    acs_group_t** groups; int gcap;         /* groups to wake on send/close, under mu */
+    struct acs_timer* timer; };             /* the timer feeding this channel, under timers.mu */
+/* Selectors sleep on the group's condvar; channels bump `seq` and wake them when
+   data arrives or they close, so a select never polls. */
+struct acs_group { acs_chan_t** chans; int n, cap;
+    pthread_mutex_t mu; pthread_cond_t cv; unsigned long seq; _Atomic int waiters; _Atomic unsigned next; };
 
-static int timedwait_ms(pthread_cond_t* cv, pthread_mutex_t* mu, int timeout_ms){
-    if (timeout_ms < 0) return pthread_cond_wait(cv, mu);
-    struct timespec ts; clock_gettime(CLOCK_REALTIME, &ts);
+#define RELAXED memory_order_relaxed
+#define ACQUIRE memory_order_acquire
+#define RELEASE memory_order_release
+
+static void monotonic_cond_init(pthread_cond_t* cv){
+    pthread_condattr_t a; pthread_condattr_init(&a);
+    pthread_condattr_setclock(&a, CLOCK_MONOTONIC);
+    pthread_cond_init(cv, &a); pthread_condattr_destroy(&a);
+}
+static struct timespec deadline_ms(int timeout_ms){
+    struct timespec ts; clock_gettime(CLOCK_MONOTONIC, &ts);
     ts.tv_sec += timeout_ms/1000; ts.tv_nsec += (timeout_ms%1000)*1000000LL;
     if (ts.tv_nsec >= 1000000000L) { ts.tv_sec += 1; ts.tv_nsec -= 1000000000L; }
-    return pthread_cond_timedwait(cv, mu, &ts);
+    return ts;
+}
+/* wait on cv until the absolute deadline (none when timeout_ms < 0) */
+static int wait_until(pthread_cond_t* cv, pthread_mutex_t* mu, int timeout_ms, const struct timespec* dl){
+    return timeout_ms<0 ? pthread_cond_wait(cv, mu) : pthread_cond_timedwait(cv, mu, dl);
+}
+
+/* Claim up to n consecutive free cells and fill them; returns how many (0 = full). */
+static size_t ring_push(acs_chan_t* ch, const long long* v, size_t n){
+    size_t pos=atomic_load_explicit(&ch->tail, RELAXED);
+    for(;;){
+        size_t k=0;
+        while(k<n && atomic_load_explicit(&ch->ring[(pos+k)&ch->mask].seq, ACQUIRE)==pos+k) k++;
+        if(k==0){
+            intptr_t d=(intptr_t)atomic_load_explicit(&ch->ring[pos&ch->mask].seq, ACQUIRE)-(intptr_t)pos;
+            if(d<0) return 0;                           /* cell still holds an undrained value */
+            pos=atomic_load_explicit(&ch->tail, RELAXED);  /* another sender got there first */
+            continue;
+        }
+        if(atomic_compare_exchange_weak_explicit(&ch->tail, &pos, pos+k, RELAXED, RELAXED)){
+            for(size_t j=0;j<k;j++){
+                acs_cell_t* c=&ch->ring[(pos+j)&ch->mask];
+                c->val=v[j]; atomic_store_explicit(&c->seq, pos+j+1, RELEASE);
+            }
+            return k;
+        }
+    }
+}
+/* Claim up to n consecutive filled cells and drain them; returns how many (0 = empty). */
+static size_t ring_pop(acs_chan_t* ch, long long* out, size_t n){
+    size_t pos=atomic_load_explicit(&ch->head, RELAXED);
+    for(;;){
+        size_t k=0;
+        while(k<n && atomic_load_explicit(&ch->ring[(pos+k)&ch->mask].seq, ACQUIRE)==pos+k+1) k++;
+        if(k==0){
+            intptr_t d=(intptr_t)atomic_load_explicit(&ch->ring[pos&ch->mask].seq, ACQUIRE)-(intptr_t)(pos+1);
+            if(d<0) return 0;
+            pos=atomic_load_explicit(&ch->head, RELAXED);
+            continue;
+        }
+        if(atomic_compare_exchange_weak_explicit(&ch->head, &pos, pos+k, RELAXED, RELAXED)){
+            for(size_t j=0;j<k;j++){
+                acs_cell_t* c=&ch->ring[(pos+j)&ch->mask];
+                out[j]=c->val; atomic_store_explicit(&c->seq, pos+j+ch->mask+1, RELEASE);
+            }
+            return k;
+        }
+    }
+}
+static int ring_full(acs_chan_t* ch){
+    size_t pos=atomic_load_explicit(&ch->tail, RELAXED);
+    return (intptr_t)atomic_load_explicit(&ch->ring[pos&ch->mask].seq, ACQUIRE)-(intptr_t)pos < 0;
+}
+
+/* Wakers issue a seq_cst fence after their ring update and before calling these;
+   it pairs with the waiter's fence: either the waker sees the waiter registered,
+   or the waiter's re-check sees the update. */
+static void wake(acs_chan_t* ch, _Atomic int* waiters, pthread_cond_t* cv, int locked){
+    if(!atomic_load_explicit(waiters, RELAXED)) return;
+    if(!locked) pthread_mutex_lock(&ch->mu);
+    pthread_cond_broadcast(cv);
+    if(!locked) pthread_mutex_unlock(&ch->mu);
+}
+static void notify_groups(acs_chan_t* ch, int locked){
+    if(!atomic_load_explicit(&ch->ngroups, RELAXED)) return;
+    if(!locked) pthread_mutex_lock(&ch->mu);
+    for(int i=0;i<ch->ngroups;i++){
+        acs_group_t* g=ch->groups[i];
+        if(!atomic_load_explicit(&g->waiters, RELAXED)) continue;
+        pthread_mutex_lock(&g->mu); g->seq++;
+        pthread_cond_broadcast(&g->cv);
+        pthread_mutex_unlock(&g->mu);
+    }
+    if(!locked) pthread_mutex_unlock(&ch->mu);
 }
-static int is_full(acs_chan_t* ch){ return ((ch->head+1)%ch->cap)==ch->tail; }
-static int is_empty(acs_chan_t* ch){ return ch->head==ch->tail; }
 
 acs_chan_t* acs_chan_new(size_t capacity){
-    if (capacity<1) capacity=1;
-    acs_chan_t* ch=(acs_chan_t*)calloc(1,sizeof(*ch));
-    ch->buf=(long long*)malloc(sizeof(long long)*(capacity+1));
-    ch->cap=capacity+1; ch->head=ch->tail=0; ch->closed=0;
+    size_t cap=1;
+    while(cap<capacity) cap<<=1;
+    acs_chan_t* ch=(acs_chan_t*)aligned_alloc(64, (sizeof(*ch)+63)&~(size_t)63);
+    memset(ch, 0, sizeof(*ch));
+    ch->ring=(acs_cell_t*)malloc(sizeof(acs_cell_t)*cap); ch->mask=cap-1;
+    for(size_t i=0;i<cap;i++) atomic_init(&ch->ring[i].seq, i);
     pthread_mutex_init(&ch->mu,NULL);
-    pthread_cond_init(&ch->not_empty,NULL);
-    pthread_cond_init(&ch->not_full,NULL);
+    monotonic_cond_init(&ch->not_empty);
+    monotonic_cond_init(&ch->not_full);
     return ch;
 }
+static int timer_detach(acs_chan_t* ch);
 void acs_chan_free(acs_chan_t* ch){
     if(!ch) return;
+    timer_detach(ch);
     pthread_mutex_destroy(&ch->mu);
     pthread_cond_destroy(&ch->not_empty);
     pthread_cond_destroy(&ch->not_full);
-    free(ch->buf); free(ch);
+    free(ch->groups); free(ch->ring); free(ch);
 }
 void acs_close(acs_chan_t* ch){
-    pthread_mutex_lock(&ch->mu); ch->closed=1;
+    atomic_store(&ch->closed, 1);           /* seq_cst: also the waker's fence */
+    pthread_mutex_lock(&ch->mu);
     pthread_cond_broadcast(&ch->not_empty);
     pthread_cond_broadcast(&ch->not_full);
+    notify_groups(ch, 1);
     pthread_mutex_unlock(&ch->mu);
 }
-int acs_send_i64(acs_chan_t* ch, long long val){
+
+/* 1 = not full any more, 0 = closed */
+static int wait_not_full(acs_chan_t* ch){
     pthread_mutex_lock(&ch->mu);
-    while(!ch->closed && is_full(ch)) pthread_cond_wait(&ch->not_full,&ch->mu);
-    if(ch->closed){ pthread_mutex_unlock(&ch->mu); return -1; }
-    ch->buf[ch->head]=val; ch->head=(ch->head+1)%ch->cap;
-    pthread_cond_signal(&ch->not_empty);
+    atomic_fetch_add(&ch->send_waiters, 1); atomic_thread_fence(memory_order_seq_cst);
+    while(!atomic_load(&ch->closed) && ring_full(ch)) pthread_cond_wait(&ch->not_full, &ch->mu);
+    atomic_fetch_sub(&ch->send_waiters, 1);
     pthread_mutex_unlock(&ch->mu);
-    return 1;
+    return !atomic_load(&ch->closed);
 }
-int acs_recv_i64(acs_chan_t* ch, long long* out, int timeout_ms){
-    pthread_mutex_lock(&ch->mu);
-    while(!ch->closed && is_empty(ch)){
-        int r=timedwait_ms(&ch->not_empty,&ch->mu,timeout_ms);
-        if(timeout_ms>=0 && r!=0){ pthread_mutex_unlock(&ch->mu); return 0; }
+int acs_send_i64_many(acs_chan_t* ch, const long long* vals, int n){
+    int sent=0;
+    while(sent<n){
+        if(atomic_load_explicit(&ch->closed, RELAXED)) return sent ? sent : -1;
+        size_t k=ring_push(ch, vals+sent, (size_t)(n-sent));
+        if(k){
+            sent+=(int)k;
+            atomic_thread_fence(memory_order_seq_cst);
+            wake(ch, &ch->recv_waiters, &ch->not_empty, 0); notify_groups(ch, 0);
+        } else if(!wait_not_full(ch)) return sent ? sent : -1;
     }
-    if(is_empty(ch) && ch->closed){ pthread_mutex_unlock(&ch->mu); return -1; }
-    *out=ch->buf[ch->tail]; ch->tail=(ch->tail+1)%ch->cap;
-    pthread_cond_signal(&ch->not_full);
+    return sent;
+}
+int acs_send_i64(acs_chan_t* ch, long long val){
+    return acs_send_i64_many(ch, &val, 1);
+}
+
+/* count received, 0 = empty, -1 = closed and drained */
+static int try_recv(acs_chan_t* ch, long long* out, size_t max, int locked){
+    size_t k=ring_pop(ch, out, max);
+    if(!k && atomic_load(&ch->closed)){
+        k=ring_pop(ch, out, max);                  /* values sent before the close */
+        if(!k) return -1;
+    }
+    if(k){ atomic_thread_fence(memory_order_seq_cst); wake(ch, &ch->send_waiters, &ch->not_full, locked); }
+    return (int)k;
+}
+int acs_recv_i64_many(acs_chan_t* ch, long long* out, int max, int timeout_ms){
+    if(max<=0) return 0;
+    int r=try_recv(ch, out, (size_t)max, 0);
+    if(r!=0 || timeout_ms==0) return r;
+    struct timespec dl; if(timeout_ms>0) dl=deadline_ms(timeout_ms);
+    pthread_mutex_lock(&ch->mu);
+    atomic_fetch_add(&ch->recv_waiters, 1); atomic_thread_fence(memory_order_seq_cst);
+    int rc=0;
+    while((r=try_recv(ch, out, (size_t)max, 1))==0 && rc==0) rc=wait_until(&ch->not_empty, &ch->mu, timeout_ms, &dl);
+    atomic_fetch_sub(&ch->recv_waiters, 1);
     pthread_mutex_unlock(&ch->mu);
-    return 1;
+    return r;
 }
+int acs_recv_i64(acs_chan_t* ch, long long* out, int timeout_ms){
+    return acs_recv_i64_many(ch, out, 1, timeout_ms);
+}
+long long* acs_i64_buf_new(size_t n){ return (long long*)calloc(n ? n : 1, sizeof(long long)); }
+void acs_i64_buf_free(long long* buf){ free(buf); }
+long long acs_i64_buf_get(const long long* buf, size_t i){ return buf[i]; }
+void acs_i64_buf_set(long long* buf, size_t i, long long v){ buf[i]=v; }
+
 long long acs_recv_i64_packed(acs_chan_t* ch, int timeout_ms){
     long long v=0; int r = acs_recv_i64(ch,&v,timeout_ms);
     unsigned long long status = (r==1)?0ULL : (r==0?1ULL:2ULL);
@@ -78,37 +219,79 @@ long long acs_unpack_value(long long p){
 
 acs_group_t* acs_group_new(void){
     acs_group_t* g=(acs_group_t*)calloc(1,sizeof(*g));
-    g->cap=8; g->chans=(acs_chan_t**)calloc(g->cap,sizeof(acs_chan_t*)); return g;
+    g->cap=8; g->chans=(acs_chan_t**)calloc(g->cap,sizeof(acs_chan_t*));
+    pthread_mutex_init(&g->mu,NULL); monotonic_cond_init(&g->cv);
+    return g;
+}
+void acs_group_free(acs_group_t* g){
+    if(!g) return;
+    for(int i=0;i<g->n;i++){          /* unregister from every member channel */
+        acs_chan_t* ch=g->chans[i];
+        pthread_mutex_lock(&ch->mu);
+        for(int j=0;j<ch->ngroups;j++)
+            if(ch->groups[j]==g){ ch->groups[j]=ch->groups[atomic_fetch_sub(&ch->ngroups, 1)-1]; break; }
+        pthread_mutex_unlock(&ch->mu);
+    }
+    pthread_mutex_destroy(&g->mu); pthread_cond_destroy(&g->cv);
+    free(g->chans); free(g);
 }
-void acs_group_free(acs_group_t* g){ if(!g) return; free(g->chans); free(g); }
 int acs_group_add(acs_group_t* g, acs_chan_t* ch){
     if(g->n==g->cap){ g->cap*=2; g->chans=(acs_chan_t**)realloc(g->chans,sizeof(acs_chan_t*)*g->cap); }
+    pthread_mutex_lock(&ch->mu);
+    if(ch->ngroups==ch->gcap){
+        ch->gcap=ch->gcap?ch->gcap*2:2;
+        ch->groups=(acs_group_t**)realloc(ch->groups,sizeof(acs_group_t*)*ch->gcap);
+    }
+    ch->groups[ch->ngroups]=g; atomic_fetch_add(&ch->ngroups, 1);
+    pthread_mutex_unlock(&ch->mu);
     g->chans[g->n]=ch; return g->n++;
 }
 int acs_group_size(acs_group_t* g){ return g->n; }
 
+#define SEL_TIMEOUT ((long long)(1ULL<<62))
+#define SEL_CLOSED  ((long long)(2ULL<<62))
+static long long sel_pack(int i, long long v){
+    unsigned long long idx=(unsigned)i&0x3F, val=((unsigned long long)v)&((1ULL<<56)-1);
+    return (long long)((idx<<56)|val);
+}
+/* One non-blocking pass over the group starting at the round-robin cursor:
+   1 = received into *out (index in *ix), -1 = every channel closed and drained, 0 = nothing. */
+static int sel_scan(acs_group_t* g, int* ix, long long* out){
+    int n=g->n, allclosed=1;
+    unsigned start=atomic_load_explicit(&g->next, RELAXED);
+    for(int k=0;k<n;k++){
+        int i=(int)((start+k)%n);
+        int r=acs_recv_i64(g->chans[i], out, 0);
+        if(r==1){ atomic_store_explicit(&g->next, (unsigned)(i+1), RELAXED); *ix=i; return 1; }
+        if(r==0) allclosed=0;
+    }
+    return allclosed ? -1 : 0;
+}
 long long acs_group_select_recv_i64_packed(acs_group_t* g, int timeout_ms){
-    if(!g || g->n==0) return (long long)(1ULL<<62); // timeout
-    long long v;
-    for(int i=0;i<g->n;i++){
-        int r=acs_recv_i64(g->chans[i], &v, 0);
-        if(r==1){ unsigned long long st=0, idx=i&0x3F, val=((unsigned long long)v)&((1ULL<<56)-1);
-            return (long long)((st<<62)|(idx<<56)|val); }
-    }
-    if(timeout_ms==0) return (long long)(1ULL<<62);
-    const int step=1; int waited=0; int allclosed=0;
-    while(timeout_ms<0 || waited<timeout_ms){
-        allclosed=1;
-        for(int i=0;i<g->n;i++){
-            int r=acs_recv_i64(g->chans[i], &v, 1);
-            if(r==1){ unsigned long long st=0, idx=i&0x3F, val=((unsigned long long)v)&((1ULL<<56)-1);
-                return (long long)((st<<62)|(idx<<56)|val); }
-            else if(r==0){ allclosed=0; }
-        }
-        if(allclosed) return (long long)((2ULL<<62));
-        waited+=step;
+    if(!g || g->n==0) return SEL_TIMEOUT;
+    struct timespec dl; if(timeout_ms>0) dl=deadline_ms(timeout_ms);
+    int ix; long long v;
+    int r=sel_scan(g, &ix, &v);
+    if(r==1) return sel_pack(ix, v);
+    if(r<0) return SEL_CLOSED;
+    if(timeout_ms==0) return SEL_TIMEOUT;
+    /* register before re-scanning so a sender either sees us waiting (and bumps
+       seq under g->mu) or its value is visible to the scan */
+    pthread_mutex_lock(&g->mu);
+    atomic_fetch_add(&g->waiters, 1); atomic_thread_fence(memory_order_seq_cst);
+    int rc=0;
+    for(;;){
+        unsigned long seen=g->seq;
+        pthread_mutex_unlock(&g->mu);
+        r=sel_scan(g, &ix, &v);
+        pthread_mutex_lock(&g->mu);
+        if(r!=0 || rc!=0) break;        /* got one, all closed, or deadline passed after a last scan */
+        while(g->seq==seen && rc==0) rc=wait_until(&g->cv, &g->mu, timeout_ms, &dl);
     }
-    return (long long)(1ULL<<62);
+    atomic_fetch_sub(&g->waiters, 1);
+    pthread_mutex_unlock(&g->mu);
+    if(r==1) return sel_pack(ix, v);
+    return r<0 ? SEL_CLOSED : SEL_TIMEOUT;
 }
 int acs_unpack_sel_status(long long p){ return (int)(((unsigned long long)p)>>62); }
 int acs_unpack_sel_index(long long p){ return (int)((((unsigned long long)p)>>56)&0x3F); }
@@ -118,26 +301,364 @@ long long acs_unpack_sel_value(long long p){
     return (long long)uv;
 }
 
-struct timer_args { acs_chan_t* out; int period_ms; int repeat; };
-static void* timer_thread(void* vp){
-    struct timer_args* a=(struct timer_args*)vp; long long tick=0;
-    do{
-        struct timespec ts = { a->period_ms/1000, (a->period_ms%1000)*1000000L };
-        nanosleep(&ts,NULL);
-        acs_send_i64(a->out, ++tick);
-    } while(a->repeat);
-    acs_close(a->out); free(a); return NULL;
+/* ---- timers -----------------------------------------------------------------
+   One thread drives every timer channel from a min-heap of absolute
+   CLOCK_MONOTONIC deadlines. Repeating timers advance by whole periods from their
+   start, so ticks do not drift; a tick carries the number of periods elapsed, and
+   one that finds its channel full is dropped rather than stalling the other timers. */
+typedef struct acs_timer { long long start, deadline, period; int repeat; size_t slot; acs_chan_t* ch; } acs_timer_t;
+
+static struct {
+    pthread_mutex_t mu; pthread_cond_t cv; int started;
+    acs_timer_t** heap; size_t n, cap;
+} T = { .mu=PTHREAD_MUTEX_INITIALIZER };
+
+static long long mono_ns(void){
+    struct timespec ts; clock_gettime(CLOCK_MONOTONIC, &ts);
+    return ts.tv_sec*1000000000LL + ts.tv_nsec;
+}
+static int heap_less(size_t i, size_t j){ return T.heap[i]->deadline < T.heap[j]->deadline; }
+static void heap_swap(size_t i, size_t j){
+    acs_timer_t* t=T.heap[i]; T.heap[i]=T.heap[j]; T.heap[j]=t;
+    T.heap[i]->slot=i; T.heap[j]->slot=j;
+}
+static void heap_up(size_t i){
+    while(i && heap_less(i, (i-1)/2)){ heap_swap(i, (i-1)/2); i=(i-1)/2; }
+}
+static void heap_down(size_t i){
+    for(;;){
+        size_t l=2*i+1, m=i;
+        if(l<T.n && heap_less(l, m)) m=l;
+        if(l+1<T.n && heap_less(l+1, m)) m=l+1;
+        if(m==i) return;
+        heap_swap(i, m); i=m;
+    }
+}
+static void heap_remove(acs_timer_t* t){
+    size_t i=t->slot;
+    if(i!=--T.n){ heap_swap(i, T.n); heap_up(i); heap_down(i); }
+}
+/* non-blocking send: 1 sent, 0 full, -1 closed */
+static int try_send(acs_chan_t* ch, long long v){
+    if(atomic_load_explicit(&ch->closed, RELAXED)) return -1;
+    if(!ring_push(ch, &v, 1)) return 0;
+    atomic_thread_fence(memory_order_seq_cst);
+    wake(ch, &ch->recv_waiters, &ch->not_empty, 0); notify_groups(ch, 0);
+    return 1;
+}
+static void* timer_main(void* unused){
+    (void)unused;
+    pthread_mutex_lock(&T.mu);
+    for(;;){
+        if(!T.n){ pthread_cond_wait(&T.cv, &T.mu); continue; }
+        acs_timer_t* t=T.heap[0];
+        long long now=mono_ns();
+        if(t->deadline > now){
+            struct timespec ts={ t->deadline/1000000000LL, t->deadline%1000000000LL };
+            pthread_cond_timedwait(&T.cv, &T.mu, &ts);
+            continue;                   /* the earliest timer may have changed */
+        }
+        if(!t->repeat){
+            try_send(t->ch, 1);
+            heap_remove(t); t->ch->timer=NULL;
+            acs_close(t->ch); free(t);
+            continue;
+        }
+        long long k=(now - t->start)/t->period;     /* latest tick due; skips ticks when running late */
+        try_send(t->ch, k);
+        t->deadline=t->start + (k+1)*t->period;
+        heap_down(0);
+    }
+    return NULL;
 }
 acs_chan_t* acs_timer_new(int period_ms, int repeat){
-    pthread_t t; acs_chan_t* ch=acs_chan_new(8);
-    struct timer_args* a=(struct timer_args*)malloc(sizeof(*a));
-    a->out=ch; a->period_ms=period_ms; a->repeat=repeat;
-    pthread_create(&t,NULL,timer_thread,a); pthread_detach(t); return ch;
+    acs_chan_t* ch=acs_chan_new(8);
+    acs_timer_t* t=(acs_timer_t*)malloc(sizeof(*t));
+    t->period=(long long)(period_ms>0 ? period_ms : (repeat ? 1 : 0))*1000000LL;
+    t->start=mono_ns(); t->deadline=t->start+t->period; t->repeat=repeat; t->ch=ch;
+    pthread_mutex_lock(&T.mu);
+    if(!T.started){
+        pthread_condattr_t a; pthread_condattr_init(&a);
+        pthread_condattr_setclock(&a, CLOCK_MONOTONIC);
+        pthread_cond_init(&T.cv, &a); pthread_condattr_destroy(&a);
+        pthread_t th; pthread_create(&th, NULL, timer_main, NULL); pthread_detach(th);
+        T.started=1;
+    }
+    if(T.n==T.cap){ T.cap=T.cap ? T.cap*2 : 64; T.heap=(acs_timer_t**)realloc(T.heap, sizeof(acs_timer_t*)*T.cap); }
+    t->slot=T.n; T.heap[T.n++]=t; ch->timer=t;
+    heap_up(t->slot);
+    if(t->slot==0) pthread_cond_signal(&T.cv);      /* new earliest deadline */
+    pthread_mutex_unlock(&T.mu);
+    return ch;
+}
+/* 1 if a pending timer was removed */
+static int timer_detach(acs_chan_t* ch){
+    pthread_mutex_lock(&T.mu);
+    acs_timer_t* t=ch->timer;
+    if(t){ heap_remove(t); ch->timer=NULL; free(t); }
+    pthread_mutex_unlock(&T.mu);
+    return t!=NULL;
+}
+int acs_timer_stop(acs_chan_t* ch){
+    if(!timer_detach(ch)) return 0;
+    acs_close(ch);
+    return 1;
 }
 void acs_sleep_ms(int ms){
     struct timespec ts={ ms/1000, (ms%1000)*1000000L }; nanosleep(&ts,NULL);
 }
 
-int acs_spawn(void* (*fn)(void*), void* arg){
-    pthread_t t; return pthread_create(&t, NULL, fn, arg);
+/* ---- task scheduler --------------------------------------------------------
+   acs_spawn runs tasks on a fixed pool of workers. Each worker owns a
+   Chase-Lev deque: it pushes and pops its own end (LIFO, cache-warm) while idle
+   workers steal from the other end. Tasks spawned from outside the pool go to a
+   shared injection queue. Workers with nothing to run sleep on one condvar. */
+typedef struct acs_task { acs_task_fn fn; void* arg; acs_wg_t* wg; struct acs_task* next; } acs_task_t;
+typedef struct dq_array { long size; struct dq_array* prev; _Atomic(acs_task_t*) buf[]; } dq_array_t;
+typedef struct { _Alignas(64) _Atomic long top; _Alignas(64) _Atomic long bottom; _Atomic(dq_array_t*) array; } deque_t;
+typedef struct acs_worker { deque_t q; pthread_t th; int id; unsigned rng; } acs_worker_t;
+
+struct acs_wg { _Atomic long long count; pthread_mutex_t mu; pthread_cond_t cv; };
+
+static struct {
+    int n, pin; _Atomic int started;         /* n and pin are fixed once started is set */
+    acs_worker_t* w;
+    pthread_mutex_t mu; pthread_cond_t cv;      /* idle workers; mu also guards the injection queue */
+    acs_task_t *ihead, *itail;
+    _Atomic long injected; _Atomic int idle;
+} S = { .mu=PTHREAD_MUTEX_INITIALIZER, .cv=PTHREAD_COND_INITIALIZER };
+static _Thread_local acs_worker_t* self;
+
+static dq_array_t* dq_array_new(long size){
+    dq_array_t* a=(dq_array_t*)calloc(1, sizeof(*a)+sizeof(acs_task_t*)*(size_t)size);
+    a->size=size; return a;
+}
+static void dq_push(deque_t* q, acs_task_t* t){
+    long b=atomic_load_explicit(&q->bottom, RELAXED), top=atomic_load_explicit(&q->top, ACQUIRE);
+    dq_array_t* a=atomic_load_explicit(&q->array, RELAXED);
+    if(b-top > a->size-1){                      /* full: double, keeping the old array for thieves */
+        dq_array_t* na=dq_array_new(a->size*2); na->prev=a;
+        for(long i=top;i<b;i++)
+            atomic_store_explicit(&na->buf[i%na->size], atomic_load_explicit(&a->buf[i%a->size], RELAXED), RELAXED);
+        atomic_store_explicit(&q->array, na, RELEASE); a=na;
+    }
+    atomic_store_explicit(&a->buf[b%a->size], t, RELAXED);
+    atomic_thread_fence(memory_order_release);
+    atomic_store_explicit(&q->bottom, b+1, RELAXED);
+}
+static acs_task_t* dq_take(deque_t* q){
+    long b=atomic_load_explicit(&q->bottom, RELAXED)-1;
+    dq_array_t* a=atomic_load_explicit(&q->array, RELAXED);
+    atomic_store_explicit(&q->bottom, b, RELAXED);
+    atomic_thread_fence(memory_order_seq_cst);
+    long t=atomic_load_explicit(&q->top, RELAXED);
+    acs_task_t* x=NULL;
+    if(t<=b){
+        x=atomic_load_explicit(&a->buf[b%a->size], RELAXED);
+        if(t==b){                               /* last one: race thieves for it */
+            if(!atomic_compare_exchange_strong_explicit(&q->top, &t, t+1, memory_order_seq_cst, RELAXED)) x=NULL;
+            atomic_store_explicit(&q->bottom, b+1, RELAXED);
+        }
+    } else atomic_store_explicit(&q->bottom, b+1, RELAXED);
+    return x;
+}
+static acs_task_t* dq_steal(deque_t* q){
+    long t=atomic_load_explicit(&q->top, ACQUIRE);
+    atomic_thread_fence(memory_order_seq_cst);
+    long b=atomic_load_explicit(&q->bottom, ACQUIRE);
+    if(t>=b) return NULL;
+    dq_array_t* a=atomic_load_explicit(&q->array, ACQUIRE);
+    acs_task_t* x=atomic_load_explicit(&a->buf[t%a->size], RELAXED);
+    if(!atomic_compare_exchange_strong_explicit(&q->top, &t, t+1, memory_order_seq_cst, RELAXED)) return NULL;
+    return x;
+}
+static int dq_nonempty(deque_t* q){
+    return atomic_load_explicit(&q->bottom, ACQUIRE) > atomic_load_explicit(&q->top, ACQUIRE);
+}
+
+static acs_task_t* inject_pop(void){
+    if(!atomic_load_explicit(&S.injected, RELAXED)) return NULL;
+    pthread_mutex_lock(&S.mu);
+    acs_task_t* t=S.ihead;
+    if(t){ S.ihead=t->next; if(!S.ihead) S.itail=NULL; atomic_fetch_sub(&S.injected, 1); }
+    pthread_mutex_unlock(&S.mu);
+    return t;
+}
+static acs_task_t* find_task(acs_worker_t* me){
+    acs_task_t* t=me ? dq_take(&me->q) : NULL;
+    if(!t) t=inject_pop();
+    for(int k=0; !t && k<S.n; k++){             /* steal, starting at a random victim */
+        unsigned r = me ? (me->rng = me->rng*1103515245u+12345u) >> 8 : 0;
+        acs_worker_t* v=&S.w[(r+(unsigned)k)%(unsigned)S.n];
+        if(v!=me) t=dq_steal(&v->q);
+    }
+    return t;
+}
+static void run_task(acs_task_t* t){
+    t->fn(t->arg);
+    if(t->wg) acs_wg_done(t->wg);
+    free(t);
+}
+static int work_visible(void){
+    if(atomic_load(&S.injected)) return 1;
+    for(int i=0;i<S.n;i++) if(dq_nonempty(&S.w[i].q)) return 1;
+    return 0;
+}
+static void* worker_main(void* vp){
+    acs_worker_t* me=(acs_worker_t*)vp; self=me;
+    for(;;){
+        acs_task_t* t=find_task(me);
+        if(t){ run_task(t); continue; }
+        pthread_mutex_lock(&S.mu);
+        atomic_fetch_add(&S.idle, 1); atomic_thread_fence(memory_order_seq_cst);
+        while(!work_visible()) pthread_cond_wait(&S.cv, &S.mu);
+        atomic_fetch_sub(&S.idle, 1);
+        pthread_mutex_unlock(&S.mu);
+    }
+    return NULL;
+}
+
+/* CPUs this process may run on, in order; returns how many */
+static int allowed_cpus(int* out, int max){
+    cpu_set_t set; int n=0;
+    if(sched_getaffinity(0, sizeof set, &set)!=0) return 0;
+    for(int c=0;c<CPU_SETSIZE && n<max;c++) if(CPU_ISSET(c, &set)) out[n++]=c;
+    return n;
+}
+/* CPUs of NUMA node `node` from sysfs ("0-3,8-11"); 0 when the node does not exist */
+static int node_cpus(int node, cpu_set_t* set){
+    char path[96]; snprintf(path, sizeof path, "/sys/devices/system/node/node%d/cpulist", node);
+    FILE* f=fopen(path, "r"); if(!f) return 0;
+    CPU_ZERO(set); int lo, hi, n=0; char sep;
+    while(fscanf(f, "%d", &lo)==1){
+        hi=lo;
+        if(fscanf(f, "%c", &sep)==1 && sep=='-'){ if(fscanf(f, "%d", &hi)!=1) break; if(fscanf(f, "%c", &sep)!=1) sep=0; }
+        for(int c=lo;c<=hi && c<CPU_SETSIZE;c++){ CPU_SET(c, set); n++; }
+        if(sep!=',') break;
+    }
+    fclose(f); return n;
+}
+static void pin_worker(acs_worker_t* w, const int* cpus, int ncpus, int nnodes){
+    cpu_set_t set; CPU_ZERO(&set);
+    if(S.pin==ACS_PIN_CPU && ncpus) CPU_SET(cpus[w->id % ncpus], &set);
+    else if(S.pin==ACS_PIN_NUMA && nnodes){ if(!node_cpus(w->id % nnodes, &set)) return; }
+    else return;
+    pthread_setaffinity_np(w->th, sizeof set, &set);    /* best effort: the CPU may be outside our cgroup */
+}
+static int env_int(const char* name, int dflt){
+    const char* v=getenv(name); return v && *v ? atoi(v) : dflt;
+}
+static int env_pin(void){
+    const char* v=getenv("ACS_PIN");
+    if(!v) return ACS_PIN_NONE;
+    if(!strcmp(v, "cpu")) return ACS_PIN_CPU;
+    if(!strcmp(v, "numa")) return ACS_PIN_NUMA;
+    return ACS_PIN_NONE;
+}
+/* caller holds S.mu */
+static void sched_start(int workers, int pin){
+    int cpus[CPU_SETSIZE]; int ncpus=allowed_cpus(cpus, CPU_SETSIZE), nnodes=0;
+    cpu_set_t tmp;
+    S.n = workers>0 ? workers : env_int("ACS_WORKERS", ncpus>0 ? ncpus : 1);
+    S.pin = pin>=0 ? pin : env_pin();
+    while(S.pin==ACS_PIN_NUMA && node_cpus(nnodes, &tmp)) nnodes++;
+    if(S.n<=0){ S.n=0; atomic_store_explicit(&S.started, 1, RELEASE); return; }   /* ACS_WORKERS=0: a thread per task */
+    S.w=(acs_worker_t*)aligned_alloc(64, (sizeof(acs_worker_t)*(size_t)S.n+63)&~(size_t)63);
+    memset(S.w, 0, sizeof(acs_worker_t)*(size_t)S.n);
+    for(int i=0;i<S.n;i++){
+        S.w[i].id=i; S.w[i].rng=(unsigned)i*2654435761u+1;
+        atomic_init(&S.w[i].q.array, dq_array_new(256));
+    }
+    for(int i=0;i<S.n;i++){
+        pthread_create(&S.w[i].th, NULL, worker_main, &S.w[i]); pthread_detach(S.w[i].th);
+        pin_worker(&S.w[i], cpus, ncpus, nnodes);
+    }
+    atomic_store_explicit(&S.started, 1, RELEASE);
+}
+int acs_sched_init(int workers, int pin){
+    pthread_mutex_lock(&S.mu);
+    int ok=!S.started;
+    if(ok) sched_start(workers, pin);
+    pthread_mutex_unlock(&S.mu);
+    return ok ? S.n : -1;
+}
+int acs_sched_workers(void){
+    pthread_mutex_lock(&S.mu);
+    if(!S.started) sched_start(0, -1);
+    pthread_mutex_unlock(&S.mu);
+    return S.n;
+}
+
+static void* thread_task(void* vp){ run_task((acs_task_t*)vp); return NULL; }
+static int submit(acs_task_fn fn, void* arg, acs_wg_t* wg){
+    if(!atomic_load_explicit(&S.started, ACQUIRE)) acs_sched_workers();
+    acs_task_t* t=(acs_task_t*)malloc(sizeof(*t));
+    t->fn=fn; t->arg=arg; t->wg=wg; t->next=NULL;
+    if(S.n==0){
+        pthread_t th; int rc=pthread_create(&th, NULL, thread_task, t);
+        if(rc){ free(t); return rc; }
+        pthread_detach(th); return 0;
+    }
+    if(self) dq_push(&self->q, t);
+    else {
+        pthread_mutex_lock(&S.mu);
+        if(S.itail) S.itail->next=t; else S.ihead=t;
+        S.itail=t; atomic_fetch_add(&S.injected, 1);
+        pthread_mutex_unlock(&S.mu);
+    }
+    atomic_thread_fence(memory_order_seq_cst);
+    if(atomic_load_explicit(&S.idle, RELAXED)){
+        pthread_mutex_lock(&S.mu); pthread_cond_signal(&S.cv); pthread_mutex_unlock(&S.mu);
+    }
+    return 0;
+}
+int acs_spawn(acs_task_fn fn, void* arg){ return submit(fn, arg, NULL); }
+int acs_spawn_wg(acs_wg_t* wg, acs_task_fn fn, void* arg){
+    acs_wg_add(wg, 1);
+    int rc=submit(fn, arg, wg);
+    if(rc) acs_wg_done(wg);
+    return rc;
+}
+int acs_spawn_thread(acs_task_fn fn, void* arg){
+    pthread_t t; int rc=pthread_create(&t, NULL, fn, arg);
+    if(!rc) pthread_detach(t);
+    return rc;
+}
+
+acs_wg_t* acs_wg_new(void){
+    acs_wg_t* wg=(acs_wg_t*)calloc(1, sizeof(*wg));
+    pthread_mutex_init(&wg->mu, NULL); monotonic_cond_init(&wg->cv);
+    return wg;
+}
+void acs_wg_free(acs_wg_t* wg){
+    if(!wg) return;
+    pthread_mutex_destroy(&wg->mu); pthread_cond_destroy(&wg->cv); free(wg);
+}
+void acs_wg_add(acs_wg_t* wg, long long n){ atomic_fetch_add(&wg->count, n); }
+void acs_wg_done(acs_wg_t* wg){
+    if(atomic_fetch_sub(&wg->count, 1)==1){
+        pthread_mutex_lock(&wg->mu); pthread_cond_broadcast(&wg->cv); pthread_mutex_unlock(&wg->mu);
+    }
+}
+static int ts_before(struct timespec a, struct timespec b){
+    return a.tv_sec<b.tv_sec || (a.tv_sec==b.tv_sec && a.tv_nsec<b.tv_nsec);
+}
+int acs_wg_wait(acs_wg_t* wg, int timeout_ms){
+    struct timespec dl; if(timeout_ms>0) dl=deadline_ms(timeout_ms);
+    while(atomic_load(&wg->count)>0){
+        /* a worker keeps running tasks while it waits, so joins inside tasks cannot starve the pool */
+        acs_task_t* t = self ? find_task(self) : NULL;
+        if(t){ run_task(t); continue; }
+        if(timeout_ms==0) return 0;
+        /* workers sleep at most 1 ms at a time to look for newly stealable work */
+        struct timespec until=dl;
+        if(self){ until=deadline_ms(1); if(timeout_ms>0 && ts_before(dl, until)) until=dl; }
+        pthread_mutex_lock(&wg->mu);
+        int rc=0;
+        while(atomic_load(&wg->count)>0 && rc==0)
+            rc = (timeout_ms<0 && !self) ? pthread_cond_wait(&wg->cv, &wg->mu) : pthread_cond_timedwait(&wg->cv, &wg->mu, &until);
+        pthread_mutex_unlock(&wg->mu);
+        if(rc && timeout_ms>0 && !ts_before(deadline_ms(0), dl)) return atomic_load(&wg->count)<=0;
+    }
+    return 1;
 }
@@ -7,13 +7,26 @@ extern "C" {
 typedef struct acs_chan acs_chan_t;
 typedef struct acs_group acs_group_t;
 
-acs_chan_t* acs_chan_new(size_t capacity);
+acs_chan_t* acs_chan_new(size_t capacity);   /* rounded up to a power of two */
 void        acs_chan_free(acs_chan_t* ch);
 void        acs_close(acs_chan_t* ch);
 
 int         acs_send_i64(acs_chan_t* ch, long long val);
 int         acs_recv_i64(acs_chan_t* ch, long long* out, int timeout_ms);
 
+/* Batches: send blocks until all n values are in (returns n), or returns how many
+   went in before the channel closed (-1 if none). Receive waits up to timeout_ms
+   for the first value and then takes up to max without blocking: returns the count,
+   0 on timeout, -1 when closed and drained. */
+int         acs_send_i64_many(acs_chan_t* ch, const long long* vals, int n);
+int         acs_recv_i64_many(acs_chan_t* ch, long long* out, int max, int timeout_ms);
+
+/* Zeroed i64 buffers for the batch calls; get/set are inlined by sdrc. */
+long long*  acs_i64_buf_new(size_t n);
+void        acs_i64_buf_free(long long* buf);
+long long   acs_i64_buf_get(const long long* buf, size_t i);
+void        acs_i64_buf_set(long long* buf, size_t i, long long v);
+
 long long   acs_recv_i64_packed(acs_chan_t* ch, int timeout_ms);
 int         acs_unpack_status(long long packed);
 long long   acs_unpack_value(long long packed);
@@ -28,11 +41,35 @@ int          acs_unpack_sel_status(long long packed);
 int          acs_unpack_sel_index(long long packed);
 long long    acs_unpack_sel_value(long long packed);
 
+/* Timers are channels fed by one shared timer thread. A repeating timer sends the
+   number of periods elapsed since it started (ticks a full channel cannot take are
+   skipped); a one-shot timer sends 1 and closes. acs_timer_stop cancels the timer and
+   closes its channel: 1 if it was still pending, 0 if it had fired or was stopped. */
 acs_chan_t*  acs_timer_new(int period_ms, int repeat);
+int          acs_timer_stop(acs_chan_t* timer);
 void         acs_sleep_ms(int ms);
 
 typedef void* (*acs_task_fn)(void*);
+typedef struct acs_wg acs_wg_t;
+
+/* Tasks run on a pool of worker threads with work-stealing deques. The pool starts
+   on the first spawn, sized by ACS_WORKERS (default: CPUs available; 0 = a thread per
+   task) and pinned per ACS_PIN=cpu|numa, unless acs_sched_init ran first. Returns the
+   worker count, or -1 if the pool was already running. */
+enum { ACS_PIN_NONE = 0, ACS_PIN_CPU = 1, ACS_PIN_NUMA = 2 };
+int          acs_sched_init(int workers, int pin);   /* workers <= 0 / pin < 0: from env */
+int          acs_sched_workers(void);
 int          acs_spawn(acs_task_fn fn, void* arg);
+int          acs_spawn_thread(acs_task_fn fn, void* arg);   /* always a new detached thread */
+
+/* Wait groups: wait returns 1 once the count drops to zero, 0 on timeout. A worker
+   waiting inside a task keeps running other tasks meanwhile. */
+acs_wg_t*    acs_wg_new(void);
+void         acs_wg_free(acs_wg_t* wg);
+void         acs_wg_add(acs_wg_t* wg, long long n);
+void         acs_wg_done(acs_wg_t* wg);
+int          acs_wg_wait(acs_wg_t* wg, int timeout_ms);
+int          acs_spawn_wg(acs_wg_t* wg, acs_task_fn fn, void* arg);   /* add(1), done when fn returns */
 
 #ifdef __cplusplus
 }
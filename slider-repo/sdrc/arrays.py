@@ -0,0 +1,125 @@
+from llvmlite import ir
+from .irutil import I8P, cstring, libc
+
+# Arrays ([i64], [f64]) are passed around as { T* data, i64 len } values. Fixed-size
+# arrays ([a, b], [v; n]) point into an alloca in the function's entry block;
+# [T](n) points into calloc'ed memory released by free(a). Out-of-range indexes and
+# failed allocations end the program through cold helpers that print to stderr and
+# abort, after writing out pending `say` output.
+
+i32 = ir.IntType(32); i64 = ir.IntType(64)
+VOID = ir.VoidType()
+
+def array_type(elem: ir.Type) -> ir.LiteralStructType:
+    return ir.LiteralStructType([elem.as_pointer(), i64])
+
+def _c(v): return ir.Constant(i64, v)
+
+class Arrays:
+    """Array lowering for one module. The failure helpers are declared on first use
+    and defined by `finish`, once the module knows whether it has `say` output."""
+    def __init__(self, module: ir.Module):
+        self.module = module
+        self.c_calloc = libc(module, "calloc", ir.FunctionType(I8P, [i64, i64]))
+        self.c_free = libc(module, "free", ir.FunctionType(VOID, [I8P]))
+        self._index_fail = None; self._alloc_fail = None
+        self.pending = []   # (helper, printf format) still without a body
+
+    # --- values ------------------------------------------------------------
+
+    def make(self, b: ir.IRBuilder, data, n):
+        v = ir.Constant(array_type(data.type.pointee), ir.Undefined)
+        return b.insert_value(b.insert_value(v, data, 0), n, 1)
+
+    def fixed(self, entry_b: ir.IRBuilder, b: ir.IRBuilder, elem: ir.Type, values):
+        """[a, b, ...]: the values stored into a new frame slot."""
+        slot = entry_b.alloca(ir.ArrayType(elem, len(values)), name="arr")
+        data = b.gep(slot, [_c(0), _c(0)], inbounds=True)
+        for i, v in enumerate(values): b.store(v, b.gep(data, [_c(i)], inbounds=True))
+        return self.make(b, data, _c(len(values)))
+
+    def repeat(self, entry_b: ir.IRBuilder, b: ir.IRBuilder, value, n: int):
+        """[value; n]: a new frame slot filled by a loop (a memset for zero, after LLVM's idiom recognition)."""
+        slot = entry_b.alloca(ir.ArrayType(value.type, n), name="arr")
+        data = b.gep(slot, [_c(0), _c(0)], inbounds=True)
+        self._fill(b, data, _c(n), value)
+        return self.make(b, data, _c(n))
+
+    def heap(self, b: ir.IRBuilder, elem: ir.Type, n):
+        """[T](n): n zeroed elements from calloc (both element types are 8 bytes)."""
+        self._guard(b, b.icmp_signed(">=", n, _c(0)), self.alloc_fail, [n])
+        raw = b.call(self.c_calloc, [n, _c(8)])
+        failed = b.and_(b.icmp_unsigned("==", raw, ir.Constant(I8P, None)), b.icmp_signed("!=", n, _c(0)))
+        self._guard(b, b.not_(failed), self.alloc_fail, [n])
+        return self.make(b, b.bitcast(raw, elem.as_pointer()), n)
+
+    def free(self, b, arr): b.call(self.c_free, [b.bitcast(b.extract_value(arr, 0), I8P)])
+    def length(self, b, arr): return b.extract_value(arr, 1)
+    def bytes(self, b, arr): return b.bitcast(b.extract_value(arr, 0), I8P), b.mul(self.length(b, arr), _c(8))
+
+    def element(self, b: ir.IRBuilder, arr, idx, checked: bool = True):
+        """Pointer to arr[idx]; with `checked`, fail unless 0 <= idx < len."""
+        if checked:
+            n = self.length(b, arr); self._guard(b, b.icmp_unsigned("<", idx, n), self.index_fail, [idx, n])
+        return b.gep(b.extract_value(arr, 0), [idx], inbounds=True)
+
+    def loop_guard(self, b: ir.IRBuilder, arr, start, end, k: int):
+        """One check before `for i in start..end` that covers every arr[i + k] in its body:
+        the loop is empty, or start + k >= 0 and end + k <= len. On failure it reports
+        the first index the loop would have reached out of range."""
+        n = self.length(b, arr); lo = b.add(start, _c(k)); hi = b.add(end, _c(k))
+        fits = b.and_(b.icmp_signed(">=", lo, _c(0)), b.icmp_signed("<=", hi, n))
+        ok = b.or_(b.icmp_signed(">=", start, end), fits)
+        first_bad = b.select(b.icmp_signed("<", lo, _c(0)), lo, b.select(b.icmp_signed("<", lo, n), n, lo))
+        self._guard(b, ok, self.index_fail, [first_bad, n])
+
+    # --- helpers -------------------------------------------------------------
+
+    def _guard(self, b: ir.IRBuilder, ok, fail_fn, args):
+        fn = b.function
+        fail_bb = fn.append_basic_block("bounds.fail"); ok_bb = fn.append_basic_block("bounds.ok")
+        b.cbranch(ok, ok_bb, fail_bb)
+        b.position_at_end(fail_bb); b.call(fail_fn(), args); b.unreachable()
+        b.position_at_end(ok_bb)
+
+    def _fill(self, b: ir.IRBuilder, data, n, value):
+        fn = b.function; pre = b.block
+        body = fn.append_basic_block("fill.body"); done = fn.append_basic_block("fill.end")
+        b.cbranch(b.icmp_signed(">", n, _c(0)), body, done)
+        b.position_at_end(body)
+        i = b.phi(i64, "fill.i"); i.add_incoming(_c(0), pre)
+        b.store(value, b.gep(data, [i], inbounds=True))
+        nxt = b.add(i, _c(1)); i.add_incoming(nxt, body)
+        b.cbranch(b.icmp_signed("<", nxt, n), body, done)
+        b.position_at_end(done)
+
+    def _fail_fn(self, name, params, fmt: bytes):
+        fn = ir.Function(self.module, ir.FunctionType(VOID, params), name=name)
+        fn.linkage = "internal"
+        for a in ("noreturn", "cold", "noinline", "nounwind"): fn.attributes.add(a)
+        self.pending.append((fn, fmt))
+        return fn
+
+    def finish(self, flush=None):
+        """Define the helpers used: call `flush` (the say runtime's exit function) if
+        given, fflush(NULL) so output printed so far is not lost, dprintf(2, format,
+        args...), then abort()."""
+        m = self.module
+        for fn, fmt in self.pending:
+            b = ir.IRBuilder(fn.append_basic_block("entry"))
+            if flush is not None: b.call(flush, [])
+            b.call(libc(m, "fflush", ir.FunctionType(i32, [I8P])), [ir.Constant(I8P, None)])
+            dprintf = libc(m, "dprintf", ir.FunctionType(i32, [i32, I8P], var_arg=True))
+            b.call(dprintf, [ir.Constant(i32, 2), cstring(m, f"{fn.name}_fmt", fmt), *fn.args])
+            b.call(libc(m, "abort", ir.FunctionType(VOID, [])), []); b.unreachable()
+        self.pending = []
+
+    def index_fail(self):
+        if self._index_fail is None:
+            self._index_fail = self._fail_fn("__sdr_index_fail", [i64, i64], b"index %lld out of bounds for length %lld\n\0")
+        return self._index_fail
+
+    def alloc_fail(self):
+        if self._alloc_fail is None:
+            self._alloc_fail = self._fail_fn("__sdr_alloc_fail", [i64], b"cannot allocate an array of %lld elements\n\0")
+        return self._alloc_fail
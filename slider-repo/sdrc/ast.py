@@ -1,87 +1,135 @@
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 
-@dataclass
-class Expr: pass
+@dataclass(slots=True)
+class Expr:
+    # filled in by typecheck.TypeChecker; keyword-only so subclasses keep positional fields
+    ty: Optional[object] = field(default=None, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class IntLit(Expr): text: str
-@dataclass
+@dataclass(slots=True)
 class FloatLit(Expr): text: str
-@dataclass
+@dataclass(slots=True)
 class StringLit(Expr): value: str
-@dataclass
-class Name(Expr): id: str
-@dataclass
+@dataclass(slots=True)
+class Name(Expr):
+    id: str
+    # index into the enclosing Func.slots, set by resolve.Resolver
+    slot: int = field(default=-1, kw_only=True, compare=False, repr=False)
+@dataclass(slots=True)
 class BinOp(Expr):
     op: str
     left: Expr
     right: Expr
-@dataclass
+@dataclass(slots=True)
 class Call(Expr):
     func: Expr
     args: List[Expr]
+    tail: bool = field(default=False, kw_only=True, compare=False, repr=False)
+    # set by resolve.Resolver: what the callee is, and for "func" / "extern" its
+    # index in Module.funcs / Module.externs
+    kind: str = field(default="", kw_only=True, compare=False, repr=False)
+    sym: int = field(default=-1, kw_only=True, compare=False, repr=False)
+@dataclass(slots=True)
+class ArrayLit(Expr):
+    # [a, b, c]: fixed size, in the enclosing function's frame
+    elems: List[Expr]
+@dataclass(slots=True)
+class ArrayRepeat(Expr):
+    # [value; count]: fixed size, `count` copies of `value`
+    value: Expr
+    count: str
+@dataclass(slots=True)
+class ArrayNew(Expr):
+    # [i64](n) / [f64](n): zero-filled, on the heap until free(a)
+    elem: str
+    count: Expr
+@dataclass(slots=True)
+class Index(Expr):
+    base: Expr
+    index: Expr
+    # cleared by bounds.BoundsChecks when a guard before the enclosing loop covers it
+    checked: bool = field(default=True, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class Stmt: pass
 
-@dataclass
+@dataclass(slots=True)
 class Let(Stmt):
     name: str
     type_name: Optional[str]
     expr: Expr
+    slot: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class Var(Stmt):
     name: str
     type_name: Optional[str]
     expr: Expr
+    slot: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class Assign(Stmt):
     name: str
     expr: Expr
+    slot: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
+class IndexAssign(Stmt):
+    target: Index
+    expr: Expr
+
+@dataclass(slots=True)
 class Return(Stmt):
     expr: Optional[Expr]
 
-@dataclass
+@dataclass(slots=True)
 class ExprStmt(Stmt):
     expr: Expr
 
-@dataclass
+@dataclass(slots=True)
 class If(Stmt):
     cond: Expr
     then_body: List[Stmt]
     else_body: List[Stmt]
 
-@dataclass
+@dataclass(slots=True)
 class While(Stmt):
     cond: Expr
     body: List[Stmt]
+    attrs: List[Tuple[str, Optional[int]]] = field(default_factory=list)
 
-@dataclass
+@dataclass(slots=True)
 class ForRange(Stmt):
     var: str
     start: Expr
     end: Expr
     body: List[Stmt]
+    attrs: List[Tuple[str, Optional[int]]] = field(default_factory=list)
+    # (array Name, index offset) pairs checked once before the loop, see bounds.py
+    guards: List[Tuple[Name, int]] = field(default_factory=list, kw_only=True, compare=False, repr=False)
+    slot: int = field(default=-1, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class Func:
     name: str
     params: List[Tuple[str, Optional[str]]]
     ret_type: Optional[str]
     body: List[Stmt]
+    tail_self: bool = field(default=False, kw_only=True, compare=False, repr=False)
+    # (name, Ty) of every local, parameters first, set by resolve.Resolver
+    slots: List[Tuple[str, object]] = field(default_factory=list, kw_only=True, compare=False, repr=False)
 
-@dataclass
+@dataclass(slots=True)
 class Package:
     name: str
 
-@dataclass
+@dataclass(slots=True)
 class Module:
     package: Optional[Package]
     uses: List[str]
     funcs: List[Func]
+    # (name, param tys, ret ty, variadic) of every extern called, set by resolve.Resolver
+    externs: Optional[List[Tuple[str, list, object, bool]]] = field(default=None, kw_only=True, compare=False, repr=False)
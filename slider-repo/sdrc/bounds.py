@@ -0,0 +1,100 @@
+import dataclasses
+from . import ast as A
+from .typesys import parse_base12_int
+
+class BoundsChecks:
+    """Move array bounds checks out of `for` loops after name resolution.
+
+    In `for i in s..e`, an access `a[i]`, `a[i + k]` or `a[i - k]` (k a literal)
+    that runs on every iteration is covered by a single check before the loop
+    when the body rebinds neither `a` nor `i`, has no `return` (so the loop
+    always runs to `e`), and `e` only reads literals, names the body does not
+    rebind and `len(...)` of those. Accesses under an `if`, a `while` or a
+    nested `for` body may be skipped, so they keep their own check: hoisting
+    `a[i + 1]` out of an `if` that skips the last iteration would fail a loop
+    that never reads past the end; a nested `for` gets guards for its own
+    variable. The loop gets `(a, k)` in `ForRange.guards`, checked once by
+    IRGen (the loop is empty, or s + k >= 0 and e + k <= len(a)), and the
+    access is emitted unchecked. When the range provably fits, as in
+    `for i in 0..len(a)`, LLVM folds the guard away.
+
+    A loop that would index out of range therefore fails before its first
+    iteration rather than at the failing one, with the same message.
+    """
+    def __init__(self):
+        self.elided = 0; self.guards = 0
+
+    def run(self, mod: A.Module) -> A.Module:
+        for f in mod.funcs: self.block(f.body)
+        return mod
+
+    def block(self, stmts):
+        for st in stmts:
+            if isinstance(st, A.ForRange): self.loop(st); self.block(st.body)
+            elif isinstance(st, A.While): self.block(st.body)
+            elif isinstance(st, A.If): self.block(st.then_body); self.block(st.else_body)
+
+    def loop(self, st: A.ForRange):
+        bound = set()
+        if not _scan(st.body, bound) or st.var in bound or not self.invariant(st.end, bound): return
+        guards = {}
+        for ix in _each_iteration(st.body):
+            if not ix.checked or not isinstance(ix.base, A.Name) or ix.base.id in bound: continue
+            k = _offset(ix.index, st.var)
+            if k is None: continue
+            ix.checked = False; self.elided += 1
+            guards.setdefault((ix.base.id, k), ix.base)
+        st.guards = [(base, k) for (_, k), base in guards.items()]; self.guards += len(guards)
+
+    def invariant(self, e, bound) -> bool:
+        if isinstance(e, (A.IntLit, A.FloatLit)): return True
+        if isinstance(e, A.Name): return e.id not in bound
+        if isinstance(e, A.BinOp): return self.invariant(e.left, bound) and self.invariant(e.right, bound)
+        if isinstance(e, A.Call):
+            return (e.kind == "array" and e.func.id == "len"
+                    and isinstance(e.args[0], A.Name) and e.args[0].id not in bound)
+        return False
+
+def _scan(stmts, bound) -> bool:
+    """Collect the names `stmts` (re)bind into `bound`; False if they contain a return."""
+    for st in stmts:
+        if isinstance(st, A.Return): return False
+        if isinstance(st, (A.Let, A.Var, A.Assign)): bound.add(st.name)
+        elif isinstance(st, A.ForRange):
+            bound.add(st.var)
+            if not _scan(st.body, bound): return False
+        elif isinstance(st, A.While):
+            if not _scan(st.body, bound): return False
+        elif isinstance(st, A.If):
+            if not (_scan(st.then_body, bound) and _scan(st.else_body, bound)): return False
+    return True
+
+def _each_iteration(stmts):
+    """The Index expressions evaluated every time `stmts` run: those in the
+    statements themselves and in if/while conditions and nested range bounds,
+    but not in the bodies those may skip."""
+    for st in stmts:
+        if isinstance(st, (A.If, A.While)): yield from _indexes(st.cond)
+        elif isinstance(st, A.ForRange): yield from _indexes([st.start, st.end])
+        else: yield from _indexes(st)
+
+def _indexes(node):
+    """Every Index expression under `node` (statements and expressions)."""
+    stack = [node]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, list): stack.extend(x); continue
+        if isinstance(x, A.Index): yield x
+        if dataclasses.is_dataclass(x):   # compare=False fields are annotations, not children
+            stack.extend(getattr(x, f.name) for f in dataclasses.fields(x) if f.compare)
+
+def _offset(e, var):
+    """k when `e` is `var`, `var + k`, `k + var` or `var - k` with a literal k, else None."""
+    if isinstance(e, A.Name): return 0 if e.id == var else None
+    if not isinstance(e, A.BinOp) or e.op not in "+-": return None
+    l, r = e.left, e.right
+    if isinstance(l, A.Name) and l.id == var and isinstance(r, A.IntLit):
+        k = parse_base12_int(r.text); return k if e.op == "+" else -k
+    if e.op == "+" and isinstance(r, A.Name) and r.id == var and isinstance(l, A.IntLit):
+        return parse_base12_int(l.text)
+    return None
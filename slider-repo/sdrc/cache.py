@@ -0,0 +1,109 @@
+import glob, hashlib, json, os, pickle, shutil
+from collections import OrderedDict
+import llvmlite
+
+_PKG_DIR = os.path.dirname(os.path.abspath(__file__))
+_fingerprint = None
+
+def compiler_fingerprint() -> str:
+    """Hash of the compiler sources, the runtime headers it reads and the llvmlite
+    version; any change invalidates the cache."""
+    global _fingerprint
+    if _fingerprint is None:
+        h = hashlib.sha256(llvmlite.__version__.encode())
+        runtime_h = glob.glob(os.path.join(os.path.dirname(_PKG_DIR), "runtime", "*.h"))
+        for p in sorted(glob.glob(os.path.join(_PKG_DIR, "*.py"))) + sorted(runtime_h):
+            with open(p, "rb") as f: h.update(f.read())
+        _fingerprint = h.hexdigest()
+    return _fingerprint
+
+class BuildCache:
+    """Content-addressed artifact store with size-bounded LRU eviction.
+
+    Entries live under `root/<kk>/<key>.<kind>`; a hit refreshes the entry's
+    mtime, and eviction removes the least recently used entries first.
+    """
+    def __init__(self, root="build/.sdrc-cache", max_bytes=None):
+        self.root = root
+        if max_bytes is None: max_bytes = int(os.environ.get("SDRC_CACHE_MAX_MB", "512")) << 20
+        self.max_bytes = max_bytes
+
+    def key(self, src: bytes, **options) -> str:
+        h = hashlib.sha256(compiler_fingerprint().encode())
+        h.update(json.dumps(options, sort_keys=True).encode()); h.update(b"\0"); h.update(src)
+        return h.hexdigest()
+
+    def _path(self, key: str, kind: str) -> str:
+        return os.path.join(self.root, key[:2], f"{key}.{kind}")
+
+    def _touch(self, path: str):
+        try: os.utime(path)
+        except OSError: pass
+
+    def fetch(self, key: str, kind: str, out_path: str) -> bool:
+        """Copy a cached artifact to `out_path`; return False on a miss."""
+        path = self._path(key, kind)
+        if not os.path.exists(path): return False
+        tmp = f"{out_path}.{os.getpid()}.tmp"
+        try: shutil.copy(path, tmp)   # keeps the mode: exe artifacts stay executable
+        except FileNotFoundError: return False
+        os.replace(tmp, out_path); self._touch(path)
+        return True
+
+    def store(self, key: str, kind: str, src_path: str):
+        path = self._path(key, kind)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.copy(src_path, tmp); os.replace(tmp, path)
+        self.evict()
+
+    def load_ast(self, key: str):
+        path = self._path(key, "ast")
+        try:
+            with open(path, "rb") as f: mod = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        self._touch(path); return mod
+
+    def store_ast(self, key: str, mod):
+        path = self._path(key, "ast")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f: pickle.dump(mod, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def evict(self):
+        entries = []; total = 0
+        for p in glob.glob(os.path.join(self.root, "*", "*")):
+            if p.endswith(".tmp"): continue
+            try: st = os.stat(p)
+            except OSError: continue
+            entries.append((st.st_mtime, st.st_size, p)); total += st.st_size
+        if total <= self.max_bytes: return
+        for _mtime, size, p in sorted(entries):
+            try: os.remove(p)
+            except OSError: continue
+            total -= size
+            if total <= self.max_bytes: break
+
+class ASTMemo:
+    """In-memory LRU of parsed ASTs keyed by source text, for the `sdrc serve` workers.
+
+    Trees are kept pickled so every hit returns a fresh copy: the passes after
+    parsing rewrite the AST in place.
+    """
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = self.misses = 0
+
+    def get(self, src: str):
+        key = hashlib.sha256(src.encode("utf-8")).digest()
+        blob = self.entries.get(key)
+        if blob is None: self.misses += 1; return key, None
+        self.entries.move_to_end(key); self.hits += 1
+        return key, pickle.loads(blob)
+
+    def put(self, key: bytes, mod):
+        self.entries[key] = pickle.dumps(mod, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(self.entries) > self.max_entries: self.entries.popitem(last=False)
@@ -0,0 +1,75 @@
+import functools, os, re
+from .typesys import I64, I32, F64, BOOL, STR, VOID, PTR
+from .runtime import RUNTIME_DIR
+
+ACS_HEADER = os.path.join(RUNTIME_DIR, "acs_v1.h")
+
+_C_TYPES = {
+    "void": VOID, "_Bool": BOOL, "bool": BOOL, "double": F64,
+    "int": I32, "signed": I32, "unsigned": I32, "signed int": I32, "unsigned int": I32,
+    "int32_t": I32, "uint32_t": I32,
+    "long": I64, "long int": I64, "unsigned long": I64, "long long": I64, "long long int": I64,
+    "unsigned long long": I64, "int64_t": I64, "uint64_t": I64, "size_t": I64, "ssize_t": I64,
+    "intptr_t": I64, "uintptr_t": I64,
+}
+_QUALIFIERS = {"const", "volatile", "restrict", "struct", "enum", "extern"}
+_TYPE_WORDS = {"void", "_Bool", "bool", "char", "short", "int", "long", "signed", "unsigned", "float", "double"}
+
+_COMMENT = re.compile(r"/\*.*?\*/|//[^\n]*", re.S)
+_FNPTR_TYPEDEF = re.compile(r"typedef\b[^;]*\(\s*\*\s*(\w+)\s*\)\s*\(")
+_PROTO = re.compile(r"(?P<ret>[\w\s\*]*?[\w\*])\s*\b(?P<name>\w+)\s*\((?P<params>[^()]*)\)\s*$")
+
+def _ctype(text: str):
+    """(base type words, pointer depth) of a C type, dropping qualifiers and any parameter name."""
+    toks = text.replace("*", " * ").split()
+    words = [t for t in toks if t != "*" and t not in _QUALIFIERS]
+    # a trailing identifier after the type is the parameter name
+    if len(words) > 1 and words[-1] not in _TYPE_WORDS: words = words[:-1]
+    return words, toks.count("*")
+
+def _slider_type(ctype, fnptrs):
+    words, stars = ctype; base = " ".join(words)
+    if stars == 1 and base == "char": return STR
+    if stars or base in fnptrs: return PTR
+    return _C_TYPES.get(base)
+
+def parse_header(text: str) -> dict:
+    """Prototypes in C header `text` as {name: ([param types], return type, variadic)}.
+
+    Understands plain function declarations over the scalar types Slider has
+    (int/long long/size_t/double/_Bool), `char*` as str and any other pointer
+    or function-pointer typedef as ptr. Declarations using other types
+    (float, structs by value, ...) are skipped; those functions keep the
+    call-site declaration.
+    """
+    text = _COMMENT.sub(" ", text)
+    text = "\n".join(l for l in text.splitlines() if not l.lstrip().startswith("#"))
+    text = text.replace('extern "C"', " ").replace("{", ";").replace("}", ";")
+    fnptrs = set(_FNPTR_TYPEDEF.findall(text))
+    out = {}
+    for stmt in text.split(";"):
+        stmt = " ".join(stmt.split())
+        if not stmt or stmt.startswith("typedef"): continue
+        m = _PROTO.match(stmt)
+        if m is None: continue
+        ret = _slider_type(_ctype(m["ret"]), fnptrs)
+        params = [p.strip() for p in m["params"].split(",")] if m["params"].strip() else []
+        variadic = bool(params) and params[-1] == "..."
+        if variadic: params = params[:-1]
+        if params == ["void"]: params = []
+        ptys = [_slider_type(_ctype(p), fnptrs) for p in params]
+        if ret is None or any(t is None or t == VOID for t in ptys): continue
+        out[m["name"]] = (ptys, ret, variadic)
+    return out
+
+def load(paths) -> dict:
+    """Declarations from C header files; later files override earlier ones."""
+    out = {}
+    for p in paths:
+        with open(p, "r", encoding="utf-8") as f: out.update(parse_header(f.read()))
+    return out
+
+@functools.lru_cache(maxsize=None)
+def acs_decls() -> dict:
+    """Signatures of the bundled ACS runtime (runtime/acs_v1.h)."""
+    return load([ACS_HEADER])
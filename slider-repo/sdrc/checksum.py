@@ -0,0 +1,94 @@
+from functools import lru_cache
+from llvmlite import ir
+from .irutil import I8P
+
+# `checksum32(buf)` and `checksum64(buf)`, lowered to internal IR functions instead
+# of extern calls so LLVM can inline them into the caller and unroll the loops.
+# Both are reflected table-driven CRCs with init and final xor all ones:
+#   checksum32  CRC-32 (IEEE 802.3, as zlib's crc32)   check("123456789") = 0xcbf43926
+#   checksum64  CRC-64/XZ (ECMA-182, as xz and Go's crc64.ECMA)        = 0x995dc9bbdf1939fa
+# The main loop is slicing-by-8: one little-endian 8-byte word per iteration, its
+# bytes looked up in eight 256-entry tables (internal constants) and xored together,
+# so the eight loads are independent; the last n % 8 bytes go through table 0.
+CHECKSUMS = {"checksum32": (32, 0xEDB88320), "checksum64": (64, 0xC96C5795D7870F42)}
+
+i8 = ir.IntType(8); i64 = ir.IntType(64)
+
+@lru_cache(maxsize=None)
+def tables(width: int, poly: int) -> tuple:
+    """The eight slicing tables: t[0] is the classic byte table, t[k][i] advances t[k-1][i] by a zero byte."""
+    t0 = []
+    for i in range(256):
+        c = i
+        for _ in range(8): c = (c >> 1) ^ poly if c & 1 else c >> 1
+        t0.append(c)
+    t = [t0]
+    for _ in range(7): t.append([(v >> 8) ^ t0[v & 0xFF] for v in t[-1]])
+    return tuple(tuple(row) for row in t)
+
+def _signed(v: int, width: int) -> int:
+    return v - (1 << width) if v >> (width - 1) else v
+
+def checksum_fn(module: ir.Module, name: str) -> ir.Function:
+    """The internal `i64 (i8* p, i64 n)` function for intrinsic `name`, defined on first use."""
+    sym = f"__sdr_{name}"
+    fn = module.globals.get(sym)
+    if fn is not None: return fn
+    width, poly = CHECKSUMS[name]
+    ty = ir.IntType(width); ones = ir.Constant(ty, -1)
+    tty = ir.ArrayType(ir.ArrayType(ty, 256), 8)
+    table = ir.GlobalVariable(module, tty, name=f"{sym}_table")
+    table.global_constant = True; table.linkage = "internal"
+    table.initializer = ir.Constant(tty, [ir.Constant(tty.element, [ir.Constant(ty, _signed(v, width)) for v in row])
+                                          for row in tables(width, poly)])
+    fn = ir.Function(module, ir.FunctionType(i64, [I8P, i64]), name=sym)
+    fn.linkage = "internal"; fn.attributes.add("nounwind")
+    p0, n0 = fn.args; p0.name = "p"; n0.name = "n"
+    entry, head, body, tail, tbody, done = (fn.append_basic_block(s) for s in
+                                            ("entry", "head", "body", "tail", "tbody", "done"))
+
+    def lookup(b, k, idx):
+        return b.load(b.gep(table, [ir.Constant(ir.IntType(32), 0), ir.Constant(ir.IntType(32), k), idx]))
+
+    ir.IRBuilder(entry).branch(head)
+
+    b = ir.IRBuilder(head)
+    p = b.phi(I8P, "p8"); n = b.phi(i64, "n8"); crc = b.phi(ty, "crc8")
+    p.add_incoming(p0, entry); n.add_incoming(n0, entry); crc.add_incoming(ones, entry)
+    b.cbranch(b.icmp_unsigned(">=", n, ir.Constant(i64, 8)), body, tail)
+
+    # word = bytes p[0..8) little-endian (a single load after LLVM's load combining), xor crc
+    b = ir.IRBuilder(body)
+    word = None
+    for k in range(8):
+        byte = b.zext(b.load(b.gep(p, [ir.Constant(i64, k)])), i64)
+        if k: byte = b.shl(byte, ir.Constant(i64, 8 * k))
+        word = byte if word is None else b.or_(word, byte)
+    word = b.xor(word, crc if width == 64 else b.zext(crc, i64))
+    acc = None
+    for k in range(8):
+        idx = b.and_(b.lshr(word, ir.Constant(i64, 8 * k)), ir.Constant(i64, 0xFF)) if k < 7 else b.lshr(word, ir.Constant(i64, 56))
+        v = lookup(b, 7 - k, idx)
+        acc = v if acc is None else b.xor(acc, v)
+    p.add_incoming(b.gep(p, [ir.Constant(i64, 8)]), body)
+    n.add_incoming(b.sub(n, ir.Constant(i64, 8)), body)
+    crc.add_incoming(acc, body)
+    b.branch(head)
+
+    b = ir.IRBuilder(tail)
+    tp = b.phi(I8P, "p1"); tn = b.phi(i64, "n1"); tcrc = b.phi(ty, "crc1")
+    tp.add_incoming(p, head); tn.add_incoming(n, head); tcrc.add_incoming(crc, head)
+    b.cbranch(b.icmp_unsigned("!=", tn, ir.Constant(i64, 0)), tbody, done)
+
+    b = ir.IRBuilder(tbody)
+    low = b.and_(b.xor(tcrc, b.zext(b.load(tp), ty)), ir.Constant(ty, 0xFF))
+    nxt = b.xor(lookup(b, 0, b.zext(low, i64) if width < 64 else low), b.lshr(tcrc, ir.Constant(ty, 8)))
+    tp.add_incoming(b.gep(tp, [ir.Constant(i64, 1)]), tbody)
+    tn.add_incoming(b.sub(tn, ir.Constant(i64, 1)), tbody)
+    tcrc.add_incoming(nxt, tbody)
+    b.branch(tail)
+
+    b = ir.IRBuilder(done)
+    res = b.xor(tcrc, ones)
+    b.ret(res if width == 64 else b.zext(res, i64))
+    return fn
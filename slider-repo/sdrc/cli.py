@@ -0,0 +1,28 @@
+"""`sdrc` console entry point.
+
+With `--server`, the command goes to a running `sdrc serve` before anything
+heavy is imported. llvmlite and the compiler load only when compiling here.
+"""
+import sys
+from . import server
+
+def _socket_arg(argv):
+    for i, a in enumerate(argv):
+        if a == "--socket" and i + 1 < len(argv): return argv[i + 1]
+        if a.startswith("--socket="): return a.split("=", 1)[1]
+    return None
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if "--server" in argv:
+        code = server.forward(argv, _socket_arg(argv))
+        if code is not None: return code
+    from . import driver
+    try:
+        return driver.main(argv)
+    except Exception as e:
+        print(f"[sdrc] error: {e}", file=sys.stderr)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,350 @@
-
-import argparse, os, sys
+import argparse, hashlib, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
 from .lexer import Lexer
 from .parser import Parser
 from .irgen import IRGen
+from .fold import ConstFolder
+from .typecheck import TypeChecker
+from .resolve import Resolver
+from .tailcall import TailCalls
+from .bounds import BoundsChecks
+from .optimize import EMIT_KINDS, c_entry, cpu_target, target_machine, parse_text, run_passes, emit, write_ir
+from .cache import BuildCache
+from .profile import DEFAULT_PATH as PROFILE_PATH, Profile
+from . import cdecl
+from .stats import NO_STATS, Stats, ast_kinds, ir_counts, ref_counts, report, run_hooks
+from . import jit, runtime, server
+
+EMIT_EXT = {"ll": ".ll", "bc": ".bc", "asm": ".s", "obj": ".o", "exe": ""}
+
+ast_memo = None   # cache.ASTMemo, set in `sdrc serve` workers
+
+def parse_source(src: str, stats=NO_STATS):
+    if ast_memo is not None:
+        key, mod = ast_memo.get(src)
+        if mod is not None: stats.set("ast_memo_hit", True); return mod
+    if stats is NO_STATS:
+        mod = Parser(Lexer(src).iter_tokens()).parse()
+    else:
+        # lex to a list first so lexing and parsing are timed separately
+        with stats.phase("lex"): toks = Lexer(src).lex()
+        stats.set("tokens", len(toks))
+        with stats.phase("parse"): mod = Parser(toks).parse()
+    if ast_memo is not None: ast_memo.put(key, mod)
+    return mod
+
+def externs(decls=()) -> dict:
+    """C signatures known to the compiler: the ACS runtime's plus those in `decls` headers."""
+    return {**cdecl.acs_decls(), **cdecl.load(decls)} if decls else cdecl.acs_decls()
+
+def analyze(src_path: str, mod=None, verbose: bool = False, stats=NO_STATS, decls=()):
+    """Parse (unless `mod` is given), type-check, fold, resolve names, mark tail calls and
+    hoist loop bounds checks."""
+    if mod is None:
+        with stats.phase("read"):
+            with open(src_path, "r", encoding="utf-8") as f: src = f.read()
+        stats.set("source_bytes", len(src.encode("utf-8")))
+        mod = parse_source(src, stats)
+    if stats is not NO_STATS: stats.set("ast_nodes", dict(ast_kinds(mod)))
+    known = externs(decls)
+    with stats.phase("typecheck"): TypeChecker(known).check(mod)
+    folder = ConstFolder()
+    with stats.phase("fold"): mod = folder.run(mod)
+    if verbose: print(f"[sdrc] fold: removed {folder.removed} AST node(s) in {src_path}", file=sys.stderr)
+    resolver = Resolver(known)
+    with stats.phase("resolve"): resolver.run(mod)
+    if verbose: print(f"[sdrc] resolve: {resolver.slots} local slot(s), {len(mod.externs)} extern(s)", file=sys.stderr)
+    tails = TailCalls()
+    with stats.phase("tailcall"): tails.run(mod)
+    if verbose: print(f"[sdrc] tailcall: {tails.marked} tail call(s), {tails.self_calls} self-recursive", file=sys.stderr)
+    bounds = BoundsChecks()
+    with stats.phase("bounds"): bounds.run(mod)
+    if verbose and bounds.elided:
+        print(f"[sdrc] bounds: {bounds.elided} check(s) moved to {bounds.guards} loop guard(s)", file=sys.stderr)
+    return mod
 
-def build(src_path: str, out_path: str):
-    with open(src_path, "r", encoding="utf-8") as f:
-        src = f.read()
-    toks = Lexer(src).lex()
-    mod = Parser(toks).parse()
-    irg = IRGen(module_name=os.path.basename(src_path))
-    module = irg.gen_module(mod)
-    os.makedirs(os.path.dirname(out_path), exist_ok=True)
-    with open(out_path, "w", encoding="utf-8") as f:
-        f.write(str(module))
+def check(src_path: str, mod=None, verbose: bool = False, decls=()):
+    analyze(src_path, mod, verbose, decls=decls)
+    print(f"[sdrc] ok {src_path}")
+
+def compile_module(src_path: str, mod=None, verbose: bool = False, profile_generate=None, profile_use=None,
+                   stats=NO_STATS, decls=()):
+    """Front end and IRGen for one file; `profile_generate` is the path instrumented
+    code writes its profile to, `profile_use` a .sdrprof path to optimize with, and
+    `decls` are extra C headers declaring external functions."""
+    mod = analyze(src_path, mod, verbose, stats, decls)
+    profile = Profile.load(profile_use) if profile_use else None
+    irg = IRGen(module_name=os.path.basename(src_path), instrument=profile_generate, profile=profile,
+                externs=externs(decls))
+    with stats.phase("irgen"): module = irg.gen_module(mod)
+    if stats is not NO_STATS:
+        nf, nb, ni = ir_counts(module)
+        stats.set("functions", nf); stats.set("basic_blocks", nb); stats.set("ir_instructions", ni)
+        stats.set("cstr_globals", len(irg.globals))
+    if irg.stale:
+        print(f"[sdrc] warning: {src_path}: profile is stale or missing for {len(irg.stale)} function(s): "
+              + ", ".join(irg.stale), file=sys.stderr)
+    return module
+
+def _file_hash(path):
+    with open(path, "rb") as f: return hashlib.sha256(f.read()).hexdigest()
+
+def build(src_path: str, out_path: str, opt_level: int = 2, emit_kind: str = "ll", cache=None,
+          verbose: bool = False, profile_generate=None, profile_use=None, stats=NO_STATS, decls=(), cpu: str = ""):
+    """Compile `src_path` to `out_path` as `emit_kind`. `cpu` (an LLVM CPU name or
+    `native`) is what the optimizer and code generator target. `exe` emits an object
+    and links it with $CC, plus the cached ACS runtime archive when the program
+    calls into the runtime."""
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    mod = None
+    if cache is not None:
+        with stats.phase("cache"):
+            with open(src_path, "rb") as f:
+                src = f.read()
+            key = cache.key(src, name=os.path.basename(src_path), opt_level=opt_level, emit=emit_kind,
+                            profile_generate=profile_generate,
+                            profile_use=_file_hash(profile_use) if profile_use else None,
+                            decls=[_file_hash(d) for d in decls], cpu=list(cpu_target(cpu)) if cpu else None,
+                            runtime=runtime.source_hash() if emit_kind == "exe" else None)
+            hit = cache.fetch(key, emit_kind, out_path)
+        stats.set("cache_hit", hit)
+        if hit:
+            print(f"[sdrc] wrote {out_path} (cached)"); return
+        ast_key = cache.key(src)
+        mod = cache.load_ast(ast_key)
+        if mod is None:
+            mod = parse_source(src.decode("utf-8"), stats); cache.store_ast(ast_key, mod)
+    module = compile_module(src_path, mod, verbose, profile_generate, profile_use, stats, decls)
+    tmp = f"{out_path}.{os.getpid()}.tmp"; obj = f"{tmp}.o"
+    try:
+        if opt_level == 0 and emit_kind == "ll":
+            with stats.phase("write"): write_ir(module, tmp)
+        else:
+            tm = target_machine(opt_level, cpu)
+            # llvmlite only parses whole strings, so the text cannot be streamed in;
+            # drop the Python IR as soon as it is serialized so it is never alive
+            # alongside the LLVM module as well
+            name, linked = module.name, emit_kind == "exe" and runtime.uses_runtime(module)
+            with stats.phase("serialize"): text = str(module)
+            del module
+            with stats.phase("llvm-parse"):
+                ref = parse_text(text, name, tm)
+                del text
+                if emit_kind == "exe": c_entry(ref, tm)
+            with stats.phase("optimize"): run_passes(ref, tm, opt_level)
+            if stats is not NO_STATS:
+                nf, nb, ni = ref_counts(ref)
+                stats.set("opt_basic_blocks", nb); stats.set("opt_ir_instructions", ni)
+            if emit_kind == "exe":
+                with stats.phase("emit"): emit(ref, tm, "obj", obj)
+                with stats.phase("link"): runtime.link([obj], tmp, linked)
+            else:
+                with stats.phase("emit"): emit(ref, tm, emit_kind, tmp)
+        os.replace(tmp, out_path)
+    finally:
+        for p in (tmp, obj):
+            if os.path.exists(p): os.remove(p)
+    if cache is not None: cache.store(key, emit_kind, out_path)
     print(f"[sdrc] wrote {out_path}")
 
-def main():
+def collect_sources(paths):
+    """Expand files and directories (recursively, *.sdr) into (source, relative stem) pairs."""
+    out = []
+    for p in paths:
+        if os.path.isdir(p):
+            for root, _dirs, files in os.walk(p):
+                for name in sorted(files):
+                    if name.endswith(".sdr"):
+                        src = os.path.join(root, name)
+                        out.append((src, os.path.splitext(os.path.relpath(src, p))[0]))
+        else:
+            out.append((p, os.path.splitext(os.path.basename(p))[0]))
+    return out
+
+def _output_clashes(jobs):
+    """[(out, sources)] for outputs that more than one distinct source would write,
+    e.g. a/x.sdr and b/x.sdr both building to build/x.<ext>."""
+    by_out = {}
+    for src, out, _options in jobs:
+        srcs = by_out.setdefault(out, [])
+        if all(os.path.realpath(src) != os.path.realpath(s) for s in srcs): srcs.append(src)
+    return [(out, srcs) for out, srcs in by_out.items() if len(srcs) > 1]
+
+def _build_job(job):
+    src_path, out_path, options = job
+    options = dict(options)
+    stats = Stats() if options.pop("stats", False) else NO_STATS
+    try:
+        build(src_path, out_path, stats=stats, **options)
+        err = None
+    except Exception as e:
+        err = f"{type(e).__name__}: {e}"
+    return src_path, err, None if stats is NO_STATS else stats.as_dict()
+
+def build_many(jobs, workers: int = 1):
+    """Build independent (src, out, options) jobs, in a process pool when workers > 1.
+
+    `options` are keyword arguments for build(), plus `stats=True` to collect
+    per-phase statistics. A failing file does not stop the others; returns
+    (failures as [(src, error)], statistics as [(src, Stats.as_dict())]).
+    Statistics hooks run here, in the calling process.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_build_job(j) for j in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+            results = list(ex.map(_build_job, jobs))
+    collected = [(src, data) for src, _err, data in results if data is not None]
+    for src, data in collected: run_hooks(src, data)
+    return [(src, err) for src, err, _data in results if err is not None], collected
+
+def run(src_path: str, opt_level: int = 2, verbose: bool = False, profile_generate=None, profile_use=None,
+        stats=NO_STATS, mod=None, decls=(), cpu: str = ""):
+    t0 = time.perf_counter()
+    module = compile_module(src_path, mod, verbose, profile_generate, profile_use, stats, decls)
+    libs = [runtime.shared_library()] if runtime.uses_runtime(module) else []
+    front = time.perf_counter() - t0
+    code, jit_s, run_s = jit.run(module, opt_level, libs, cpu)
+    stats.record("jit", jit_s); stats.record("run", run_s)
+    print(f"[sdrc] compile {(front + jit_s) * 1e3:.2f} ms (jit {jit_s * 1e3:.2f} ms), "
+          f"run {run_s * 1e3:.2f} ms, exit {code}", file=sys.stderr)
+    return code
+
+def _report_stats(args, collected):
+    if not collected: return
+    fmt = args.stats or "table"
+    if args.stats_file:
+        with open(args.stats_file, "w", encoding="utf-8") as f: report(collected, fmt, f, counters=bool(args.stats))
+    else:
+        report(collected, fmt, counters=bool(args.stats))
+
+def main(argv=None, use_server: bool = True):
+    argv = sys.argv[1:] if argv is None else list(argv)
     ap = argparse.ArgumentParser(prog="sdrc", description="Slider compiler (scaffold)")
     sp = ap.add_subparsers(dest="cmd")
+    srv_help = "send the command to a running `sdrc serve`; compile here if none is running"
+    sock_help = f"server socket (default $SDRC_SOCKET or {server.default_socket()})"
+
+    b = sp.add_parser("build", help="Build a .sdr file to LLVM IR, bitcode, assembly, an object file or an executable")
+    b.add_argument("sources", nargs="+", metavar="source", help=".sdr files or directories of them")
+    b.add_argument("-o", "--out", default=None,
+                   help="output path for a single file (default build/out.<ext>), else output directory (default build)")
+    b.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="parallel build processes")
+    b.add_argument("-O", "--opt-level", type=int, choices=range(4), default=2, metavar="{0,1,2,3}",
+                   help="optimization level (default 2)")
+    b.add_argument("--emit", choices=EMIT_KINDS, default="ll",
+                   help="output kind (default ll); exe links the object with $CC and, if used, the ACS runtime")
+    b.add_argument("--mcpu", default="", metavar="CPU", help="target CPU for optimization and code generation, "
+                   "e.g. native or skylake (default: generic for the host architecture)")
+    b.add_argument("--cache-dir", default="build/.sdrc-cache", help="incremental build cache directory")
+    b.add_argument("--no-cache", action="store_true", help="always rebuild; do not read or write the cache")
+    b.add_argument("--decls", action="append", default=[], metavar="HEADER",
+                   help="C header declaring external functions (repeatable); acs_v1.h is always read")
+    b.add_argument("-v", "--verbose", action="store_true", help="report front-end pass results on stderr")
+    b.add_argument("--profile-generate", nargs="?", const=PROFILE_PATH, default=None, metavar="PATH",
+                   help=f"instrument branches and function entries; the program writes its profile to PATH "
+                        f"(default {PROFILE_PATH}, or $SDR_PROF_FILE) at exit")
+    b.add_argument("--profile-use", default=None, metavar="PROFILE",
+                   help="optimize with branch weights and entry counts from a .sdrprof file")
+    b.add_argument("--time-phases", action="store_true", help="print wall time, Python heap peak and RSS growth per compiler phase")
+    b.add_argument("--stats", choices=("table", "json"), default=None,
+                   help="print phase times and compiler counters (tokens, AST nodes, blocks, ...) as a table or JSON")
+    b.add_argument("--stats-file", default=None, metavar="PATH", help="write --stats/--time-phases output here instead of stderr")
+    b.add_argument("--server", action="store_true", help=srv_help)
+    b.add_argument("--socket", default=None, help=sock_help)
+
+    r = sp.add_parser("run", help="JIT-compile a .sdr file in-process and call main")
+    r.add_argument("source", help="path to .sdr file")
+    r.add_argument("-O", "--opt-level", type=int, choices=range(4), default=2, metavar="{0,1,2,3}",
+                   help="optimization level (default 2)")
+    r.add_argument("--mcpu", default="", metavar="CPU", help="target CPU, e.g. native (default: generic)")
+    r.add_argument("--decls", action="append", default=[], metavar="HEADER",
+                   help="C header declaring external functions (repeatable); acs_v1.h is always read")
+    r.add_argument("-v", "--verbose", action="store_true", help="report front-end pass results on stderr")
+    r.add_argument("--profile-generate", nargs="?", const=PROFILE_PATH, default=None, metavar="PATH",
+                   help=f"instrument branches and function entries; the program writes its profile to PATH "
+                        f"(default {PROFILE_PATH}, or $SDR_PROF_FILE) at exit")
+    r.add_argument("--profile-use", default=None, metavar="PROFILE",
+                   help="optimize with branch weights and entry counts from a .sdrprof file")
+    r.add_argument("--time-phases", action="store_true", help="print wall time, Python heap peak and RSS growth per compiler phase")
+    r.add_argument("--stats", choices=("table", "json"), default=None,
+                   help="print phase times and compiler counters (tokens, AST nodes, blocks, ...) as a table or JSON")
+    r.add_argument("--stats-file", default=None, metavar="PATH", help="write --stats/--time-phases output here instead of stderr")
+    r.add_argument("--server", action="store_true", help=srv_help)
+    r.add_argument("--socket", default=None, help=sock_help)
+
+    c = sp.add_parser("check", help="Parse and type-check .sdr files without generating code")
+    c.add_argument("sources", nargs="+", metavar="source", help=".sdr files or directories of them")
+    c.add_argument("--decls", action="append", default=[], metavar="HEADER",
+                   help="C header declaring external functions (repeatable); acs_v1.h is always read")
+    c.add_argument("-v", "--verbose", action="store_true", help="report front-end pass results on stderr")
+    c.add_argument("--server", action="store_true", help=srv_help)
+    c.add_argument("--socket", default=None, help=sock_help)
 
-    b = sp.add_parser("build", help="Build a .sdr file to LLVM IR (.ll)")
-    b.add_argument("source", help="path to .sdr file")
-    b.add_argument("-o", "--out", default="build/out.ll", help="output .ll path")
+    sv = sp.add_parser("serve", help="Run a compile server on a Unix socket for build/check/run --server")
+    sv.add_argument("--socket", default=None, help=sock_help)
+    sv.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1, help="worker processes")
+    sv.add_argument("--stop", action="store_true", help="stop the server listening on the socket")
+    sv.add_argument("--status", action="store_true", help="report whether a server is listening")
 
-    args = ap.parse_args()
+    args = ap.parse_args(argv)
+    if use_server and getattr(args, "server", False):
+        code = server.forward(argv, args.socket)
+        if code is not None: return code
+        if args.verbose: print("[sdrc] no compile server running; compiling in-process", file=sys.stderr)
+    if args.cmd == "serve":
+        if args.stop or args.status:
+            reply = server.request({"op": "shutdown" if args.stop else "ping"}, args.socket)
+            if reply is None:
+                print(f"[sdrc] no server on {args.socket or server.default_socket()}", file=sys.stderr); return 1
+            if args.status: print(f"[sdrc] server pid {reply['pid']} with {reply['workers']} worker(s)")
+            return 0
+        server.Server(args.socket, args.jobs).serve()
+        return 0
+    if args.cmd == "check":
+        failures = 0
+        for src, _stem in collect_sources(args.sources):
+            try: check(src, verbose=args.verbose, decls=args.decls)
+            except Exception as e:
+                print(f"[sdrc] error: {src}: {type(e).__name__}: {e}", file=sys.stderr); failures += 1
+        return 1 if failures else 0
+    if args.cmd in ("build", "run") and args.profile_generate and args.profile_use:
+        ap.error("--profile-generate and --profile-use are mutually exclusive")
     if args.cmd == "build":
-        return build(args.source, args.out)
+        cache = None if args.no_cache else BuildCache(args.cache_dir)
+        ext = EMIT_EXT[args.emit]
+        options = dict(opt_level=args.opt_level, emit_kind=args.emit, cache=cache, verbose=args.verbose,
+                       profile_generate=args.profile_generate, profile_use=args.profile_use, decls=args.decls,
+                       cpu=args.mcpu, stats=bool(args.stats or args.time_phases))
+        if len(args.sources) == 1 and not os.path.isdir(args.sources[0]):
+            jobs = [(args.sources[0], args.out or "build/out" + ext, options)]
+        else:
+            out_dir = args.out or "build"
+            jobs = [(src, os.path.join(out_dir, stem + ext), options) for src, stem in collect_sources(args.sources)]
+            clashes = _output_clashes(jobs)
+            for out, srcs in clashes:
+                print(f"[sdrc] error: {', '.join(srcs)} all build to {out}; build them separately with -o", file=sys.stderr)
+            if clashes: return 1
+        failures, collected = build_many(jobs, args.jobs)
+        _report_stats(args, collected)
+        for src, err in failures: print(f"[sdrc] error: {src}: {err}", file=sys.stderr)
+        if failures:
+            print(f"[sdrc] {len(failures)} of {len(jobs)} file(s) failed", file=sys.stderr)
+            return 1
+        return 0
+    if args.cmd == "run":
+        stats = Stats() if args.stats or args.time_phases else NO_STATS
+        code = run(args.source, args.opt_level, args.verbose, args.profile_generate, args.profile_use, stats,
+                   decls=args.decls, cpu=args.mcpu)
+        if stats is not NO_STATS:
+            data = stats.as_dict(); run_hooks(args.source, data)
+            _report_stats(args, [(args.source, data)])
+        return code
     ap.print_help()
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except Exception as e:
         print(f"[sdrc] error: {e}", file=sys.stderr)
         sys.exit(1)
@@ -0,0 +1,93 @@
+import dataclasses
+from . import ast as A
+from .typesys import INT_BITS, BOOL, parse_base12_int
+
+def wrap_int(v: int, bits: int = 64) -> int:
+    v &= (1 << bits) - 1
+    return v - (1 << bits) if v >> (bits - 1) else v
+
+def count_nodes(node) -> int:
+    if isinstance(node, list): return sum(count_nodes(x) for x in node)
+    if not dataclasses.is_dataclass(node): return 0
+    return 1 + sum(count_nodes(getattr(node, f.name)) for f in dataclasses.fields(node))
+
+def _sdiv(a: int, b: int) -> int:
+    q = abs(a) // abs(b)
+    return q if (a < 0) == (b < 0) else -q
+
+_OPS = {'+': lambda a, b: a + b, '-': lambda a, b: a - b, '*': lambda a, b: a * b, '/': _sdiv}
+
+class ConstFolder:
+    """AST pass run between TypeChecker.check and Resolver.run.
+
+    Folds arithmetic on integer literals (base-12 included) where the checker
+    typed it i64 or i32, with that width's wrap-around and LLVM `sdiv`
+    semantics; `let x:f64 = 7 / 2` is a double division and stays for IRGen.
+    It rewrites every IntLit to decimal text, splices the taken arm of an `if` with a constant condition, drops
+    `while` loops whose condition is constant zero, and removes statements
+    after a `return`. `removed` counts the AST nodes eliminated.
+    """
+    def __init__(self):
+        self.removed = 0
+
+    def run(self, mod: A.Module) -> A.Module:
+        for f in mod.funcs: f.body = self.block(f.body)
+        return mod
+
+    def block(self, stmts):
+        out = []
+        for i, st in enumerate(stmts):
+            for s in self.stmt(st):
+                out.append(s)
+                if isinstance(s, A.Return):
+                    self.removed += count_nodes(stmts[i + 1:])
+                    return out
+        return out
+
+    def stmt(self, st):
+        if isinstance(st, (A.Let, A.Var, A.Assign, A.ExprStmt)):
+            st.expr = self.expr(st.expr); return [st]
+        if isinstance(st, A.IndexAssign):
+            st.target = self.expr(st.target); st.expr = self.expr(st.expr); return [st]
+        if isinstance(st, A.Return):
+            if st.expr is not None: st.expr = self.expr(st.expr)
+            return [st]
+        if isinstance(st, A.If):
+            st.cond = self.expr(st.cond)
+            if isinstance(st.cond, A.IntLit):
+                taken, dropped = (st.then_body, st.else_body) if int(st.cond.text) else (st.else_body, st.then_body)
+                self.removed += 2 + count_nodes(dropped)
+                return self.block(taken)
+            st.then_body = self.block(st.then_body); st.else_body = self.block(st.else_body)
+            return [st]
+        if isinstance(st, A.While):
+            st.cond = self.expr(st.cond)
+            if isinstance(st.cond, A.IntLit) and int(st.cond.text) == 0:
+                self.removed += count_nodes(st); return []
+            st.body = self.block(st.body); return [st]
+        if isinstance(st, A.ForRange):
+            st.start = self.expr(st.start); st.end = self.expr(st.end)
+            st.body = self.block(st.body); return [st]
+        return [st]
+
+    def expr(self, e):
+        if isinstance(e, A.IntLit):
+            e.text = str(wrap_int(parse_base12_int(e.text))); return e
+        if isinstance(e, A.BinOp):
+            e.left = self.expr(e.left); e.right = self.expr(e.right)
+            bits = INT_BITS.get(e.ty) if e.ty != BOOL else None
+            if bits and isinstance(e.left, A.IntLit) and isinstance(e.right, A.IntLit) and e.op in _OPS:
+                a = int(e.left.text); b = int(e.right.text)
+                if e.op == '/' and b == 0: return e  # leave the trap to run time
+                self.removed += 2
+                return A.IntLit(str(wrap_int(_OPS[e.op](a, b), bits)), ty=e.ty)
+            return e
+        if isinstance(e, A.Call):
+            e.args = [self.expr(a) for a in e.args]; return e
+        if isinstance(e, A.Index):
+            e.base = self.expr(e.base); e.index = self.expr(e.index); return e
+        if isinstance(e, A.ArrayLit):
+            e.elems = [self.expr(x) for x in e.elems]; return e
+        if isinstance(e, A.ArrayRepeat): e.value = self.expr(e.value); return e
+        if isinstance(e, A.ArrayNew): e.count = self.expr(e.count); return e
+        return e
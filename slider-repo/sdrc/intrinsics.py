@@ -0,0 +1,26 @@
+from llvmlite import ir
+
+# ACS helpers from acs_v1.h, lowered inline instead of called: the packed-result
+# unpackers ([status:2 | value:62] from acs_recv_i64_packed, [status:2 | index:6 |
+# value:56] from select) and the i64 batch-buffer accessors
+
+def _sext_low(b, p, bits):
+    """Sign-extend the low `bits` bits of i64 `p`."""
+    k = ir.Constant(p.type, 64 - bits)
+    return b.ashr(b.shl(p, k), k)
+
+def _field(b, p, shift, mask):
+    return b.trunc(b.and_(b.lshr(p, ir.Constant(p.type, shift)), ir.Constant(p.type, mask)), ir.IntType(32))
+
+def _i64_slot(b, buf, i):
+    return b.gep(b.bitcast(buf, ir.PointerType(ir.IntType(64))), [i])
+
+INTRINSICS = {
+    "acs_unpack_status":     lambda b, p: _field(b, p, 62, 0x3),
+    "acs_unpack_value":      lambda b, p: _sext_low(b, p, 62),
+    "acs_unpack_sel_status": lambda b, p: _field(b, p, 62, 0x3),
+    "acs_unpack_sel_index":  lambda b, p: _field(b, p, 56, 0x3F),
+    "acs_unpack_sel_value":  lambda b, p: _sext_low(b, p, 56),
+    "acs_i64_buf_get":       lambda b, buf, i: b.load(_i64_slot(b, buf, i)),
+    "acs_i64_buf_set":       lambda b, buf, i, v: b.store(v, _i64_slot(b, buf, i)),
+}
@@ -1,31 +1,73 @@
 
 from llvmlite import ir
 from . import ast as A
+from .typesys import I64, I32, F64, BOOL, STR, VOID, PTR, ARR_I64, ARR_F64, TYPES, is_array, parse_base12_int
+from . import profile as P
+from .irutil import add_global_dtors, libc
+from .checksum import checksum_fn
+from .intrinsics import INTRINSICS
+from .resolve import Resolver
+from .output import Output
+from .arrays import Arrays, array_type
 
-def parse_base12_int(text: str) -> int:
-    raw = text
-    base12 = False
-    if text.endswith(".b12"):
-        base12 = True; raw = text[:-4]
-    if any(ch in "te" for ch in raw): base12 = True
-    if base12:
-        v = 0
-        for ch in raw:
-            d = 10 if ch=='t' else 11 if ch=='e' else int(ch,10)
-            v = v*12 + d
-        return v
-    return int(raw,10)
+I8P = ir.IntType(8).as_pointer()
+LLVM_TYPES = {I64: ir.IntType(64), I32: ir.IntType(32), BOOL: ir.IntType(1),
+              F64: ir.DoubleType(), STR: I8P, PTR: I8P, VOID: ir.VoidType(),
+              ARR_I64: array_type(ir.IntType(64)), ARR_F64: array_type(ir.DoubleType())}
+
+def lltype(ty) -> ir.Type:
+    """LLVM type for a typesys.Ty or type name; None (untyped AST) means i64."""
+    if ty is None: return LLVM_TYPES[I64]
+    if isinstance(ty, str): ty = VOID if ty == "void" else TYPES[ty]
+    return LLVM_TYPES[ty]
+
+class DistinctMD(ir.MDValue):
+    """`distinct` metadata node, optionally self-referential as `!llvm.loop` IDs
+    must be; llvmlite's add_metadata only builds uniqued nodes."""
+    def __init__(self, module, operands=(), self_ref=False):
+        super().__init__(module, [], name=str(len(module.metadata)))
+        self.operands = ((self,) if self_ref else ()) + tuple(module._fix_metadata_operands(list(operands)))
+
+    def descr(self, buf):
+        buf.append("distinct "); super().descr(buf)
+
+    __eq__ = object.__eq__; __ne__ = object.__ne__; __hash__ = object.__hash__
+
+def _say_literal(e):
+    """Text `say` prints for a literal argument (as printf's %lld/%g would), else None."""
+    if isinstance(e, A.StringLit): return e.value
+    if isinstance(e, A.IntLit):
+        v = parse_base12_int(e.text)
+        return "%g" % float(v) if e.ty == F64 else str(v)
+    if isinstance(e, A.FloatLit): return "%g" % float(e.text)
+    return None
 
 class IRGen:
-    def __init__(self, module_name="slider_module"):
+    """Lower a type-checked ast.Module to an llvmlite ir.Module.
+
+    With `instrument` (a profile output path) every function entry and both
+    edges of every if/while/for branch bump a counter, dumped at exit; with
+    `profile` (a profile.Profile) the same sites get `!prof` branch weights and
+    entry counts instead, and functions whose profile no longer matches their
+    shape are listed in `stale`. Names and callees come resolved (see resolve.py);
+    a module no Resolver has seen is resolved here with `externs`, C signatures as
+    read by cdecl. Calls to the ACS unpack and buffer helpers are inlined, and
+    `checksum32/64` call internal CRC functions (see checksum.py).
+    """
+    def __init__(self, module_name="slider_module", instrument=None, profile=None, externs=None):
         self.module = ir.Module(name=module_name)
         self.builder = None; self.func = None
-        self.printf = self._declare_printf()
+        self.entry_builder = None; self.tailrec = None
+        self.out = None     # output.Output, created by the first say
+        self.arrays = None  # arrays.Arrays, created by the first array operation
+        self.elem_groups = {}   # id of an array element load/store -> (instruction, its @noalias access groups)
+        self.fns = []; self.ext_fns = []   # ir.Functions by Call.sym, see resolve.py
         self.globals = {}
-
-    def _declare_printf(self):
-        ty = ir.FunctionType(ir.IntType(32), [ir.IntType(8).as_pointer()], var_arg=True)
-        return ir.Function(self.module, ty, name="printf")
+        self.instrument = instrument; self.profile = profile
+        self.layout = None; self.counters = None; self.hot = 0
+        self.prof = None; self.site = 0   # current fn: first counter index (instrument) or counts (profile)
+        self.stale = []
+        self.externs = externs or {}
 
     def cstr(self, s: str):
         if s in self.globals: return self.globals[s]
@@ -35,52 +77,122 @@ class IRGen:
         self.globals[s] = g; return g
 
     def gen_module(self, mod: A.Module) -> ir.Module:
-        for f in mod.funcs: self.gen_func_decl(f)
-        for f in mod.funcs: self.gen_func_body(f)
+        if self.instrument or self.profile: self.layout = P.Layout(mod)
+        if self.profile: self.hot = self.profile.hot_threshold()
+        if self.instrument:
+            ty = ir.ArrayType(ir.IntType(64), self.layout.ncounters)
+            self.counters = ir.GlobalVariable(self.module, ty, name="__sdr_prof_counters")
+            self.counters.linkage = "internal"; self.counters.initializer = ir.Constant(ty, None)
+        if mod.externs is None: Resolver(self.externs).run(mod)
+        self.fns = [self.gen_func_decl(f) for f in mod.funcs]
+        self.ext_fns = [libc(self.module, name, ir.FunctionType(lltype(ret), [lltype(t) for t in params], var_arg=variadic))
+                        for name, params, ret, variadic in mod.externs]
+        for f, irf in zip(mod.funcs, self.fns): self.gen_func_body(f, irf)
+        if self.arrays: self.arrays.finish(self.out.exit_fn if self.out else None)
+        dtors = []
+        if self.instrument: dtors.append(P.add_dump(self.module, self.layout, self.counters, self.instrument))
+        if self.out: dtors.append(self.out.exit_fn)
+        if dtors: add_global_dtors(self.module, dtors)
+        if self.profile: P.add_summary(self.module, self.profile, len(mod.funcs))
         return self.module
 
     def gen_func_decl(self, f: A.Func):
-        params = [ir.IntType(64) for _ in f.params]
-        rett = ir.IntType(64) if (f.ret_type == "i64") else ir.VoidType()
+        params = [lltype(ptype) for _pname, ptype in f.params]
+        rett = lltype(f.ret_type) if f.ret_type else ir.VoidType()
         fnty = ir.FunctionType(rett, params)
         irf = ir.Function(self.module, fnty, name=f.name)
         for i,(pname,_ptype) in enumerate(f.params): irf.args[i].name = pname
+        return irf
 
-    def gen_func_body(self, f: A.Func):
-        irf = self.module.get_global(f.name)
-        block = irf.append_basic_block("entry")
+    def gen_func_body(self, f: A.Func, irf: ir.Function):
+        entry = irf.append_basic_block("entry"); block = irf.append_basic_block("body")
+        self.entry_builder = ir.IRBuilder(entry)
         self.builder = ir.IRBuilder(block)
-        env = {}
-        for arg in irf.args:
-            slot = self.builder.alloca(ir.IntType(64), name=arg.name)
-            self.builder.store(arg, slot); env[arg.name] = slot
+        # one stack slot per local (Func.slots), all in the entry block, which holds only
+        # allocas and falls through to the body: loops never grow the stack, mem2reg/SROA
+        # can promote every local, and re-binding a name reuses its slot
+        env = [self.entry_builder.alloca(lltype(ty), name=name) for name, ty in f.slots]
+        self.tailrec = None
+        for arg, slot in zip(irf.args, env): self.builder.store(arg, slot)
+        if self.layout is not None: self._prof_entry(f, irf)
+        if f.tail_self:
+            # self tail calls re-store the parameters and jump here instead of recursing
+            loop_bb = irf.append_basic_block("tailrec"); self.builder.branch(loop_bb)
+            self.builder.position_at_end(loop_bb)
+            self.tailrec = (loop_bb, env[:len(irf.args)])
         for st in f.body: self.gen_stmt(st, env)
-        if isinstance(irf.function_type.return_type, ir.VoidType): self.builder.ret_void()
-        else: self.builder.ret(ir.Constant(ir.IntType(64), 0))
+        rett = irf.function_type.return_type
+        if self.builder.block.is_terminated: pass
+        elif isinstance(rett, ir.VoidType): self.builder.ret_void()
+        else: self.builder.ret(ir.Constant(rett, None))
+        self.entry_builder.branch(block)
+
+    def _prof_entry(self, f, irf):
+        first, _k, shape = self.layout.funcs[f.name]; self.site = 0
+        if self.instrument:
+            self.prof = first; self._bump(self.builder, first); return
+        self.prof = self.profile.counts(f.name, shape)
+        if self.prof is None: self.stale.append(f.name); return
+        entry = self.prof[0]
+        irf.set_metadata("prof", self.module.add_metadata(["function_entry_count", ir.Constant(ir.IntType(64), entry)]))
+        if entry == 0: irf.attributes.add("cold")
+        elif entry >= self.hot: irf.attributes.add("inlinehint")
+
+    def _bump(self, builder, idx):
+        i32 = ir.IntType(32)
+        ptr = builder.gep(self.counters, [ir.Constant(i32, 0), ir.Constant(i32, idx)], inbounds=True)
+        builder.store(builder.add(builder.load(ptr), ir.Constant(ir.IntType(64), 1)), ptr)
+
+    def cbranch(self, cond, taken, not_taken):
+        """Conditional branch at a profiled site: count both (still empty) successors
+        when instrumenting, or attach the recorded branch weights."""
+        br = self.builder.cbranch(cond, taken, not_taken)
+        if self.prof is None: return br
+        i = 1 + 2 * self.site; self.site += 1
+        if self.instrument:
+            self._bump(ir.IRBuilder(taken), self.prof + i)
+            self._bump(ir.IRBuilder(not_taken), self.prof + i + 1)
+        else:
+            br.set_metadata("prof", P.branch_weights(self.module, self.prof[i], self.prof[i + 1]))
+        return br
 
     def gen_stmt(self, st, env):
         ARef = A
-        if isinstance(st, ARef.Let) or isinstance(st, ARef.Var):
-            val = self.gen_expr(st.expr, env)
-            slot = self.builder.alloca(ir.IntType(64), name=st.name)
-            self.builder.store(val, slot); env[st.name] = slot; return
-        if isinstance(st, ARef.Assign):
-            val = self.gen_expr(st.expr, env); self.builder.store(val, env[st.name]); return
+        if isinstance(st, (ARef.Let, ARef.Var, ARef.Assign)):
+            val = self.gen_expr(st.expr, env); self.builder.store(val, env[st.slot]); return
+        if isinstance(st, ARef.IndexAssign):
+            val = self.gen_expr(st.expr, env); self._elem_access(self.builder.store(val, self._element(st.target, env))); return
         if isinstance(st, ARef.Return):
-            if st.expr is None: self.builder.ret_void()
-            else: self.builder.ret(self.gen_expr(st.expr, env)); return
-        if isinstance(st, ARef.ExprStmt): self.gen_expr(st.expr, env); return
+            e = st.expr
+            if e is None: self.builder.ret_void()
+            elif isinstance(e, ARef.Call) and e.tail:
+                if self._is_self_call(e): return self._gen_self_tail_call(e, env)
+                self.builder.ret(self.gen_call(e, env, musttail_ok=True))
+            else: self.builder.ret(self.gen_expr(e, env))
+            return
+        if isinstance(st, ARef.ExprStmt):
+            e = st.expr
+            if isinstance(e, ARef.Call) and e.tail and self._is_self_call(e): return self._gen_self_tail_call(e, env)
+            self.gen_expr(e, env); return
         if isinstance(st, ARef.If): return self._gen_if(st, env)
         if isinstance(st, ARef.While): return self._gen_while(st, env)
         if isinstance(st, ARef.ForRange): return self._gen_for(st, env)
         raise NotImplementedError(type(st))
 
+    def _is_self_call(self, e):
+        return self.tailrec is not None and e.kind == "func" and self.fns[e.sym] is self.builder.function
+
+    def _gen_self_tail_call(self, e, env):
+        loop_bb, slots = self.tailrec
+        args = [self.gen_expr(a, env) for a in e.args]   # evaluate all before overwriting any
+        for slot, v in zip(slots, args): self.builder.store(v, slot)
+        self.builder.branch(loop_bb)
+
     def _gen_if(self, st, env):
         irf = self.builder.function
         then_bb = irf.append_basic_block("then"); else_bb = irf.append_basic_block("else"); end_bb = irf.append_basic_block("ifend")
-        condv = self.gen_expr(st.cond, env)
-        condz = self.builder.icmp_unsigned("!=", condv, ir.Constant(ir.IntType(64), 0))
-        self.builder.cbranch(condz, then_bb, else_bb)
+        condz = self.truth(self.gen_expr(st.cond, env))
+        self.cbranch(condz, then_bb, else_bb)
         self.builder.position_at_end(then_bb)
         for s in st.then_body: self.gen_stmt(s, env)
         if not self.builder.block.is_terminated: self.builder.branch(end_bb)
@@ -89,80 +201,180 @@ class IRGen:
         if not self.builder.block.is_terminated: self.builder.branch(end_bb)
         self.builder.position_at_end(end_bb)
 
+    def loop_metadata(self, attrs, group):
+        """Build the `!llvm.loop` node for source loop attributes (@vec, @unroll, ...)."""
+        md = self.module.add_metadata; i1 = ir.IntType(1); i32 = ir.IntType(32)
+        props = []
+        for name, arg in attrs:
+            if name == "vec":
+                props.append(md(["llvm.loop.vectorize.enable", ir.Constant(i1, 1)]))
+                if arg: props.append(md(["llvm.loop.vectorize.width", ir.Constant(i32, arg)]))
+            elif name == "unroll":
+                props.append(md(["llvm.loop.unroll.count", ir.Constant(i32, arg)]) if arg
+                             else md(["llvm.loop.unroll.enable"]))
+            elif name == "nounroll":
+                props.append(md(["llvm.loop.unroll.disable"]))
+            elif name == "noalias":
+                props.append(md(["llvm.loop.parallel_accesses", group]))
+        return DistinctMD(self.module, props, self_ref=True)
+
+    def _finish_loop(self, st, latch_br, blocks):
+        """Attach loop metadata to the back-edge; for @noalias also tag the loop's array
+        element loads and stores with its access group (the programmer's promise is
+        about array elements: the slots of locals, the induction variable included,
+        and profile counters do carry values across iterations)."""
+        if not st.attrs or latch_br is None: return
+        group = None
+        if any(name == "noalias" for name, _ in st.attrs):
+            group = DistinctMD(self.module)
+            for bb in blocks:
+                for ins in bb.instructions:
+                    tagged = self.elem_groups.get(id(ins))
+                    if tagged is None: continue
+                    groups = tagged[1]; groups.append(group)   # inner @noalias loops first
+                    ins.set_metadata("llvm.access.group", group if len(groups) == 1 else self.module.add_metadata(groups))
+        latch_br.set_metadata("llvm.loop", self.loop_metadata(st.attrs, group))
+
     def _gen_while(self, st, env):
         irf = self.builder.function
         cond_bb = irf.append_basic_block("while.cond"); body_bb = irf.append_basic_block("while.body"); end_bb = irf.append_basic_block("while.end")
+        first_nested = len(irf.blocks)
         self.builder.branch(cond_bb)
         self.builder.position_at_end(cond_bb)
-        condv = self.gen_expr(st.cond, env)
-        condz = self.builder.icmp_unsigned("!=", condv, ir.Constant(ir.IntType(64), 0))
-        self.builder.cbranch(condz, body_bb, end_bb)
+        condz = self.truth(self.gen_expr(st.cond, env))
+        self.cbranch(condz, body_bb, end_bb)
         self.builder.position_at_end(body_bb)
         for s in st.body: self.gen_stmt(s, env)
-        if not self.builder.block.is_terminated: self.builder.branch(cond_bb)
+        latch = None if self.builder.block.is_terminated else self.builder.branch(cond_bb)
+        self._finish_loop(st, latch, [cond_bb, body_bb, *irf.blocks[first_nested:]])
         self.builder.position_at_end(end_bb)
 
     def _gen_for(self, st, env):
         irf = self.builder.function
         cond_bb = irf.append_basic_block("for.cond"); body_bb = irf.append_basic_block("for.body"); inc_bb = irf.append_basic_block("for.inc"); end_bb = irf.append_basic_block("for.end")
-        iv_slot = self.builder.alloca(ir.IntType(64), name=st.var); env[st.var] = iv_slot
-        start = self.gen_expr(st.start, env); self.builder.store(start, iv_slot); self.builder.branch(cond_bb)
+        start = self.gen_expr(st.start, env); iv_slot = env[st.slot]
+        self.builder.store(start, iv_slot)
+        if st.guards:   # see bounds.py: these cover the body's unchecked accesses
+            endv = self.gen_expr(st.end, env)
+            for arr, k in st.guards: self.arr().loop_guard(self.builder, self.gen_expr(arr, env), start, endv, k)
+        first_nested = len(irf.blocks)
+        self.builder.branch(cond_bb)
         self.builder.position_at_end(cond_bb)
         iv = self.builder.load(iv_slot); endv = self.gen_expr(st.end, env)
-        cond = self.builder.icmp_signed("<", iv, endv); self.builder.cbranch(cond, body_bb, end_bb)
+        cond = self.builder.icmp_signed("<", iv, endv); self.cbranch(cond, body_bb, end_bb)
         self.builder.position_at_end(body_bb)
         for s in st.body: self.gen_stmt(s, env)
         if not self.builder.block.is_terminated: self.builder.branch(inc_bb)
         self.builder.position_at_end(inc_bb)
-        iv = self.builder.load(iv_slot); one = ir.Constant(ir.IntType(64), 1)
-        self.builder.store(self.builder.add(iv, one), iv_slot); self.builder.branch(cond_bb)
+        iv = self.builder.load(iv_slot); one = ir.Constant(iv.type, 1)
+        self.builder.store(self.builder.add(iv, one), iv_slot); latch = self.builder.branch(cond_bb)
+        self._finish_loop(st, latch, [cond_bb, body_bb, inc_bb, *irf.blocks[first_nested:]])
         self.builder.position_at_end(end_bb)
 
+    def truth(self, v):
+        if isinstance(v.type, ir.DoubleType): return self.builder.fcmp_unordered("!=", v, ir.Constant(v.type, 0.0))
+        if v.type.width == 1: return v
+        return self.builder.icmp_unsigned("!=", v, ir.Constant(v.type, 0))
+
+    def str_ptr(self, s: str):
+        zero = ir.Constant(ir.IntType(32), 0)
+        return self.builder.gep(self.cstr(s), [zero, zero], inbounds=True)
+
+    def convert(self, v, to: ir.Type):
+        """Explicit numeric conversion for the i64()/i32()/f64()/bool() builtins."""
+        b = self.builder; frm = v.type
+        if frm == to: return v
+        if isinstance(to, ir.DoubleType): return b.sitofp(v, to) if frm.width > 1 else b.uitofp(v, to)
+        if to.width == 1: return self.truth(v)
+        if isinstance(frm, ir.DoubleType): return b.fptosi(v, to)
+        if frm.width < to.width: return b.sext(v, to) if frm.width > 1 else b.zext(v, to)
+        return b.trunc(v, to)
+
     def gen_expr(self, e, env):
         ARef = A
-        if isinstance(e, ARef.IntLit): return ir.Constant(ir.IntType(64), parse_base12_int(e.text))
-        if isinstance(e, ARef.FloatLit): return ir.Constant(ir.IntType(64), int(float(e.text)))
-        if isinstance(e, ARef.StringLit): return ir.Constant(ir.IntType(64), 0)
-        if isinstance(e, ARef.Name):
-            slot = env.get(e.id); 
-            if slot is None: 
-                try:
-                    callee = self.module.get_global(e.id)  # extern?
-                    return callee
-                except:
-                    raise NameError(f"Undefined name: {e.id}")
-            return self.builder.load(slot)
+        if isinstance(e, ARef.IntLit):
+            t = lltype(e.ty); v = parse_base12_int(e.text)
+            return ir.Constant(t, float(v) if isinstance(t, ir.DoubleType) else v)
+        if isinstance(e, ARef.FloatLit): return ir.Constant(lltype(e.ty or F64), float(e.text))
+        if isinstance(e, ARef.StringLit): return self.str_ptr(e.value)
+        if isinstance(e, ARef.Name): return self.builder.load(env[e.slot])
         if isinstance(e, ARef.BinOp):
             l = self.gen_expr(e.left, env); r = self.gen_expr(e.right, env)
+            if isinstance(l.type, ir.DoubleType):
+                if e.op == '+': return self.builder.fadd(l, r)
+                if e.op == '-': return self.builder.fsub(l, r)
+                if e.op == '*': return self.builder.fmul(l, r)
+                if e.op == '/': return self.builder.fdiv(l, r)
+                raise NotImplementedError(e.op)
             if e.op == '+': return self.builder.add(l, r)
             if e.op == '-': return self.builder.sub(l, r)
             if e.op == '*': return self.builder.mul(l, r)
             if e.op == '/': return self.builder.sdiv(l, r)
             raise NotImplementedError(e.op)
-        if isinstance(e, ARef.Call):
-            if isinstance(e.func, ARef.Name) and e.func.id == "say":
-                return self._gen_say(e.args, env)
-            # extern or user function
-            fn_name = e.func.id if isinstance(e.func, ARef.Name) else None
-            callee = self.module.globals.get(fn_name)
-            if callee is None:
-                # auto-declare extern with i64 params/void return for pack-style calls
-                ft = ir.FunctionType(ir.IntType(64), [ir.IntType(64) for _ in e.args])
-                callee = ir.Function(self.module, ft, name=fn_name)
-            args = [self.gen_expr(a, env) for a in e.args]
-            return self.builder.call(callee, args)
+        if isinstance(e, ARef.Call): return self.gen_call(e, env)
+        if isinstance(e, ARef.Index): return self._elem_access(self.builder.load(self._element(e, env)))
+        if isinstance(e, ARef.ArrayLit):
+            elem = lltype(e.ty).elements[0].pointee
+            return self.arr().fixed(self.entry_builder, self.builder, elem, [self.gen_expr(x, env) for x in e.elems])
+        if isinstance(e, ARef.ArrayRepeat):
+            return self.arr().repeat(self.entry_builder, self.builder, self.gen_expr(e.value, env), parse_base12_int(e.count))
+        if isinstance(e, ARef.ArrayNew):
+            return self.arr().heap(self.builder, lltype(e.elem), self.gen_expr(e.count, env))
         raise NotImplementedError(type(e))
 
+    def arr(self) -> Arrays:
+        if self.arrays is None: self.arrays = Arrays(self.module)
+        return self.arrays
+
+    def _element(self, e, env):
+        """Pointer to the element `e` (an Index) names, bounds-checked unless a loop guard covers it."""
+        base = self.gen_expr(e.base, env); idx = self.gen_expr(e.index, env)
+        return self.arr().element(self.builder, base, idx, e.checked)
+
+    def _elem_access(self, ins):
+        """Note an array element load/store, the only accesses @noalias vouches for."""
+        self.elem_groups[id(ins)] = (ins, []); return ins
+
+    def gen_call(self, e, env, musttail_ok=False):
+        """Lower a call; calls marked `tail` get `tail`, or `musttail` when they are
+        returned directly and caller and callee prototypes match."""
+        kind = e.kind
+        if kind == "say": return self._gen_say(e.args, env)
+        args = [self.gen_expr(a, env) for a in e.args]
+        if kind == "cast": return self.convert(args[0], lltype(e.ty))
+        if kind == "array":
+            return (self.arr().length if e.func.id == "len" else self.arr().free)(self.builder, args[0])
+        if kind == "checksum":
+            if is_array(e.args[0].ty): args = list(self.arr().bytes(self.builder, args[0]))
+            elif len(args) == 1:   # a str: up to its NUL
+                args.append(self.builder.call(libc(self.module, "strlen", ir.FunctionType(ir.IntType(64), [I8P])), args))
+            return self.builder.call(checksum_fn(self.module, e.func.id), args)
+        if kind == "intrinsic": return INTRINSICS[e.func.id](self.builder, *args)
+        callee = self.fns[e.sym] if kind == "func" else self.ext_fns[e.sym]
+        tail = False
+        if e.tail:
+            same = callee.function_type == self.builder.function.function_type
+            tail = "musttail" if musttail_ok and same else "tail"
+        return self.builder.call(callee, args, tail=tail)
+
     def _gen_say(self, args, env):
-        fmt_parts = []; vargs = []
-        for a in args:
-            if isinstance(a, A.StringLit):
-                fmt_parts.append("%s"); c = self.cstr(a.value)
-                zero = ir.Constant(ir.IntType(32), 0); ptr = self.builder.gep(c, [zero, zero], inbounds=True)
-                vargs.append(ptr)
-            else:
-                fmt_parts.append("%lld"); vargs.append(self.gen_expr(a, env))
-        fmt = " ".join(fmt_parts) + "\\n"
-        g = self.cstr(fmt); zero = ir.Constant(ir.IntType(32), 0)
-        ptr = self.builder.gep(g, [zero, zero], inbounds=True)
-        return self.builder.call(self.printf, [ptr, *vargs])
+        """Arguments separated by spaces, then a newline. Literal arguments are
+        formatted here and merged with the separators into single constant writes;
+        the rest go through the module's buffered output (see output.py)."""
+        if self.out is None: self.out = Output(self.module)
+        b = self.builder; out = self.out; text = []
+        for i, a in enumerate(args):
+            if i: text.append(" ")
+            const = _say_literal(a)
+            if const is not None: text.append(const); continue
+            if text: self._say_text("".join(text)); text = []
+            v = self.gen_expr(a, env); t = v.type
+            if t == I8P: (out.ptr if a.ty == PTR else out.str)(b, v)
+            elif isinstance(t, ir.DoubleType): out.f64(b, v)
+            elif t.width == 64: out.i64(b, v)
+            else: out.i64(b, b.zext(v, ir.IntType(64)) if t.width == 1 else b.sext(v, ir.IntType(64)))
+        text.append("\n")
+        self._say_text("".join(text)); out.end_line(b)
+
+    def _say_text(self, s: str):
+        self.out.write(self.builder, self.str_ptr(s), len(s.encode("utf8")))
@@ -0,0 +1,25 @@
+from llvmlite import ir
+
+I8P = ir.IntType(8).as_pointer()
+
+def libc(module: ir.Module, name: str, fnty: ir.FunctionType):
+    """Declare (once) the C library function `name`; a bitcast if it was declared with another type."""
+    fn = module.globals.get(name)
+    if fn is None: return ir.Function(module, fnty, name=name)
+    return fn if fn.function_type == fnty else fn.bitcast(fnty.as_pointer())
+
+def cstring(module: ir.Module, name: str, b: bytes):
+    """Internal constant byte string `name`, as an i8*."""
+    g = ir.GlobalVariable(module, ir.ArrayType(ir.IntType(8), len(b)), name=name)
+    g.global_constant = True; g.linkage = "internal"; g.initializer = ir.Constant(g.type.pointee, bytearray(b))
+    return g.bitcast(I8P)
+
+def add_global_dtors(module: ir.Module, fns, priority: int = 65535):
+    """Run `fns` at exit through `llvm.global_dtors`. The table is one appending
+    global, so every destructor of a module must be registered in a single call."""
+    i32 = ir.IntType(32)
+    ety = ir.LiteralStructType([i32, ir.FunctionType(ir.VoidType(), []).as_pointer(), I8P])
+    dtors = ir.GlobalVariable(module, ir.ArrayType(ety, len(fns)), name="llvm.global_dtors")
+    dtors.linkage = "appending"
+    dtors.initializer = ir.Constant(dtors.type.pointee, [ir.Constant(ety, [ir.Constant(i32, priority), fn, ir.Constant(I8P, None)])
+                                                         for fn in fns])
@@ -0,0 +1,43 @@
+import ctypes, time
+import llvmlite.binding as llvm
+from llvmlite import ir
+from .optimize import target_machine, parse, run_passes
+
+_libc = ctypes.CDLL(None)
+
+def jit_compile(module: ir.Module, opt_level: int = 2, libs=(), cpu: str = ""):
+    """JIT `module` with MCJIT and return the execution engine.
+
+    `libs` are shared libraries whose symbols (e.g. the ACS runtime) the
+    module's external declarations resolve against; libc's `printf` is
+    already visible in-process. `cpu` is as for optimize.target_machine.
+    """
+    for path in libs: llvm.load_library_permanently(path)
+    tm = target_machine(opt_level, cpu, jit=True)
+    ref = run_passes(parse(module, tm), tm, opt_level)
+    engine = llvm.create_mcjit_compiler(ref, tm)
+    engine.finalize_object(); engine.run_static_constructors()
+    return engine
+
+def call_main(engine, module: ir.Module) -> int:
+    fn = module.get_global("main")
+    rett = fn.function_type.return_type
+    addr = engine.get_function_address("main")
+    if isinstance(rett, ir.VoidType):
+        ctypes.CFUNCTYPE(None)(addr)(); code = 0
+    elif isinstance(rett, ir.IntType):
+        cty = {1: ctypes.c_bool, 32: ctypes.c_int32}.get(rett.width, ctypes.c_int64)
+        code = int(ctypes.CFUNCTYPE(cty)(addr)())
+    else:
+        raise TypeError(f"main must return void or an integer, not {rett}")
+    engine.run_static_destructors()   # e.g. the profile dump of --profile-generate
+    _libc.fflush(None)
+    return code
+
+def run(module: ir.Module, opt_level: int = 2, libs=(), cpu: str = ""):
+    """Compile and execute `main`; return (exit_code, jit_seconds, run_seconds)."""
+    t0 = time.perf_counter()
+    engine = jit_compile(module, opt_level, libs, cpu)
+    t1 = time.perf_counter()
+    code = call_main(engine, module)
+    return code, t1 - t0, time.perf_counter() - t1
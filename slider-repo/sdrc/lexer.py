@@ -1,4 +1,4 @@
-
+import gc, re, sys
 from .tokens import TokKind, Token
 
 KEYWORDS = {
@@ -16,6 +16,36 @@ KEYWORDS = {
     "say": TokKind.KW_SAY,
 }
 
+ESCAPES = {'n': '\n', 't': '\t', '"': '"', '\\': '\\'}
+
+# Blank and full-line comment lines before the first logical line, then its indent.
+_LEADING = re.compile(r'(?:[ \t]*(?:#[^\n]*)?\n)*( *)')
+# Master pattern: optional inline whitespace, then one token. A newline swallows
+# any following blank/comment lines and captures the next line's indent. Group
+# names double as TokKind names. Alternatives are ordered by frequency, except
+# that b12 must beat float, which must beat int.
+_TOKEN = re.compile(r'''
+    [ \t]*(?:
+      (?P<IDENT>[^\W\d][\w/]*)
+    | (?P<COLON>:) | (?P<COMMA>,) | (?P<LPAREN>\() | (?P<RPAREN>\))
+    | (?P<LBRACKET>\[) | (?P<RBRACKET>\]) | (?P<SEMI>;)
+    | (?P<PLUS>\+) | (?P<ARROW>->) | (?P<MINUS>-) | (?P<STAR>\*) | (?P<SLASH>/) | (?P<ASSIGN>=)
+    | (?P<NEWLINE>\n(?:[ \t]*(?:\#[^\n]*)?\n)*(?P<indent>\ *))
+    | (?P<B12>\d[\dte]*)\.?b12
+    | (?P<FLOAT>\d[\dte]*\.(?!\.)[\dte]*)
+    | (?P<INT>\d[\dte]*)
+    | (?P<STRING>"(?:[^"\\\n]|\\.)*")
+    | (?P<RANGE>\.\.)
+    | (?P<AT>@)
+    | (?P<END>(?:\#[^\n]*)?\Z)
+    | (?P<ERROR>.)
+    )''', re.VERBOSE)
+_ESCAPE = re.compile(r'\\(.)')
+_SIMPLE = {k: TokKind[k] for k in ("INT", "FLOAT", "RANGE", "COLON", "COMMA", "LPAREN", "RPAREN",
+                                    "LBRACKET", "RBRACKET", "SEMI", "PLUS", "ARROW", "MINUS", "STAR", "SLASH", "ASSIGN", "AT")}
+
+def _unescape(m): return ESCAPES.get(m.group(1), m.group(1))
+
 class Lexer:
     def __init__(self, src: str):
         self.src = src.replace('\r\n', '\n')
@@ -26,117 +56,62 @@ class Lexer:
         self.tokens = []
 
     def lex(self):
-        lines = self.src.split('\n')
-        for i, raw in enumerate(lines, start=1):
-            self._lex_line(raw, i)
-        while len(self.indent_stack) > 1:
-            self.tokens.append(Token(TokKind.DEDENT, "", self.line, self.col))
-            self.indent_stack.pop()
-        self.tokens.append(Token(TokKind.EOF, "", self.line, self.col))
+        # Tokens never form cycles; pausing the collector avoids repeated
+        # full-heap scans while a large token list is being built.
+        enabled = gc.isenabled(); gc.disable()
+        try: self.tokens = list(self.iter_tokens())
+        finally:
+            if enabled: gc.enable()
         return self.tokens
 
-    def _lex_line(self, raw: str, lineno: int):
-        if raw.strip().startswith("#"):
-            return
-
-        indent = len(raw) - len(raw.lstrip(' '))
-        stripped = raw.strip()
-        if stripped == "":
-            self.line = lineno
-            self.col = 1
-            return
-
-        if stripped:
-            if indent > self.indent_stack[-1]:
-                self.indent_stack.append(indent)
-                self.tokens.append(Token(TokKind.INDENT, "", lineno, 1))
-            while indent < self.indent_stack[-1]:
-                self.indent_stack.pop()
-                self.tokens.append(Token(TokKind.DEDENT, "", lineno, 1))
-
-        self.line = lineno
-        self.col = indent + 1
-        s = stripped
-        p = 0
-
-        def emit(kind, val=""):
-            self.tokens.append(Token(kind, val, lineno, self.col))
-
-        while p < len(s):
-            ch = s[p]
-
-            if ch.isalpha() or ch == '_' or ch == '/':
-                start = p
-                while p < len(s) and (s[p].isalnum() or s[p] in "_/"):
-                    p += 1
-                lex = s[start:p]
-                kind = KEYWORDS.get(lex, TokKind.IDENT)
-                emit(kind, lex)
-                self.col += (p - start)
-                continue
-
-            if ch.isdigit() or ch in "te":
-                start = p
-                seen_dot = False
-                while p < len(s):
-                    c = s[p]
-                    if c == '.':
-                        if p+1 < len(s) and s[p:p+3] == '..':
-                            break
-                        if seen_dot: break
-                        seen_dot = True
-                        p += 1
-                    elif c.isdigit() or c in "te":
-                        p += 1
-                    else:
-                        break
-                lexnum = s[start:p]
-                if p+3 <= len(s) and s[p:p+3] == "b12":
-                    p += 3
-                    emit(TokKind.INT, lexnum + ".b12")
-                    self.col += (p - start)
-                    continue
-                if seen_dot:
-                    emit(TokKind.FLOAT, lexnum)
-                else:
-                    emit(TokKind.INT, lexnum)
-                self.col += (p - start)
-                continue
-
-            if ch == '"':
-                start = p
-                p += 1
-                buf = []
-                while p < len(s) and s[p] != '"':
-                    if s[p] == '\\' and p+1 < len(s):
-                        esc = s[p+1]
-                        mapping = {'n':'\n','t':'\t','"':'"','\\':'\\'}
-                        buf.append(mapping.get(esc, esc))
-                        p += 2
-                    else:
-                        buf.append(s[p]); p += 1
-                if p >= len(s) or s[p] != '"':
-                    raise SyntaxError(f"Unterminated string at line {lineno}")
-                p += 1
-                emit(TokKind.STRING, ''.join(buf))
-                self.col += (p - start)
-                continue
-
-            if s.startswith("..", p):
-                emit(TokKind.RANGE, ".."); p += 2; self.col += 2; continue
-            if ch == ':': emit(TokKind.COLON, ":"); p+=1; self.col+=1; continue
-            if ch == ',': emit(TokKind.COMMA, ","); p+=1; self.col+=1; continue
-            if ch == '(': emit(TokKind.LPAREN, "("); p+=1; self.col+=1; continue
-            if ch == ')': emit(TokKind.RPAREN, ")"); p+=1; self.col+=1; continue
-            if ch == '+': emit(TokKind.PLUS, "+"); p+=1; self.col+=1; continue
-            if ch == '-': emit(TokKind.MINUS, "-"); p+=1; self.col+=1; continue
-            if ch == '*': emit(TokKind.STAR, "*"); p+=1; self.col+=1; continue
-            if ch == '/': emit(TokKind.SLASH, "/"); p+=1; self.col+=1; continue
-            if ch == '=': emit(TokKind.ASSIGN, "="); p+=1; self.col+=1; continue
-
-            if ch in ' \t':
-                p += 1; self.col += 1; continue
-
-            raise SyntaxError(f"Unexpected character '{ch}' at line {lineno}, col {self.col}")
-
-        self.tokens.append(Token(TokKind.NEWLINE, "", lineno, self.col))
+    def iter_tokens(self):
+        """Scan the whole buffer with one master regex, yielding tokens lazily.
+
+        Indentation changes are applied when the first token of a line is seen,
+        so trailing blank or comment lines never produce INDENT/DEDENT.
+        """
+        src = self.src; stack = self.indent_stack
+        m = _LEADING.match(src)
+        line = 1 + src.count('\n', 0, m.start(1)); bol = m.start(1); pending = len(m.group(1))
+        simple = _SIMPLE; keywords = KEYWORDS; intern = sys.intern
+        IDENT, INT, STRING = TokKind.IDENT, TokKind.INT, TokKind.STRING
+        NEWLINE, INDENT, DEDENT = TokKind.NEWLINE, TokKind.INDENT, TokKind.DEDENT
+        for m in _TOKEN.finditer(src, m.end()):
+            kind = m.lastgroup
+            if kind == "END":
+                if pending is None and m.group(kind):  # comments only span whole lines
+                    raise SyntaxError(f"Unexpected character '#' at line {line}, col {m.start(kind) - bol + 1}")
+                break
+            start = m.start(kind)
+            if pending is not None:
+                if pending > stack[-1]:
+                    stack.append(pending); yield Token(INDENT, "", line, 1)
+                while pending < stack[-1]:
+                    stack.pop(); yield Token(DEDENT, "", line, 1)
+                pending = None
+            if kind in simple:
+                yield Token(simple[kind], m.group(kind), line, start - bol + 1)
+            elif kind == "IDENT":
+                # interned: keywords and repeated names share one string object
+                text = intern(m.group(kind))
+                yield Token(keywords.get(text, IDENT), text, line, start - bol + 1)
+            elif kind == "NEWLINE":
+                yield Token(NEWLINE, "", line, start - bol + 1)
+                line += m.group(kind).count('\n'); bol = m.start("indent")
+                pending = m.end() - bol
+            elif kind == "B12":
+                yield Token(INT, m.group(kind) + ".b12", line, start - bol + 1)
+            elif kind == "STRING":
+                text = m.group(kind)[1:-1]
+                if '\\' in text: text = _ESCAPE.sub(_unescape, text)
+                yield Token(STRING, text, line, start - bol + 1)
+            else:
+                ch = m.group(kind)
+                if ch == '"': raise SyntaxError(f"Unterminated string at line {line}")
+                raise SyntaxError(f"Unexpected character '{ch}' at line {line}, col {start - bol + 1}")
+        if pending is None:
+            yield Token(NEWLINE, "", line, len(src) - bol + 1)
+        self.line = line; self.pos = len(src)
+        while len(stack) > 1:
+            stack.pop(); yield Token(DEDENT, "", line, 1)
+        yield Token(TokKind.EOF, "", line, 1)
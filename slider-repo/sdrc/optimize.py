@@ -0,0 +1,111 @@
+import llvmlite.binding as llvm
+from llvmlite import ir
+
+EMIT_KINDS = ("ll", "bc", "asm", "obj", "exe")   # exe: obj linked by driver.build
+_native_ready = False
+
+def init_native():
+    global _native_ready
+    if _native_ready: return
+    llvm.initialize_native_target()
+    llvm.initialize_native_asmprinter()
+    _native_ready = True
+
+def cpu_target(cpu: str = "", features: str = ""):
+    """(cpu, features) for a target machine; `native` is the host CPU with the features it has."""
+    if cpu != "native": return cpu, features
+    init_native()
+    if not features:
+        try: features = llvm.get_host_cpu_features().flatten()
+        except RuntimeError: features = ""
+    return llvm.get_host_cpu_name(), features
+
+def target_machine(opt_level: int = 2, cpu: str = "", features: str = "", jit: bool = False):
+    init_native()
+    target = llvm.Target.from_default_triple()
+    cpu, features = cpu_target(cpu, features)
+    # ahead-of-time code gets the small code model; llvmlite's default is the JIT's (large)
+    return target.create_target_machine(cpu=cpu, features=features, opt=opt_level,
+                                        reloc="pic" if not jit else "default",
+                                        codemodel="jitdefault" if jit else "default", jit=jit)
+
+def parse(module: ir.Module, tm=None, text: str = None) -> llvm.ModuleRef:
+    """Parse an llvmlite IR module (or its already serialized `text`) into a verified binding module."""
+    return parse_text(str(module) if text is None else text, module.name, tm)
+
+def parse_text(text: str, name: str, tm=None) -> llvm.ModuleRef:
+    """parse() for IR text that has no ir.Module, such as c_entry's stub."""
+    init_native()
+    ref = llvm.parse_assembly(text)
+    ref.name = name
+    if tm is not None:
+        ref.triple = tm.triple; ref.data_layout = str(tm.target_data)
+    ref.verify()
+    return ref
+
+# body of the C `main` calling Slider's (renamed) main, by that main's return type
+_ENTRY_BODY = {
+    "void": "call void @__sdr_main()\n  ret i32 0",
+    "i64":  "%r = call i64 @__sdr_main()\n  %c = trunc i64 %r to i32\n  ret i32 %c",
+    "i1":   "%r = call i1 @__sdr_main()\n  %c = zext i1 %r to i32\n  ret i32 %c",
+}
+
+def c_entry(ref: llvm.ModuleRef, tm=None) -> llvm.ModuleRef:
+    """Give an executable the `int main(void)` the C startup code calls. A main
+    returning void, i64 or bool becomes internal `__sdr_main`, called by a new main
+    that returns its value as an int (0 for void); the JIT calls main directly."""
+    try: fn = ref.get_function("main")
+    except NameError: return ref
+    ret, params = str(fn.global_value_type).split(" (", 1)
+    if fn.is_declaration or ret == "i32" or params != ")": return ref
+    body = _ENTRY_BODY.get(ret)
+    if body is None: raise TypeError(f"main must return void or an integer, not {ret}")
+    fn.name = "__sdr_main"
+    ref.link_in(parse_text(f"declare {ret} @__sdr_main()\n\ndefine i32 @main() {{\n  {body}\n}}\n", "entry", tm))
+    ref.get_function("__sdr_main").linkage = "internal"   # after linking, so the call above resolves to it
+    return ref
+
+def run_passes(ref: llvm.ModuleRef, tm, opt_level: int) -> llvm.ModuleRef:
+    """Run LLVM's default module pipeline for -O<opt_level> over `ref` in place.
+
+    -O1 keeps the cheap scalar cleanups (mem2reg/SROA, instcombine, simplifycfg);
+    -O2 adds inlining, GVN, the loop pipeline and both vectorizers; -O3 raises
+    the inliner threshold and enables the aggressive loop transforms.
+    """
+    if opt_level <= 0: return ref
+    pto = llvm.create_pipeline_tuning_options(speed_level=opt_level)
+    pto.loop_vectorization = opt_level >= 2
+    pto.slp_vectorization = opt_level >= 2
+    pto.loop_unrolling = True
+    pto.loop_interleaving = opt_level >= 2
+    pto.inlining_threshold = {1: 0, 2: 225, 3: 275}.get(opt_level, 275)
+    pb = llvm.create_pass_builder(tm, pto)
+    pb.getModulePassManager().run(ref, pb)
+    ref.verify()
+    return ref
+
+def optimize(module: ir.Module, opt_level: int = 2, tm=None):
+    """Return (ModuleRef, TargetMachine) for `module` optimized at `opt_level`."""
+    if tm is None: tm = target_machine(opt_level)
+    ref = parse(module, tm)
+    return run_passes(ref, tm, opt_level), tm
+
+def write_ir(module: ir.Module, out_path: str):
+    """Write `module` as textual IR one global at a time, the same text as
+    str(module) without ever holding all of it in memory."""
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(f'; ModuleID = "{module.name}"\ntarget triple = "{module.triple}"\n'
+                f'target datalayout = "{module.data_layout}"\n')
+        for ty in module.get_identified_types().values(): f.write("\n"); f.write(ty.get_declaration())
+        for v in module.globals.values(): f.write("\n"); f.write(str(v))
+        for line in module._get_metadata_lines(): f.write("\n"); f.write(line)
+
+def emit(ref: llvm.ModuleRef, tm, kind: str, out_path: str):
+    if kind not in EMIT_KINDS or kind == "exe": raise ValueError(f"unknown emit kind: {kind}")
+    if kind == "ll":
+        with open(out_path, "w", encoding="utf-8") as f: f.write(str(ref))
+        return
+    if kind == "bc": data = ref.as_bitcode()
+    elif kind == "asm": data = tm.emit_assembly(ref).encode("utf-8")
+    else: data = tm.emit_object(ref)
+    with open(out_path, "wb") as f: f.write(data)
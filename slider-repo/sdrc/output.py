@@ -0,0 +1,247 @@
+import sys
+from llvmlite import ir
+from .irutil import I8P, cstring, libc
+
+# `say` output, defined as internal IR in modules that use it (so .ll files still
+# run under lli or link with plain clang). Each thread assembles a line in its own
+# buffer, held in a pthread key because MCJIT cannot allocate thread_local globals:
+#   { i64 len, [BUF_SIZE x i8] data }
+# The line goes to C's stdout with one fwrite() when it ends, or earlier when the
+# next piece would overflow the buffer; what a thread leaves unfinished is written
+# when it exits (key destructor) or at program exit (global destructor). stdio does
+# the actual buffering, so say and printf output stay in program order.
+# The first say of any thread creates the key: __sdr_out_keyed goes 0 (none) -> 1
+# (being created or deleted) -> 2 (ready) by cmpxchg, so two threads printing at
+# once cannot both create it. __sdr_out_live counts the buffers threads still own;
+# the key is only deleted at exit when that count is zero, because the ACS runtime
+# detaches its workers and never joins them.
+BUF_SIZE = 8192
+# the C library's `FILE *stdout`, a macro over this global on macOS
+STDOUT = "__stdoutp" if sys.platform == "darwin" else "stdout"
+
+i32 = ir.IntType(32); i64 = ir.IntType(64); i8 = ir.IntType(8)
+VOID = ir.VoidType()
+BUF = ir.LiteralStructType([i64, ir.ArrayType(i8, BUF_SIZE)])
+BUFP = BUF.as_pointer()
+
+def _c(ty, v): return ir.Constant(ty, v)
+
+class Output:
+    """The say runtime of one module: `write`, `i64`, `f64`, `ptr`, `str` append one
+    piece at the builder's position, `end_line` after the line's final newline."""
+    def __init__(self, module: ir.Module):
+        self.module = module
+        m = module
+        self.c_fwrite = libc(m, "fwrite", ir.FunctionType(i64, [I8P, i64, i64, I8P]))
+        self.stdout = m.globals.get(STDOUT) or ir.GlobalVariable(m, I8P, name=STDOUT)
+        self.c_malloc = libc(m, "malloc", ir.FunctionType(I8P, [i64]))
+        self.c_free = libc(m, "free", ir.FunctionType(VOID, [I8P]))
+        self.c_strlen = libc(m, "strlen", ir.FunctionType(i64, [I8P]))
+        self.c_memcpy = libc(m, "memcpy", ir.FunctionType(I8P, [I8P, I8P, i64]))
+        self.c_snprintf = libc(m, "snprintf", ir.FunctionType(i32, [I8P, i64, I8P], var_arg=True))
+        # pthread_key_t is unsigned int on Linux and unsigned long on macOS: keep 8
+        # zeroed bytes and pass the key as i64 (the low half on little-endian ABIs)
+        self.c_key_create = libc(m, "pthread_key_create", ir.FunctionType(i32, [i64.as_pointer(), ir.FunctionType(VOID, [I8P]).as_pointer()]))
+        self.c_getspecific = libc(m, "pthread_getspecific", ir.FunctionType(I8P, [i64]))
+        self.c_setspecific = libc(m, "pthread_setspecific", ir.FunctionType(i32, [i64, I8P]))
+        self.c_key_delete = libc(m, "pthread_key_delete", ir.FunctionType(i32, [i64]))
+        self.c_yield = libc(m, "sched_yield", ir.FunctionType(i32, []))
+        self.key = self._global("__sdr_out_key", i64)
+        self.keyed = self._global("__sdr_out_keyed", i32)
+        self.live = self._global("__sdr_out_live", i64)
+        self.fmt_g = cstring(m, "__sdr_out_fmt_g", b"%g\0")
+        self.fmt_p = cstring(m, "__sdr_out_fmt_p", b"%p\0")
+        self.write_all = self._write_all()
+        self.flush = self._flush()
+        self.release = self._release()
+        self.get = self._get()
+        self.append = self._append()
+        self.fn_i64 = self._i64()
+        self.fn_f64 = self._fmt("__sdr_out_f64", ir.DoubleType(), self.fmt_g)
+        self.fn_ptr = self._fmt("__sdr_out_ptr", I8P, self.fmt_p)
+        self.fn_str = self._str()
+        self.fn_eol = self._eol()
+        self.exit_fn = self._exit()
+
+    # --- call sites --------------------------------------------------------
+
+    def write(self, b: ir.IRBuilder, ptr, n: int):
+        b.call(self.append, [ptr, _c(i64, n)])
+
+    def i64(self, b, v): b.call(self.fn_i64, [v])
+    def f64(self, b, v): b.call(self.fn_f64, [v])
+    def ptr(self, b, v): b.call(self.fn_ptr, [v])
+    def str(self, b, v): b.call(self.fn_str, [v])
+    def end_line(self, b): b.call(self.fn_eol, [])
+
+    # --- definitions -------------------------------------------------------
+
+    def _global(self, name, ty):
+        g = ir.GlobalVariable(self.module, ty, name=name)
+        g.linkage = "internal"; g.initializer = _c(ty, 0)
+        return g
+
+    def _fn(self, name, ret, params):
+        fn = ir.Function(self.module, ir.FunctionType(ret, params), name=name)
+        fn.linkage = "internal"
+        return fn, ir.IRBuilder(fn.append_basic_block("entry"))
+
+    def _write_all(self):
+        """fwrite the n bytes at p to stdout (errors are stdio's to report)."""
+        fn, b = self._fn("__sdr_out_write_all", VOID, [I8P, i64])
+        p, n = fn.args
+        b.call(self.c_fwrite, [p, _c(i64, 1), n, b.load(self.stdout)]); b.ret_void()
+        return fn
+
+    def _field(self, b, buf, i):
+        return b.gep(buf, [_c(i32, 0), _c(i32, i)], inbounds=True)
+
+    def _data(self, b, buf, off):
+        return b.gep(buf, [_c(i32, 0), _c(i32, 1), off], inbounds=True)
+
+    def _flush(self):
+        fn, b = self._fn("__sdr_out_flush", VOID, [BUFP])
+        buf, = fn.args
+        lenp = self._field(b, buf, 0)
+        b.call(self.write_all, [self._data(b, buf, _c(i64, 0)), b.load(lenp)])
+        b.store(_c(i64, 0), lenp); b.ret_void()
+        return fn
+
+    def _release(self):
+        """Key destructor: flush and free the buffer of an exiting thread."""
+        fn, b = self._fn("__sdr_out_release", VOID, [I8P])
+        b.call(self.flush, [b.bitcast(fn.args[0], BUFP)]); b.call(self.c_free, [fn.args[0]])
+        b.atomic_rmw("sub", self.live, _c(i64, 1), "acq_rel"); b.ret_void()
+        return fn
+
+    def _state(self, b):
+        return b.load_atomic(self.keyed, "acquire", 4)
+
+    def _claim(self, b, old):
+        """cmpxchg the key state from `old` to 1 (busy); true if this thread won."""
+        r = b.cmpxchg(self.keyed, _c(i32, old), _c(i32, 1), "acq_rel", "acquire")
+        return b.extract_value(r, 1)
+
+    def _get(self):
+        """This thread's buffer, creating the key and the buffer on first use. A
+        thread that loses the race to create the key yields until it is ready."""
+        fn, b = self._fn("__sdr_out_get", BUFP, [])
+        start = fn.append_basic_block("start"); claim = fn.append_basic_block("claim")
+        mk_key = fn.append_basic_block("key"); wait = fn.append_basic_block("wait")
+        lookup = fn.append_basic_block("lookup")
+        alloc = fn.append_basic_block("alloc"); found = fn.append_basic_block("found")
+        b.branch(start)
+        b.position_at_end(start)
+        b.cbranch(b.icmp_signed("==", self._state(b), _c(i32, 2)), lookup, claim)
+        b.position_at_end(claim)
+        b.cbranch(self._claim(b, 0), mk_key, wait)
+        b.position_at_end(mk_key)
+        b.call(self.c_key_create, [self.key, self.release])
+        b.store_atomic(_c(i32, 2), self.keyed, "release", 4); b.branch(lookup)
+        b.position_at_end(wait)
+        b.call(self.c_yield, []); b.branch(start)
+        b.position_at_end(lookup)
+        p = b.call(self.c_getspecific, [b.load(self.key)])
+        b.cbranch(b.icmp_unsigned("==", p, _c(I8P, None)), alloc, found)
+        b.position_at_end(alloc)
+        size = b.ptrtoint(b.gep(_c(BUFP, None), [_c(i32, 1)]), i64)
+        q = b.call(self.c_malloc, [size]); buf = b.bitcast(q, BUFP)
+        b.store(_c(i64, 0), self._field(b, buf, 0))
+        b.atomic_rmw("add", self.live, _c(i64, 1), "acq_rel")
+        b.call(self.c_setspecific, [b.load(self.key), q]); b.ret(buf)
+        b.position_at_end(found); b.ret(b.bitcast(p, BUFP))
+        return fn
+
+    def _append(self):
+        fn, b = self._fn("__sdr_out_append", VOID, [I8P, i64])
+        s, n = fn.args
+        buf = b.call(self.get, []); lenp = self._field(b, buf, 0)
+        full = fn.append_basic_block("full"); big = fn.append_basic_block("big"); copy = fn.append_basic_block("copy")
+        b.cbranch(b.icmp_unsigned(">", b.add(b.load(lenp), n), _c(i64, BUF_SIZE)), full, copy)
+        b.position_at_end(full)
+        b.call(self.flush, [buf])
+        b.cbranch(b.icmp_unsigned(">", n, _c(i64, BUF_SIZE)), big, copy)
+        b.position_at_end(big)
+        b.call(self.write_all, [s, n]); b.ret_void()
+        b.position_at_end(copy)
+        n0 = b.load(lenp)
+        b.call(self.c_memcpy, [self._data(b, buf, n0), s, n])
+        b.store(b.add(n0, n), lenp); b.ret_void()
+        return fn
+
+    def _i64(self):
+        """Decimal digits right to left into a 20-byte scratch buffer."""
+        fn, b = self._fn("__sdr_out_i64", VOID, [i64])
+        v, = fn.args
+        tmp = b.alloca(ir.ArrayType(i8, 20))
+        neg = b.icmp_signed("<", v, _c(i64, 0))
+        u0 = b.select(neg, b.sub(_c(i64, 0), v), v)      # as unsigned, so INT64_MIN works
+        entry = b.block; loop = fn.append_basic_block("digit"); done = fn.append_basic_block("sign")
+        b.branch(loop)
+        b.position_at_end(loop)
+        u = b.phi(i64); i = b.phi(i64); u.add_incoming(u0, entry); i.add_incoming(_c(i64, 20), entry)
+        i1 = b.sub(i, _c(i64, 1))
+        d = b.trunc(b.urem(u, _c(i64, 10)), i8)
+        b.store(b.add(d, _c(i8, ord("0"))), b.gep(tmp, [_c(i64, 0), i1], inbounds=True))
+        u1 = b.udiv(u, _c(i64, 10))
+        u.add_incoming(u1, loop); i.add_incoming(i1, loop)
+        b.cbranch(b.icmp_unsigned("!=", u1, _c(i64, 0)), loop, done)
+        b.position_at_end(done)
+        # at most 19 digits, so the byte before them always exists; it is only
+        # part of the output when the value is negative
+        before = b.sub(i1, _c(i64, 1))
+        b.store(_c(i8, ord("-")), b.gep(tmp, [_c(i64, 0), before], inbounds=True))
+        start = b.select(neg, before, i1)
+        b.call(self.append, [b.gep(tmp, [_c(i64, 0), start], inbounds=True), b.sub(_c(i64, 20), start)])
+        b.ret_void()
+        return fn
+
+    def _fmt(self, name, ty, fmt):
+        """snprintf one value with `fmt` into a scratch buffer and append it."""
+        fn, b = self._fn(name, VOID, [ty])
+        tmp = b.gep(b.alloca(ir.ArrayType(i8, 32)), [_c(i32, 0), _c(i32, 0)], inbounds=True)
+        n = b.sext(b.call(self.c_snprintf, [tmp, _c(i64, 32), fmt, fn.args[0]]), i64)
+        n = b.select(b.icmp_signed(">", n, _c(i64, 31)), _c(i64, 31), n)
+        n = b.select(b.icmp_signed("<", n, _c(i64, 0)), _c(i64, 0), n)
+        b.call(self.append, [tmp, n]); b.ret_void()
+        return fn
+
+    def _str(self):
+        fn, b = self._fn("__sdr_out_str", VOID, [I8P])
+        s, = fn.args
+        b.call(self.append, [s, b.call(self.c_strlen, [s])]); b.ret_void()
+        return fn
+
+    def _eol(self):
+        fn, b = self._fn("__sdr_out_eol", VOID, [])
+        b.call(self.flush, [b.call(self.get, [])]); b.ret_void()
+        return fn
+
+    def _exit(self):
+        """Global destructor: flush and free the exiting thread's buffer (exit() skips
+        key destructors). The key is deleted only when no other thread owns a buffer,
+        so a JIT host does not leak one per program run; while a detached worker
+        still holds one, its destructor needs the key and it is kept."""
+        fn, b = self._fn("__sdr_out_exit", VOID, [])
+        has = fn.append_basic_block("keyed"); flush = fn.append_basic_block("flush")
+        idle = fn.append_basic_block("idle"); drop = fn.append_basic_block("drop")
+        done = fn.append_basic_block("done")
+        b.cbranch(b.icmp_signed("==", self._state(b), _c(i32, 2)), has, done)
+        b.position_at_end(has)
+        key = b.load(self.key)
+        p = b.call(self.c_getspecific, [key])
+        b.cbranch(b.icmp_unsigned("==", p, _c(I8P, None)), idle, flush)
+        b.position_at_end(flush)
+        b.call(self.release, [p]); b.call(self.c_setspecific, [key, _c(I8P, None)]); b.branch(idle)
+        b.position_at_end(idle)
+        live = b.load_atomic(self.live, "acquire", 8)
+        b.cbranch(b.icmp_signed("==", live, _c(i64, 0)), drop, done)
+        b.position_at_end(drop)
+        won = self._claim(b, 2)
+        delete = fn.append_basic_block("delete")
+        b.cbranch(won, delete, done)
+        b.position_at_end(delete)
+        b.call(self.c_key_delete, [key])
+        b.store_atomic(_c(i32, 0), self.keyed, "release", 4); b.branch(done)
+        b.position_at_end(done); b.ret_void()
+        return fn
@@ -1,60 +1,75 @@
 
-from typing import List, Optional, Tuple
-from .tokens import TokKind, Token
+from typing import Iterable, List, Optional, Tuple
+from .tokens import K, TokKind, Token
+from .typesys import parse_base12_int
 from . import ast as A
 
+# name -> whether it takes a count: @vec / @vec(n), @unroll / @unroll(n), @nounroll, @noalias
+LOOP_ATTRS = {"vec": True, "unroll": True, "nounroll": False, "noalias": False}
+ARRAY_ELEMS = ("i64", "f64")
+
 class Parser:
-    def __init__(self, tokens: List[Token]):
-        self.toks = tokens
-        self.i = 0
+    """Recursive-descent parser with one token of lookahead.
+
+    `tokens` may be a list or a lazy iterator such as `Lexer.iter_tokens()`;
+    once EOF is reached it is returned for every further lookahead.
+    """
+    def __init__(self, tokens: Iterable[Token]):
+        self._next = iter(tokens).__next__
+        self.tok = self._next()
 
-    def cur(self) -> Token: return self.toks[self.i]
+    def cur(self) -> Token: return self.tok
+
+    def _advance(self):
+        if self.tok.kind is not K.EOF: self.tok = self._next()
 
     def eat(self, kind: TokKind) -> Token:
-        t = self.cur()
-        if t.kind != kind:
+        t = self.tok
+        if t.kind is not kind:
             raise SyntaxError(f"Expected {kind.name}, got {t.kind.name} at line {t.line}")
-        self.i += 1
+        self._advance()
         return t
 
     def match(self, kind: TokKind) -> bool:
-        if self.cur().kind == kind:
-            self.i += 1
+        if self.tok.kind is kind:
+            self._advance()
             return True
         return False
 
     def parse(self) -> A.Module:
         package = None; uses = []; funcs = []
-        if self.cur().kind == TokKind.KW_PACKAGE:
-            self.eat(TokKind.KW_PACKAGE)
-            name = self.eat(TokKind.IDENT).value
+        if self.cur().kind is K.KW_PACKAGE:
+            self.eat(K.KW_PACKAGE)
+            name = self.eat(K.IDENT).value
             self._newline_optional()
             package = A.Package(name)
-        while self.cur().kind == TokKind.KW_USE:
-            self.eat(TokKind.KW_USE)
-            path = self.eat(TokKind.IDENT).value
+        while self.cur().kind is K.KW_USE:
+            self.eat(K.KW_USE)
+            path = self.eat(K.IDENT).value
             uses.append(path); self._newline_required()
-        while self.cur().kind != TokKind.EOF:
+        while self.cur().kind is not K.EOF:
             funcs.append(self.parse_func())
         return A.Module(package, uses, funcs)
 
     def parse_func(self) -> A.Func:
-        self.eat(TokKind.KW_FN)
-        name = self.eat(TokKind.IDENT).value
-        self.eat(TokKind.LPAREN)
+        self.eat(K.KW_FN)
+        name = self.eat(K.IDENT).value
+        self.eat(K.LPAREN)
         params = []
-        if self.cur().kind != TokKind.RPAREN:
+        if self.cur().kind is not K.RPAREN:
             while True:
-                pname = self.eat(TokKind.IDENT).value
+                pname = self.eat(K.IDENT).value
                 ptype = None
-                if self.match(TokKind.COLON):
-                    ptype = self.eat(TokKind.IDENT).value
+                if self.match(K.COLON):
+                    ptype = self.parse_type()
                 params.append((pname, ptype))
-                if self.match(TokKind.COMMA): continue
+                if self.match(K.COMMA): continue
                 break
-        self.eat(TokKind.RPAREN)
+        self.eat(K.RPAREN)
         ret_type = None
-        self.eat(TokKind.COLON)
+        if self.match(K.ARROW):
+            ret_type = self.parse_type()
+        self.eat(K.COLON)
         self._expect_indent()
         body = self.parse_block()
         return A.Func(name, params, ret_type, body)
@@ -63,99 +78,151 @@ class Parser:
         out = []
         while True:
             k = self.cur().kind
-            if k == TokKind.DEDENT:
-                self.eat(TokKind.DEDENT); break
+            if k is K.DEDENT:
+                self.eat(K.DEDENT); break
             out.append(self.parse_stmt())
         return out
 
     def parse_stmt(self):
         k = self.cur().kind
-        if k == TokKind.KW_LET:
-            self.eat(TokKind.KW_LET)
-            name = self.eat(TokKind.IDENT).value
+        if k is K.AT:
+            line = self.cur().line; attrs = self.parse_loop_attrs()
+            st = self.parse_stmt()
+            if not isinstance(st, (A.While, A.ForRange)):
+                raise SyntaxError(f"Loop attributes must precede a for or while loop at line {line}")
+            st.attrs = attrs; return st
+        if k is K.KW_LET:
+            self.eat(K.KW_LET)
+            name = self.eat(K.IDENT).value
             typ = None
-            if self.match(TokKind.COLON):
-                typ = self.eat(TokKind.IDENT).value
-            self.eat(TokKind.ASSIGN)
+            if self.match(K.COLON):
+                typ = self.parse_type()
+            self.eat(K.ASSIGN)
             expr = self.parse_expr()
             self._newline_required()
             return A.Let(name, typ, expr)
-        if k == TokKind.KW_VAR:
-            self.eat(TokKind.KW_VAR)
-            name = self.eat(TokKind.IDENT).value
+        if k is K.KW_VAR:
+            self.eat(K.KW_VAR)
+            name = self.eat(K.IDENT).value
             typ = None
-            if self.match(TokKind.COLON):
-                typ = self.eat(TokKind.IDENT).value
-            self.eat(TokKind.ASSIGN)
+            if self.match(K.COLON):
+                typ = self.parse_type()
+            self.eat(K.ASSIGN)
             expr = self.parse_expr()
             self._newline_required()
             return A.Var(name, typ, expr)
-        if k == TokKind.KW_RETURN:
-            self.eat(TokKind.KW_RETURN)
-            expr = None if self.cur().kind in (TokKind.NEWLINE, TokKind.DEDENT) else self.parse_expr()
+        if k is K.KW_RETURN:
+            self.eat(K.KW_RETURN)
+            expr = None if self.cur().kind in (K.NEWLINE, K.DEDENT) else self.parse_expr()
             self._newline_required()
             return A.Return(expr)
-        if k == TokKind.KW_IF:
-            self.eat(TokKind.KW_IF); cond = self.parse_expr()
-            self.eat(TokKind.COLON); self._expect_indent()
+        if k is K.KW_IF:
+            self.eat(K.KW_IF); cond = self.parse_expr()
+            self.eat(K.COLON); self._expect_indent()
             thenb = self.parse_block(); elseb = []
-            if self.cur().kind == TokKind.KW_ELSE:
-                self.eat(TokKind.KW_ELSE); self.eat(TokKind.COLON); self._expect_indent()
+            if self.cur().kind is K.KW_ELSE:
+                self.eat(K.KW_ELSE); self.eat(K.COLON); self._expect_indent()
                 elseb = self.parse_block()
             return A.If(cond, thenb, elseb)
-        if k == TokKind.KW_WHILE:
-            self.eat(TokKind.KW_WHILE); cond = self.parse_expr()
-            self.eat(TokKind.COLON); self._expect_indent()
+        if k is K.KW_WHILE:
+            self.eat(K.KW_WHILE); cond = self.parse_expr()
+            self.eat(K.COLON); self._expect_indent()
             body = self.parse_block(); return A.While(cond, body)
-        if k == TokKind.KW_FOR:
-            self.eat(TokKind.KW_FOR); var = self.eat(TokKind.IDENT).value
-            self.eat(TokKind.KW_IN); start = self.parse_expr(); self.eat(TokKind.RANGE); end = self.parse_expr()
-            self.eat(TokKind.COLON); self._expect_indent(); body = self.parse_block()
+        if k is K.KW_FOR:
+            self.eat(K.KW_FOR); var = self.eat(K.IDENT).value
+            self.eat(K.KW_IN); start = self.parse_expr(); self.eat(K.RANGE); end = self.parse_expr()
+            self.eat(K.COLON); self._expect_indent(); body = self.parse_block()
             return A.ForRange(var, start, end, body)
-        expr = self.parse_expr(); self._newline_required(); return A.ExprStmt(expr)
+        expr = self.parse_expr()
+        if self.cur().kind is K.ASSIGN:
+            line = self.cur().line; self.eat(K.ASSIGN); value = self.parse_expr(); self._newline_required()
+            if isinstance(expr, A.Index): return A.IndexAssign(expr, value)
+            if isinstance(expr, A.Name): return A.Assign(expr.id, value)
+            raise SyntaxError(f"Cannot assign to this expression at line {line}")
+        self._newline_required(); return A.ExprStmt(expr)
+
+    def parse_type(self) -> str:
+        """A type name, or `[T]` for an array of T."""
+        if self.match(K.LBRACKET):
+            name = self.eat(K.IDENT).value; self.eat(K.RBRACKET)
+            return f"[{name}]"
+        return self.eat(K.IDENT).value
+
+    def parse_loop_attrs(self):
+        attrs = []
+        while self.match(K.AT):
+            t = self.eat(K.IDENT); arg = None
+            if t.value not in LOOP_ATTRS:
+                raise SyntaxError(f"Unknown loop attribute @{t.value} at line {t.line}")
+            if LOOP_ATTRS[t.value] and self.match(K.LPAREN):
+                arg = parse_base12_int(self.eat(K.INT).value); self.eat(K.RPAREN)
+                if arg < 1: raise SyntaxError(f"@{t.value} count must be positive at line {t.line}")
+            attrs.append((t.value, arg))
+        self._newline_optional()
+        return attrs
 
     def parse_expr(self):
         left = self.parse_term()
-        while self.cur().kind in (TokKind.PLUS, TokKind.MINUS):
+        while self.cur().kind in (K.PLUS, K.MINUS):
             op = self.eat(self.cur().kind).value; right = self.parse_term()
             left = A.BinOp(op, left, right)
         return left
 
     def parse_term(self):
         left = self.parse_factor()
-        while self.cur().kind in (TokKind.STAR, TokKind.SLASH):
+        while self.cur().kind in (K.STAR, K.SLASH):
             op = self.eat(self.cur().kind).value; right = self.parse_factor()
             left = A.BinOp(op, left, right)
         return left
 
     def parse_factor(self):
         t = self.cur()
-        if t.kind == TokKind.INT: self.eat(TokKind.INT); return A.IntLit(t.value)
-        if t.kind == TokKind.FLOAT: self.eat(TokKind.FLOAT); return A.FloatLit(t.value)
-        if t.kind == TokKind.STRING: self.eat(TokKind.STRING); return A.StringLit(t.value)
-        if t.kind == TokKind.IDENT:
-            self.eat(TokKind.IDENT); base = A.Name(t.value)
-            if self.cur().kind == TokKind.LPAREN:
-                self.eat(TokKind.LPAREN); args=[]
-                if self.cur().kind != TokKind.RPAREN:
+        if t.kind is K.INT: self.eat(K.INT); return A.IntLit(t.value)
+        if t.kind is K.FLOAT: self.eat(K.FLOAT); return A.FloatLit(t.value)
+        if t.kind is K.STRING: self.eat(K.STRING); return A.StringLit(t.value)
+        if t.kind is K.LBRACKET: base = self.parse_array()
+        elif t.kind is K.IDENT or t.kind is K.KW_SAY:
+            self.eat(t.kind); base = A.Name(t.value)
+            if self.cur().kind is K.LPAREN:
+                self.eat(K.LPAREN); args=[]
+                if self.cur().kind is not K.RPAREN:
                     while True:
                         args.append(self.parse_expr())
-                        if self.match(TokKind.COMMA): continue
+                        if self.match(K.COMMA): continue
                         break
-                self.eat(TokKind.RPAREN); return A.Call(base, args)
-            return base
-        raise SyntaxError(f"Unexpected token {t.kind.name} at line {t.line}")
+                self.eat(K.RPAREN); base = A.Call(base, args)
+        else: raise SyntaxError(f"Unexpected token {t.kind.name} at line {t.line}")
+        while self.match(K.LBRACKET):
+            index = self.parse_expr(); self.eat(K.RBRACKET); base = A.Index(base, index)
+        return base
+
+    def parse_array(self):
+        """`[a, b, ...]`, `[value; count]` or `[i64](n)` / `[f64](n)`."""
+        self.eat(K.LBRACKET)
+        if self.match(K.RBRACKET): return A.ArrayLit([])
+        first = self.parse_expr()
+        if self.match(K.SEMI):
+            count = self.eat(K.INT).value; self.eat(K.RBRACKET)
+            return A.ArrayRepeat(first, count)
+        elems = [first]
+        while self.match(K.COMMA): elems.append(self.parse_expr())
+        self.eat(K.RBRACKET)
+        if len(elems) == 1 and isinstance(first, A.Name) and first.id in ARRAY_ELEMS and self.match(K.LPAREN):
+            count = self.parse_expr(); self.eat(K.RPAREN)
+            return A.ArrayNew(first.id, count)
+        return A.ArrayLit(elems)
 
     def _newline_required(self):
-        if self.cur().kind != TokKind.NEWLINE:
+        if self.cur().kind is not K.NEWLINE:
             raise SyntaxError(f"Expected NEWLINE at line {self.cur().line}")
-        while self.cur().kind == TokKind.NEWLINE:
-            self.eat(TokKind.NEWLINE)
+        while self.cur().kind is K.NEWLINE:
+            self.eat(K.NEWLINE)
 
     def _newline_optional(self):
-        while self.cur().kind == TokKind.NEWLINE:
-            self.eat(TokKind.NEWLINE)
+        while self.cur().kind is K.NEWLINE:
+            self.eat(K.NEWLINE)
 
     def _expect_indent(self):
-        if not self.match(TokKind.INDENT):
+        self._newline_optional()
+        if not self.match(K.INDENT):
             raise SyntaxError(f"Expected INDENT at line {self.cur().line}")
@@ -0,0 +1,154 @@
+import hashlib, struct
+from llvmlite import ir
+from . import ast as A
+from .irutil import cstring, libc
+
+# .sdrprof layout (little-endian):
+#   header   "SDRPROF1", u32 function count, u32 counter count
+#   per fn   u64 name hash, u64 shape hash, u32 first counter, u32 counter count
+#   counters u64 each
+MAGIC = b"SDRPROF1"
+_HDR = struct.Struct("<8sII")
+_FN = struct.Struct("<QQII")
+_CNT = struct.Struct("<Q")
+DEFAULT_PATH = "default.sdrprof"
+ENV_PATH = "SDR_PROF_FILE"
+
+# Percentile cutoffs (parts per million of all counted events) of LLVM's detailed profile summary.
+CUTOFFS = (10000, 100000, 200000, 300000, 400000, 500000, 600000, 700000, 800000, 900000,
+           950000, 990000, 999000, 999900, 999990, 999999)
+HOT_CUTOFF = 990000
+
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.sha256(s.encode()).digest()[:8], "little")
+
+def branch_sites(body) -> str:
+    """One letter per if/while/for in `body`, in the pre-order IRGen visits them."""
+    out = []
+    def walk(stmts):
+        for st in stmts:
+            if isinstance(st, A.If): out.append("i"); walk(st.then_body); walk(st.else_body)
+            elif isinstance(st, A.While): out.append("w"); walk(st.body)
+            elif isinstance(st, A.ForRange): out.append("f"); walk(st.body)
+    walk(body)
+    return "".join(out)
+
+class Layout:
+    """Counter layout of a module: per function one entry counter, then two per
+    branch site (then/else of an `if`, body/exit of a loop).
+
+    The shape hash covers the arity and site sequence, so a profile recorded
+    before a function's control flow changed is detected as stale.
+    """
+    def __init__(self, mod: A.Module):
+        self.funcs = {}      # name -> (first counter, counter count, shape hash)
+        n = 0
+        for f in mod.funcs:
+            sites = branch_sites(f.body); k = 1 + 2 * len(sites)
+            self.funcs[f.name] = (n, k, _h64(f"{len(f.params)}:{sites}"))
+            n += k
+        self.ncounters = n
+
+    def header(self) -> bytes:
+        out = [_HDR.pack(MAGIC, len(self.funcs), self.ncounters)]
+        for name, (first, k, shape) in self.funcs.items():
+            out.append(_FN.pack(_h64(name), shape, first, k))
+        return b"".join(out)
+
+class Profile:
+    """Counts read from one or more .sdrprof files (summed per function)."""
+    def __init__(self):
+        self.funcs = {}      # name hash -> (shape hash, counts)
+
+    @classmethod
+    def load(cls, *paths) -> "Profile":
+        prof = cls()
+        for path in paths:
+            with open(path, "rb") as f: data = f.read()
+            if len(data) < _HDR.size: raise ValueError(f"{path}: truncated profile")
+            magic, nfuncs, ncounters = _HDR.unpack_from(data)
+            if magic != MAGIC: raise ValueError(f"{path}: not an sdrc profile")
+            base = _HDR.size + nfuncs * _FN.size
+            if len(data) != base + ncounters * _CNT.size: raise ValueError(f"{path}: truncated profile")
+            counters = struct.unpack_from(f"<{ncounters}Q", data, base)
+            for i in range(nfuncs):
+                name, shape, first, k = _FN.unpack_from(data, _HDR.size + i * _FN.size)
+                counts = list(counters[first:first + k])
+                prev = prof.funcs.get(name)
+                if prev is not None and prev[0] == shape:
+                    counts = [a + b for a, b in zip(prev[1], counts)]
+                prof.funcs[name] = (shape, counts)
+        return prof
+
+    def counts(self, name: str, shape: int):
+        """Counts for function `name`, or None if it was not profiled or its shape changed."""
+        rec = self.funcs.get(_h64(name))
+        return rec[1] if rec is not None and rec[0] == shape else None
+
+    def summary(self):
+        """(total, max, entry max, detailed) in the form of LLVM's ProfileSummary;
+        detailed holds (cutoff, min count, number of counts) per CUTOFFS entry."""
+        counts = sorted((c for _, cs in self.funcs.values() for c in cs if c), reverse=True)
+        total = sum(counts); detailed = []
+        acc = 0; i = 0
+        for cutoff in CUTOFFS:
+            need = total * cutoff // 1000000
+            while i < len(counts) and acc < need: acc += counts[i]; i += 1
+            if i: detailed.append((cutoff, counts[i - 1], i))
+        entry_max = max((cs[0] for _, cs in self.funcs.values()), default=0)
+        return total, counts[0] if counts else 0, entry_max, detailed
+
+    def hot_threshold(self) -> int:
+        """Minimum count of the hottest blocks covering HOT_CUTOFF of all events (0 if none)."""
+        for cutoff, min_count, _n in self.summary()[3]:
+            if cutoff == HOT_CUTOFF: return min_count
+        return 0
+
+def branch_weights(module: ir.Module, taken: int, not_taken: int):
+    """`!prof` branch_weights node, scaled down to fit LLVM's i32 weights."""
+    scale = max(taken, not_taken) // 0xFFFFFFFF + 1
+    i32 = ir.IntType(32)
+    return module.add_metadata(["branch_weights", ir.Constant(i32, taken // scale),
+                                ir.Constant(i32, not_taken // scale)])
+
+def add_summary(module: ir.Module, prof: Profile, nfuncs: int):
+    """Attach the `ProfileSummary` module flag, which lets LLVM's hot/cold analysis
+    (inliner thresholds, .text.hot/.text.unlikely placement) trust the entry counts."""
+    total, max_count, entry_max, detailed = prof.summary()
+    md = module.add_metadata; i32 = ir.IntType(32); i64 = ir.IntType(64)
+    ncounts = sum(len(cs) for _, cs in prof.funcs.values())
+    fields = [md(["ProfileFormat", "InstrProf"]), md(["TotalCount", ir.Constant(i64, total)]),
+              md(["MaxCount", ir.Constant(i64, max_count)]),
+              md(["MaxInternalCount", ir.Constant(i64, max_count)]),
+              md(["MaxFunctionCount", ir.Constant(i64, entry_max)]),
+              md(["NumCounts", ir.Constant(i64, ncounts)]),
+              md(["NumFunctions", ir.Constant(i64, nfuncs)]),
+              md(["DetailedSummary", md([md([ir.Constant(i32, c), ir.Constant(i64, m), ir.Constant(i32, n)])
+                                         for c, m, n in detailed])])]
+    module.add_named_metadata("llvm.module.flags", [ir.Constant(i32, 1), "ProfileSummary", md(fields)])
+
+def add_dump(module: ir.Module, layout: Layout, counters: ir.GlobalVariable, path: str) -> ir.Function:
+    """Define `__sdr_prof_dump`, which writes the header and counters to
+    $SDR_PROF_FILE or `path`; the caller registers it as a global destructor."""
+    i8p = ir.IntType(8).as_pointer(); i32 = ir.IntType(32); i64 = ir.IntType(64)
+    cstr = lambda name, b: cstring(module, name, b)
+    getenv = libc(module, "getenv", ir.FunctionType(i8p, [i8p]))
+    fopen = libc(module, "fopen", ir.FunctionType(i8p, [i8p, i8p]))
+    fwrite = libc(module, "fwrite", ir.FunctionType(i64, [i8p, i64, i64, i8p]))
+    fclose = libc(module, "fclose", ir.FunctionType(i32, [i8p]))
+    header = layout.header()
+    fn = ir.Function(module, ir.FunctionType(ir.VoidType(), []), name="__sdr_prof_dump")
+    fn.linkage = "internal"
+    b = ir.IRBuilder(fn.append_basic_block("entry"))
+    env = b.call(getenv, [cstr("__sdr_prof_env", ENV_PATH.encode() + b"\0")])
+    p = b.select(b.icmp_unsigned("==", env, ir.Constant(i8p, None)),
+                 cstr("__sdr_prof_path", path.encode() + b"\0"), env)
+    fp = b.call(fopen, [p, cstr("__sdr_prof_mode", b"wb\0")])
+    write_bb = fn.append_basic_block("write"); done_bb = fn.append_basic_block("done")
+    b.cbranch(b.icmp_unsigned("==", fp, ir.Constant(i8p, None)), done_bb, write_bb)
+    b.position_at_end(write_bb)
+    b.call(fwrite, [cstr("__sdr_prof_header", header), ir.Constant(i64, 1), ir.Constant(i64, len(header)), fp])
+    b.call(fwrite, [b.bitcast(counters, i8p), ir.Constant(i64, 8), ir.Constant(i64, layout.ncounters), fp])
+    b.call(fclose, [fp]); b.branch(done_bb)
+    b.position_at_end(done_bb); b.ret_void()
+    return fn
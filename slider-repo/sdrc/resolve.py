@@ -0,0 +1,98 @@
+from . import ast as A
+from .checksum import CHECKSUMS
+from .intrinsics import INTRINSICS
+from .typecheck import ARRAY_BUILTINS, CASTS, LIBC_EXTERNS
+from .typesys import is_array, ty_from_name
+
+class Resolver:
+    """Bind every name to what it refers to after type checking, so IRGen looks
+    nothing up by name.
+
+    A function's locals get stack slot indexes, parameters first and then in
+    order of first binding, with their types in `Func.slots`; each Name, Let,
+    Var, Assign and ForRange gets the `slot` it reads or writes. Each Call gets
+    a `kind`: "say", "array" (len/free of an array), "cast", "checksum",
+    "intrinsic" (see intrinsics.py), "func" or "extern", and for the last two
+    `sym`, the callee's index in `Module.funcs` or in `Module.externs`, the
+    module's one table of external callees in order of first call.
+
+    `externs` are C signatures as for TypeChecker; other externs are declared
+    with the types their first call was checked with. A name read before any
+    binding of it raises NameError here rather than during code generation.
+    """
+    def __init__(self, externs=None):
+        self.decls = {**LIBC_EXTERNS, **(externs or {})}
+        self.slots = 0; self.table = []
+
+    def run(self, mod: A.Module) -> A.Module:
+        self.funcs = {f.name: i for i, f in enumerate(mod.funcs)}
+        self.externs = {}; self.table = []   # name -> index in table
+        for f in mod.funcs: self.func(f)
+        mod.externs = self.table
+        return mod
+
+    def err(self, msg): return NameError(f"in fn {self.fn.name}: {msg}")
+
+    def func(self, f: A.Func):
+        self.fn = f; self.env = {}; f.slots = []
+        for n, t in f.params: self.bind(n, ty_from_name(t))
+        self.block(f.body)
+        self.slots += len(f.slots)
+
+    def bind(self, name, ty) -> int:
+        i = self.env.get(name)
+        if i is None:
+            i = self.env[name] = len(self.fn.slots); self.fn.slots.append((name, ty))
+        return i
+
+    def lookup(self, name) -> int:
+        i = self.env.get(name)
+        if i is None: raise self.err(f"undefined name {name}")
+        return i
+
+    def block(self, stmts):
+        for st in stmts:
+            if isinstance(st, (A.Let, A.Var)):
+                self.expr(st.expr); st.slot = self.bind(st.name, ty_from_name(st.type_name))
+            elif isinstance(st, A.Assign): self.expr(st.expr); st.slot = self.lookup(st.name)
+            elif isinstance(st, A.IndexAssign): self.expr(st.target); self.expr(st.expr)
+            elif isinstance(st, (A.Return, A.ExprStmt)):
+                if st.expr is not None: self.expr(st.expr)
+            elif isinstance(st, A.If): self.expr(st.cond); self.block(st.then_body); self.block(st.else_body)
+            elif isinstance(st, A.While): self.expr(st.cond); self.block(st.body)
+            elif isinstance(st, A.ForRange):
+                self.expr(st.start); self.expr(st.end)
+                st.slot = self.bind(st.var, st.start.ty); self.block(st.body)
+            else: raise NotImplementedError(type(st))
+
+    def expr(self, e):
+        if isinstance(e, A.Name): e.slot = self.lookup(e.id)
+        elif isinstance(e, A.BinOp): self.expr(e.left); self.expr(e.right)
+        elif isinstance(e, A.Call):
+            for a in e.args: self.expr(a)
+            self.call(e)
+        elif isinstance(e, A.Index): self.expr(e.base); self.expr(e.index)
+        elif isinstance(e, A.ArrayLit):
+            for x in e.elems: self.expr(x)
+        elif isinstance(e, A.ArrayRepeat): self.expr(e.value)
+        elif isinstance(e, A.ArrayNew): self.expr(e.count)
+
+    def call(self, e: A.Call):
+        # the same precedence as TypeChecker: the module's own functions shadow every
+        # builtin but `say`, and intrinsics are only inlined when not defined here
+        name = e.func.id; own = name in self.funcs; e.sym = -1
+        if name == "say": e.kind = "say"
+        elif name in ARRAY_BUILTINS and not own and len(e.args) == 1 and is_array(e.args[0].ty): e.kind = "array"
+        elif name in CASTS and not own: e.kind = "cast"
+        elif name in CHECKSUMS and not own: e.kind = "checksum"
+        elif own: e.kind = "func"; e.sym = self.funcs[name]
+        elif name in INTRINSICS: e.kind = "intrinsic"
+        else: e.kind = "extern"; e.sym = self.extern(name, e)
+
+    def extern(self, name, call: A.Call) -> int:
+        i = self.externs.get(name)
+        if i is None:
+            decl = self.decls.get(name)
+            params, ret, variadic = decl if decl is not None else ([a.ty for a in call.args], call.ty, False)
+            i = self.externs[name] = len(self.table); self.table.append((name, params, ret, variadic))
+        return i
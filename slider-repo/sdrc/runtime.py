@@ -0,0 +1,49 @@
+import hashlib, os, subprocess
+
+RUNTIME_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "runtime")
+RUNTIME_SRC = os.path.join(RUNTIME_DIR, "acs_v1.c")
+
+def source_hash(path: str = RUNTIME_SRC) -> str:
+    h = hashlib.sha256()
+    for p in (path, os.path.splitext(path)[0] + ".h"):
+        with open(p, "rb") as f: h.update(f.read())
+    return h.hexdigest()[:16]
+
+CACHE_DIR = "build/.sdrc-runtime"
+
+def _cc() -> str: return os.environ.get("CC", "cc")
+
+def shared_library(cache_dir: str = CACHE_DIR) -> str:
+    """Build (once per source hash) and return the ACS runtime as a shared library."""
+    out = os.path.join(cache_dir, f"libacs_v1-{source_hash()}.so")
+    if os.path.exists(out): return out
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"
+    subprocess.run([_cc(), "-O2", "-shared", "-fPIC", RUNTIME_SRC, "-o", tmp, "-lpthread"], check=True)
+    os.replace(tmp, out)
+    return out
+
+def static_library(cache_dir: str = CACHE_DIR) -> str:
+    """Build (once per source hash) and return the ACS runtime as a static archive,
+    compiled -fPIC so it links into position-independent executables."""
+    out = os.path.join(cache_dir, f"libacs_v1-{source_hash()}.a")
+    if os.path.exists(out): return out
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp = f"{out}.{os.getpid()}.tmp"; obj = f"{tmp}.o"
+    try:
+        subprocess.run([_cc(), "-O2", "-fPIC", "-c", RUNTIME_SRC, "-o", obj], check=True)
+        subprocess.run([os.environ.get("AR", "ar"), "rcs", tmp, obj], check=True)
+        os.replace(tmp, out)
+    finally:
+        for p in (obj, tmp):
+            if os.path.exists(p): os.remove(p)
+    return out
+
+def link(objects, out_path: str, with_runtime: bool):
+    """Link object files into an executable with $CC, adding the cached runtime
+    archive when `with_runtime` (the program calls acs_* functions)."""
+    libs = [static_library(), "-lpthread"] if with_runtime else []
+    subprocess.run([_cc(), *objects, *libs, "-o", out_path], check=True)
+
+def uses_runtime(module) -> bool:
+    return any(f.name.startswith("acs_") for f in module.functions)
@@ -0,0 +1,133 @@
+import json, os, socket, socketserver, sys, tempfile, threading
+# the client half is imported by `sdrc.cli` on every --server call, so the
+# process-pool machinery is imported only where the server needs it
+
+# Protocol: one JSON object per line each way over a Unix stream socket.
+#   {"op": "main", "argv": [...], "cwd": ..., "env": {...}} -> {"code": n, "stdout": s, "stderr": s}
+#   {"op": "ping"} -> {"ok": true, "pid": n, "workers": n}
+#   {"op": "shutdown"} -> {"ok": true}
+
+def default_socket() -> str:
+    path = os.environ.get("SDRC_SOCKET")
+    if path: return path
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    return os.path.join(base, f"sdrc-{os.getuid()}.sock")
+
+def request(msg: dict, path: str = None, timeout: float = None):
+    """Send one request; returns the reply, or None when no server is listening at `path`."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout); s.connect(path or default_socket())
+            with s.makefile("rwb") as f:
+                f.write(json.dumps(msg).encode() + b"\n"); f.flush()
+                line = f.readline()
+    except (FileNotFoundError, ConnectionRefusedError, BrokenPipeError):
+        return None     # no server, or one that was shutting down before it read the request
+    if not line: raise ConnectionError("sdrc server closed the connection")
+    return json.loads(line)
+
+def forward(argv, path: str = None):
+    """Run the sdrc command line `argv` on the server as if invoked here (same cwd and
+    environment); copy its output to ours and return its exit code, or None without a server."""
+    reply = request({"op": "main", "argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}, path)
+    if reply is None: return None
+    sys.stdout.write(reply["stdout"]); sys.stderr.write(reply["stderr"])
+    return reply["code"]
+
+# --- worker side -------------------------------------------------------------
+
+def _init_worker():
+    """Pay the start-up costs once per worker: imports, LLVM target setup, AST memo."""
+    from . import driver, optimize
+    from .cache import ASTMemo
+    optimize.init_native(); optimize.target_machine(2)
+    driver.ast_memo = ASTMemo()
+
+def _serve_main(argv, cwd, env):
+    """Run driver.main(argv) in `cwd` with `env`, capturing fds 1 and 2 (JIT-ed code
+    writes there directly, not through sys.stdout)."""
+    from . import driver
+    saved_env = dict(os.environ); saved_cwd = os.getcwd()
+    sys.stdout.flush(); sys.stderr.flush()
+    with tempfile.TemporaryFile() as out, tempfile.TemporaryFile() as err:
+        fd1, fd2 = os.dup(1), os.dup(2)
+        os.dup2(out.fileno(), 1); os.dup2(err.fileno(), 2)
+        try:
+            os.environ.clear(); os.environ.update(env); os.chdir(cwd)
+            try:
+                code = driver.main(argv, use_server=False) or 0
+            except SystemExit as e:
+                code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            except Exception as e:
+                print(f"[sdrc] error: {e}", file=sys.stderr); code = 1
+        finally:
+            sys.stdout.flush(); sys.stderr.flush()
+            os.dup2(fd1, 1); os.dup2(fd2, 2); os.close(fd1); os.close(fd2)
+            os.environ.clear(); os.environ.update(saved_env); os.chdir(saved_cwd)
+        out.seek(0); err.seek(0)
+        return {"code": code, "stdout": out.read().decode("utf-8", "replace"),
+                "stderr": err.read().decode("utf-8", "replace")}
+
+# --- server side -------------------------------------------------------------
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        line = self.rfile.readline()
+        if not line: return
+        try:
+            reply = self.server.dispatch(json.loads(line))
+        except Exception as e:
+            reply = {"code": 1, "stdout": "", "stderr": f"[sdrc] error: server: {type(e).__name__}: {e}\n"}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """`sdrc serve`: accepts requests on a Unix socket, one thread per connection,
+    and runs each command on a pool of warm worker processes.
+
+    Workers come from a forkserver (so forking never happens from this threaded
+    process), initialize LLVM once and keep an in-memory AST memo across requests.
+    A worker killed by the program it was running is replaced with a fresh pool.
+    """
+    daemon_threads = True
+
+    def __init__(self, path: str = None, workers: int = None):
+        self.path = path or default_socket(); self.workers = workers or os.cpu_count() or 1
+        self.pool = None; self.lock = threading.Lock()
+        self._new_pool()
+        if os.path.exists(self.path):
+            if request({"op": "ping"}, self.path) is not None:
+                raise RuntimeError(f"an sdrc server is already listening on {self.path}")
+            os.remove(self.path)        # stale socket from a crashed server
+        old = os.umask(0o177)           # only this user may connect and run code
+        try: super().__init__(self.path, _Handler)
+        finally: os.umask(old)
+
+    def _new_pool(self):
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        ctx = multiprocessing.get_context("forkserver")
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=ctx, initializer=_init_worker)
+
+    def dispatch(self, msg: dict) -> dict:
+        op = msg.get("op")
+        if op == "ping": return {"ok": True, "pid": os.getpid(), "workers": self.workers}
+        if op == "shutdown":
+            if os.path.exists(self.path): os.remove(self.path)    # new clients fall back at once
+            threading.Thread(target=self.shutdown, daemon=True).start(); return {"ok": True}
+        if op != "main": raise ValueError(f"unknown op {op!r}")
+        from concurrent.futures.process import BrokenProcessPool
+        with self.lock: pool = self.pool
+        try:
+            return pool.submit(_serve_main, msg["argv"], msg["cwd"], msg["env"]).result()
+        except BrokenProcessPool:
+            with self.lock:
+                if self.pool is pool: self._new_pool()
+            return {"code": 1, "stdout": "", "stderr": "[sdrc] error: server worker died (crash in compiled program?)\n"}
+
+    def serve(self):
+        print(f"[sdrc] serving on {self.path} with {self.workers} worker(s)", file=sys.stderr)
+        try: self.serve_forever()
+        except KeyboardInterrupt: pass
+        finally:
+            self.server_close(); self.pool.shutdown(cancel_futures=True)
+            if os.path.exists(self.path): os.remove(self.path)
@@ -0,0 +1,134 @@
+import dataclasses, json, resource, sys, time, tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+_hooks = []
+
+def add_hook(fn):
+    """Call `fn(src_path, stats_dict)` after every file the driver compiles with stats on.
+
+    Hooks run in the driver's process (also for `build -j`), in build order;
+    `stats_dict` is `Stats.as_dict()`. Returns `fn` so it can be used as a decorator.
+    """
+    _hooks.append(fn); return fn
+
+def remove_hook(fn): _hooks.remove(fn)
+
+def run_hooks(src_path: str, data: dict):
+    for fn in list(_hooks): fn(src_path, data)
+
+def ast_kinds(node) -> Counter:
+    """Count AST nodes per class name."""
+    out = Counter(); stack = [node]
+    while stack:
+        x = stack.pop()
+        if isinstance(x, list): stack.extend(x); continue
+        if not dataclasses.is_dataclass(x): continue
+        out[type(x).__name__] += 1
+        stack.extend(getattr(x, f.name) for f in dataclasses.fields(x))
+    return out
+
+def ir_counts(module) -> tuple:
+    """(functions, basic blocks, instructions) defined in an llvmlite ir.Module."""
+    fns = [f for f in module.functions if f.blocks]
+    blocks = [b for f in fns for b in f.blocks]
+    return len(fns), len(blocks), sum(len(b.instructions) for b in blocks)
+
+# ru_maxrss is in KiB on Linux and in bytes on macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+def _max_rss() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _RSS_UNIT
+
+def ref_counts(ref) -> tuple:
+    """(functions, basic blocks, instructions) defined in a binding ModuleRef."""
+    nf = nb = ni = 0
+    for f in ref.functions:
+        if f.is_declaration: continue
+        nf += 1
+        for b in f.blocks:
+            nb += 1; ni += sum(1 for _ in b.instructions)
+    return nf, nb, ni
+
+class Stats:
+    """Wall time and peak memory per compiler phase, plus named counters.
+
+    Phases are sequential, not nested. Each records two memory figures: the
+    high-water mark of traced Python allocations while it ran (the Python heap
+    only), and how far it raised the process's peak RSS, which also covers
+    LLVM's and other native allocations but is 0 for a phase that stays below
+    an earlier peak. Tracing starts with the first Stats and slows the compiler,
+    so the driver only creates one when asked (`--time-phases`, `--stats`).
+    """
+    def __init__(self, memory: bool = True):
+        self.phases = []      # [name, seconds, Python heap peak bytes, RSS peak growth bytes], None if not measured
+        self.counters = {}
+        self.memory = memory
+        if memory and not tracemalloc.is_tracing(): tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name: str):
+        rec = [name, 0.0, None, None]; self.phases.append(rec)
+        if self.memory: tracemalloc.reset_peak(); rss0 = _max_rss()
+        t0 = time.perf_counter()
+        try: yield rec
+        finally:
+            rec[1] = time.perf_counter() - t0
+            if self.memory: rec[2] = tracemalloc.get_traced_memory()[1]; rec[3] = _max_rss() - rss0
+
+    def record(self, name: str, seconds: float):
+        """Add a phase timed elsewhere (e.g. JIT and run times)."""
+        self.phases.append([name, seconds, None, None])
+
+    def count(self, name: str, n: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def set(self, name: str, value):
+        self.counters[name] = value
+
+    def as_dict(self) -> dict:
+        return {"phases": [{"name": n, "seconds": s, "peak_bytes": m, "rss_growth_bytes": r}
+                           for n, s, m, r in self.phases],
+                "counters": dict(self.counters),
+                "max_rss_kb": _max_rss() // 1024}
+
+class NoStats(Stats):
+    """Stats that records nothing; the default so the driver needs no checks."""
+    def __init__(self): self.phases = []; self.counters = {}; self.memory = False
+
+    @contextmanager
+    def phase(self, name: str): yield None
+
+    def record(self, name, seconds): pass
+    def count(self, name, n=1): pass
+    def set(self, name, value): pass
+
+NO_STATS = NoStats()
+
+def _fmt_bytes(n) -> str:
+    if n is None: return "-"
+    for unit in ("B", "KiB", "MiB"):
+        if n < 1024 or unit == "MiB": return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+def format_table(src_path: str, data: dict, counters: bool = True) -> str:
+    lines = [f"[sdrc] {src_path}", f"  {'phase':<14}{'time (ms)':>12}{'py heap peak':>14}{'rss growth':>14}"]
+    for p in data["phases"]:
+        lines.append(f"  {p['name']:<14}{p['seconds'] * 1e3:>12.2f}{_fmt_bytes(p['peak_bytes']):>14}"
+                     f"{_fmt_bytes(p['rss_growth_bytes']):>14}")
+    if counters:
+        for name, v in data["counters"].items():
+            if isinstance(v, dict):
+                lines.append(f"  {name}:"); lines += [f"    {k:<20}{n:>10}" for k, n in sorted(v.items())]
+            else:
+                lines.append(f"  {name:<22}{v:>12}")
+    lines.append(f"  {'max rss':<22}{data['max_rss_kb']:>9} KiB")
+    return "\n".join(lines)
+
+def report(results, fmt: str, out=None, counters: bool = True):
+    """Write [(src_path, stats dict)] as tables or a single JSON document."""
+    out = out or sys.stderr
+    if fmt == "json":
+        json.dump([{"source": src, **data} for src, data in results], out, indent=2); out.write("\n")
+    else:
+        for src, data in results: out.write(format_table(src, data, counters) + "\n")
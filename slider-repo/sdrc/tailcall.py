@@ -0,0 +1,42 @@
+from . import ast as A
+from .typesys import is_array
+
+class TailCalls:
+    """Mark calls in tail position (`Call.tail`) after name resolution.
+
+    `return f(...)` is a tail call anywhere in a body; in a void function a
+    call statement that ends the body (or ends an `if` arm that ends it) is
+    one too. Functions with a direct self tail call get `Func.tail_self`, and
+    IRGen turns those calls into a jump back to the function's entry.
+    """
+    def __init__(self):
+        self.marked = 0; self.self_calls = 0
+
+    def run(self, mod: A.Module) -> A.Module:
+        for f in mod.funcs:
+            self.fn = f
+            self.block(f.body, f.ret_type == "void")
+        return mod
+
+    def callable(self, e) -> bool:
+        if not isinstance(e, A.Call) or e.kind not in ("func", "extern"): return False
+        # `tail` promises the callee no access to this frame, where fixed-size arrays live;
+        # a self call only becomes a jump back to the entry
+        return e.func.id == self.fn.name or not any(is_array(a.ty) for a in e.args)
+
+    def mark(self, call: A.Call):
+        call.tail = True; self.marked += 1
+        if call.func.id == self.fn.name:
+            self.fn.tail_self = True; self.self_calls += 1
+
+    def block(self, stmts, tail: bool):
+        for i, st in enumerate(stmts):
+            last = tail and i == len(stmts) - 1
+            if isinstance(st, A.Return):
+                if self.callable(st.expr): self.mark(st.expr)
+            elif isinstance(st, A.ExprStmt):
+                if last and self.callable(st.expr): self.mark(st.expr)
+            elif isinstance(st, A.If):
+                self.block(st.then_body, last); self.block(st.else_body, last)
+            elif isinstance(st, (A.While, A.ForRange)):
+                self.block(st.body, False)
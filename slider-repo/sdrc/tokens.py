@@ -1,6 +1,7 @@
 
 from enum import Enum, auto
 from dataclasses import dataclass
+from types import SimpleNamespace
 
 class TokKind(Enum):
     EOF = 0
@@ -17,12 +18,17 @@ class TokKind(Enum):
     COMMA = auto()
     LPAREN = auto()
     RPAREN = auto()
+    LBRACKET = auto()
+    RBRACKET = auto()
+    SEMI = auto()
     PLUS = auto()
     MINUS = auto()
     STAR = auto()
     SLASH = auto()
     ASSIGN = auto()
     RANGE = auto()
+    ARROW = auto()
+    AT = auto()
 
     KW_PACKAGE = auto()
     KW_USE = auto()
@@ -37,7 +43,11 @@ class TokKind(Enum):
     KW_IN = auto()
     KW_SAY = auto()
 
-@dataclass
+# Plain namespace of the same members: `TokKind.X` goes through the Enum
+# metaclass on every access, which shows up in the parser's hot loop.
+K = SimpleNamespace(**TokKind.__members__)
+
+@dataclass(slots=True)
 class Token:
     kind: TokKind
     value: str
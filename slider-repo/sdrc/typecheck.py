@@ -0,0 +1,259 @@
+from . import ast as A
+from .checksum import CHECKSUMS
+from .typesys import (Ty, I64, I32, F64, BOOL, STR, VOID, PTR, TYPES, INT_BITS, ELEM, ARRAY_OF,
+                      ty_from_name, is_int, is_float, is_numeric, is_array, parse_base12_int)
+
+CASTS = {name: t for name, t in TYPES.items() if is_numeric(t)}
+ARRAY_BUILTINS = {"len": I64, "free": VOID}   # on an array argument; `free` of anything else is C's
+LIBC_EXTERNS = {"printf": ([STR], I32, True)}   # callable without a declaration
+
+MAX_FIXED = 8192   # elements of a fixed-size array ([a, b, ...], [v; n]), which live on the stack
+
+_ESCAPE = "cannot return a fixed-size array, which lives in the function's frame; use [T](n)"
+
+def _lit(e) -> bool: return isinstance(e, (A.IntLit, A.FloatLit))
+
+class TypeChecker:
+    """Infer and check types over an ast.Module, annotating it in place.
+
+    Parameters default to i64 when unannotated; a function without `-> T`
+    gets the type of its `return` statements (void if there are none).
+    Literals take the type their context asks for (`let x:f64 = 1` makes
+    `1` a double); everything else must match exactly, with `i64(x)`,
+    `i32(x)`, `f64(x)` and `bool(x)` as the explicit conversions, and the
+    `checksum32/64(buf)` / `(buf, n)` intrinsics return i64. Arrays (`[i64]`,
+    `[f64]`) are indexed with i64 and have the builtins `len(a)` and `free(a)`; a
+    fixed-size array lives in its function's frame, so it cannot be returned,
+    directly or through a name ever bound to one. Every
+    Expr gets `.ty`; Let/Var `type_name`, Func params and `ret_type` are
+    filled in with the resolved names for IRGen.
+
+    `externs` maps C function names to (param tys, ret ty, variadic), as read
+    by cdecl from acs_v1.h and `--decls` headers; other unknown callees are
+    typed from their first call, returning i64.
+    """
+    def __init__(self, externs=None):
+        self.funcs = {}      # name -> [param tys, ret ty or None while inferring]
+        self.externs = {**LIBC_EXTERNS, **(externs or {})}   # name -> (arg tys, ret ty, variadic)
+        self.assumed = {}    # fn name -> caller that assumed an i64 return before inference
+        self.fn = None; self.ret = None; self.env = None
+        self.frame = None    # names bound to a fixed-size array somewhere in this fn
+        self.aliases = None  # (name, name it was bound from), both arrays
+        self.returned = None # array Names returned by this fn
+
+    def check(self, mod: A.Module) -> A.Module:
+        for f in mod.funcs:
+            if f.name in self.funcs: raise TypeError(f"duplicate fn {f.name}")
+            f.params = [(n, t or "i64") for n, t in f.params]
+            self.funcs[f.name] = [[ty_from_name(t) for _, t in f.params],
+                                  ty_from_name(f.ret_type) if f.ret_type else None]
+        for f in mod.funcs: self.check_func(f)
+        for name, caller in self.assumed.items():
+            ret = self.funcs[name][1]
+            if ret != I64:
+                raise TypeError(f"fn {caller}: call to {name} assumed i64 before its return type "
+                                f"was inferred as {ret.name}; annotate it with '-> {ret.name}'")
+        return mod
+
+    def err(self, msg): return TypeError(f"in fn {self.fn.name}: {msg}")
+
+    def check_func(self, f: A.Func):
+        self.fn = f; sig = self.funcs[f.name]
+        self.ret = sig[1]
+        self.env = {n: t for (n, _), t in zip(f.params, sig[0])}
+        self.frame = set(); self.aliases = []; self.returned = []
+        for st in f.body: self.stmt(st)
+        self.check_escapes()
+        if self.ret is None: self.ret = VOID
+        sig[1] = self.ret; f.ret_type = self.ret.name
+
+    def stmt(self, st):
+        if isinstance(st, (A.Let, A.Var)):
+            want = ty_from_name(st.type_name) if st.type_name else None
+            prev = self.env.get(st.name)
+            if prev is not None and want is not None and want != prev:
+                raise self.err(f"cannot rebind {st.name}:{prev.name} as {want.name}")
+            want = want or prev
+            t = self.expect(st.expr, want, st.name)
+            self.env[st.name] = t; st.type_name = t.name
+            if is_array(t): self.bind_array(st.name, st.expr)
+            return
+        if isinstance(st, A.Assign):
+            prev = self.env.get(st.name)
+            if prev is None: raise self.err(f"assignment to undeclared name {st.name}")
+            self.expect(st.expr, prev, st.name)
+            if is_array(prev): self.bind_array(st.name, st.expr)
+            return
+        if isinstance(st, A.IndexAssign):
+            self.expect(st.expr, self.expr(st.target), "array element"); return
+        if isinstance(st, A.Return):
+            if st.expr is None:
+                if self.ret not in (None, VOID): raise self.err(f"bare return in fn returning {self.ret.name}")
+                self.ret = VOID; return
+            if self.ret == VOID: raise self.err("return with a value in a void fn")
+            self.ret = self.expect(st.expr, self.ret, "return value")
+            if is_array(self.ret):
+                if isinstance(st.expr, (A.ArrayLit, A.ArrayRepeat)): raise self.err(_ESCAPE)
+                if isinstance(st.expr, A.Name): self.returned.append(st.expr.id)
+            return
+        if isinstance(st, A.ExprStmt): self.expr(st.expr); return
+        if isinstance(st, A.If):
+            self.cond(st.cond)
+            for s in st.then_body: self.stmt(s)
+            for s in st.else_body: self.stmt(s)
+            return
+        if isinstance(st, A.While):
+            self.cond(st.cond)
+            for s in st.body: self.stmt(s)
+            return
+        if isinstance(st, A.ForRange):
+            t = self.env.get(st.var)
+            if t is None: t = self.operand_type(st.start, st.end, None)
+            else: self.operand_type(st.start, st.end, t)
+            if not is_int(t) or t == BOOL: raise self.err(f"for-range over non-integer type {t.name}")
+            self.operand(st.start, t, "range start"); self.operand(st.end, t, "range end")
+            self.env[st.var] = t
+            for s in st.body: self.stmt(s)
+            return
+        raise NotImplementedError(type(st))
+
+    def bind_array(self, name, e):
+        if isinstance(e, (A.ArrayLit, A.ArrayRepeat)): self.frame.add(name)
+        elif isinstance(e, A.Name): self.aliases.append((name, e.id))
+
+    def check_escapes(self):
+        # after the whole body, since a later rebinding or alias can make a name frame-backed
+        grew = True
+        while grew:
+            grew = False
+            for name, src in self.aliases:
+                if src in self.frame and name not in self.frame: self.frame.add(name); grew = True
+        for name in self.returned:
+            if name in self.frame: raise self.err(f"{name}: {_ESCAPE}")
+
+    def cond(self, e):
+        t = self.expr(e)
+        if not is_numeric(t): raise self.err(f"condition of type {t.name}")
+
+    def expect(self, e, want, what) -> Ty:
+        t = self.expr(e, want)
+        if want is not None and t != want:
+            raise self.err(f"{what}: expected {want.name}, got {t.name}")
+        return t
+
+    def operand_type(self, l, r, want) -> Ty:
+        """Common type of two operands: that of the first non-literal one, else `want`
+        or the literals' own. Non-literal operands are typed here, exactly once."""
+        t = None
+        for side in (l, r):
+            if not _lit(side):
+                st = self.expr(side)
+                if t is None: t = st
+        if t is not None: return t
+        if want is not None and is_numeric(want) and want != BOOL: return want
+        return F64 if isinstance(l, A.FloatLit) or isinstance(r, A.FloatLit) else I64
+
+    def operand(self, e, t, what):
+        """Check an operand already seen by operand_type; only literals still need typing."""
+        got = self.expr(e, t) if _lit(e) else e.ty
+        if got != t: raise self.err(f"{what}: expected {t.name}, got {got.name}")
+
+    def extern_arg(self, name, e) -> Ty:
+        t = self.expr(e)
+        if is_array(t): raise self.err(f"cannot pass {t.name} to extern {name}()")
+        return t
+
+    def expr(self, e, want=None) -> Ty:
+        t = self._expr(e, want); e.ty = t; return t
+
+    def _expr(self, e, want):
+        if isinstance(e, A.IntLit):
+            if want is None or not is_numeric(want): return I64
+            if is_int(want):
+                v = parse_base12_int(e.text); bits = INT_BITS[want]
+                if not (-(1 << (bits - 1)) <= v < (1 << bits)):
+                    raise self.err(f"literal {e.text} does not fit {want.name}")
+            return want
+        if isinstance(e, A.FloatLit): return want if want is not None and is_float(want) else F64
+        if isinstance(e, A.StringLit): return STR
+        if isinstance(e, A.Name):
+            t = self.env.get(e.id)
+            if t is None: raise NameError(f"Undefined name: {e.id}")
+            return t
+        if isinstance(e, A.ArrayLit):
+            if len(e.elems) > MAX_FIXED: raise self.err(f"array literal longer than {MAX_FIXED}; use [T](n)")
+            elem = ELEM.get(want); typed = None
+            if elem is None:   # the first non-literal element decides, else the literals
+                typed = next((x for x in e.elems if not _lit(x)), None)
+                if typed is not None: elem = self.expr(typed)
+                elif not e.elems: raise self.err("empty array literal needs a type, as in `let a: [i64] = []`")
+                else: elem = F64 if any(isinstance(x, A.FloatLit) for x in e.elems) else I64
+            if elem not in ARRAY_OF: raise self.err(f"arrays hold i64 or f64, not {elem.name}")
+            for i, x in enumerate(e.elems):
+                got = x.ty if x is typed else self.expr(x, elem)
+                if got != elem: raise self.err(f"array element {i + 1}: expected {elem.name}, got {got.name}")
+            return ARRAY_OF[elem]
+        if isinstance(e, A.ArrayRepeat):
+            n = parse_base12_int(e.count)
+            if n > MAX_FIXED: raise self.err(f"[v; {n}] is longer than {MAX_FIXED}; use [T](n)")
+            elem = self.expr(e.value, ELEM.get(want))
+            if elem not in ARRAY_OF: raise self.err(f"arrays hold i64 or f64, not {elem.name}")
+            return ARRAY_OF[elem]
+        if isinstance(e, A.ArrayNew):
+            self.expect(e.count, I64, "array length")
+            return ARRAY_OF[ty_from_name(e.elem)]
+        if isinstance(e, A.Index):
+            t = self.expr(e.base)
+            if not is_array(t): raise self.err(f"cannot index {t.name}")
+            self.expect(e.index, I64, "index")
+            return ELEM[t]
+        if isinstance(e, A.BinOp):
+            t = self.operand_type(e.left, e.right, want)
+            if not is_numeric(t) or t == BOOL: raise self.err(f"operator {e.op} on {t.name}")
+            self.operand(e.left, t, f"left operand of {e.op}"); self.operand(e.right, t, f"right operand of {e.op}")
+            return t
+        if isinstance(e, A.Call):
+            name = e.func.id if isinstance(e.func, A.Name) else None
+            if name is None: raise self.err("call of a non-name expression")
+            if name == "say":
+                for a in e.args:
+                    if is_array(self.expr(a)): raise self.err("say cannot print an array")
+                return VOID
+            if name in ARRAY_BUILTINS and name not in self.funcs and len(e.args) == 1:
+                t = self.expr(e.args[0])
+                if is_array(t): return ARRAY_BUILTINS[name]
+                if name == "len": raise self.err(f"len() of {t.name}")
+            if name in CASTS and name not in self.funcs:
+                if len(e.args) != 1: raise self.err(f"{name}() takes one argument")
+                if not is_numeric(self.expr(e.args[0])): raise self.err(f"cannot convert to {name}")
+                return CASTS[name]
+            if name in CHECKSUMS and name not in self.funcs:
+                if len(e.args) == 1:
+                    t = self.expr(e.args[0])
+                    if t != STR and not is_array(t): raise self.err(f"argument 1 of {name}: expected str or an array, got {t.name}")
+                elif len(e.args) == 2:
+                    t = self.expr(e.args[0])
+                    if t not in (STR, PTR): raise self.err(f"argument 1 of {name}: expected str or ptr, got {t.name}")
+                    self.expect(e.args[1], I64, f"argument 2 of {name}")
+                else: raise self.err(f"{name}() takes a str or an array, or a str or ptr and a byte count")
+                return I64
+            sig = self.funcs.get(name)
+            if sig is not None:
+                params, ret = sig
+                if len(e.args) != len(params):
+                    raise self.err(f"{name}() takes {len(params)} argument(s), got {len(e.args)}")
+                for i, (a, pt) in enumerate(zip(e.args, params)): self.expect(a, pt, f"argument {i + 1} of {name}")
+                if ret is None:
+                    self.assumed.setdefault(name, self.fn.name); return I64
+                return ret
+            ext = self.externs.get(name)
+            if ext is None:
+                self.externs[name] = ([self.extern_arg(name, a) for a in e.args], I64, False); return I64
+            params, ret, variadic = ext
+            if len(e.args) < len(params) or (len(e.args) > len(params) and not variadic):
+                raise self.err(f"extern {name}() called with {len(e.args)} argument(s), declared with {len(params)}")
+            for i, a in enumerate(e.args):
+                if i < len(params): self.expect(a, params[i], f"argument {i + 1} of {name}")
+                else: self.extern_arg(name, a)
+            return ret
+        raise NotImplementedError(type(e))
@@ -1,9 +1,42 @@
-
 from dataclasses import dataclass
 
 @dataclass(frozen=True)
 class Ty: name: str
 I64 = Ty("i64"); F64 = Ty("f64"); STR = Ty("str"); BOOL = Ty("bool")
+I32 = Ty("i32"); VOID = Ty("void")
+PTR = Ty("ptr")      # opaque C pointer, e.g. an ACS channel or group handle
+ARR_I64 = Ty("[i64]"); ARR_F64 = Ty("[f64]")   # (data, length) views of contiguous elements
+
+TYPES = {t.name: t for t in (I64, I32, F64, BOOL, STR, PTR, ARR_I64, ARR_F64)}
+ELEM = {ARR_I64: I64, ARR_F64: F64}
+ARRAY_OF = {e: a for a, e in ELEM.items()}
+INT_TYPES = (I64, I32, BOOL)
+FLOAT_TYPES = (F64,)
+INT_BITS = {I64: 64, I32: 32, BOOL: 1}
+
+def ty_from_name(name: str) -> Ty:
+    t = TYPES.get(name)
+    if t is None: raise TypeError(f"unknown type '{name}'")
+    return t
+
+def is_int(t: Ty) -> bool: return t in INT_TYPES
+def is_float(t: Ty) -> bool: return t in FLOAT_TYPES
+def is_numeric(t: Ty) -> bool: return t in INT_TYPES or t in FLOAT_TYPES
+def is_array(t: Ty) -> bool: return t in ELEM
+
+def parse_base12_int(text: str) -> int:
+    raw = text
+    base12 = False
+    if text.endswith(".b12"):
+        base12 = True; raw = text[:-4]
+    if any(ch in "te" for ch in raw): base12 = True
+    if base12:
+        v = 0
+        for ch in raw:
+            d = 10 if ch=='t' else 11 if ch=='e' else int(ch,10)
+            v = v*12 + d
+        return v
+    return int(raw,10)
 
 def typeof_lit_int(text: str): return I64
 def typeof_lit_float(text: str): return F64
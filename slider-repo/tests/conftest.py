@@ -0,0 +1,30 @@
+import os, subprocess, sys
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _sdrc(*args, shell_prefix=None):
+    """Run `python -m sdrc.driver ARGS` from the repo root (through `sh -c` with
+    `shell_prefix`, e.g. a ulimit) and return the CompletedProcess."""
+    cmd = [sys.executable, "-m", "sdrc.driver", *args]
+    if shell_prefix:
+        cmd = ["sh", "-c", f'{shell_prefix}; exec "$@"', "sh", *cmd]
+    return subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=300)
+
+@pytest.fixture
+def sdrc():
+    return _sdrc
+
+@pytest.fixture
+def write_sdr(tmp_path):
+    """Write Slider source to a file under tmp_path and return its path."""
+    def write(src, name="t.sdr"):
+        path = tmp_path / name; path.write_text(src); return str(path)
+    return write
+
+@pytest.fixture
+def run_sdr(write_sdr):
+    """JIT-run Slider source with `sdrc run`; returns the CompletedProcess."""
+    def run(src, *args):
+        return _sdrc("run", write_sdr(src), *args)
+    return run
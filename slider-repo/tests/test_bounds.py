@@ -0,0 +1,70 @@
+import dataclasses
+from sdrc import ast as A
+from sdrc.driver import analyze
+
+def indexes(node):
+    """Every Index under `node`, outermost first, in source order."""
+    if isinstance(node, list):
+        for x in node: yield from indexes(x)
+    elif dataclasses.is_dataclass(node):
+        if isinstance(node, A.Index): yield node
+        for f in dataclasses.fields(node):
+            if f.compare: yield from indexes(getattr(node, f.name))
+
+GUARDED = """\
+fn main() -> i64:
+    let a = [1, 2, 3, 4]
+    let n = 4
+    var s = 0
+    for i in 0..n:
+        s = s + a[i]
+        if i - 3:
+            s = s + a[i + 1]
+    say("s", s)
+    return 0
+"""
+
+def test_access_under_if_keeps_its_check(write_sdr):
+    mod = analyze(write_sdr(GUARDED))
+    loop = next(st for st in mod.funcs[0].body if isinstance(st, A.ForRange))
+    direct, under_if = indexes(loop.body)
+    assert not direct.checked and under_if.checked
+    assert [k for _, k in loop.guards] == [0]
+
+def test_access_under_if_runs(run_sdr):
+    # a[i + 1] is only read while i + 1 < 4; hoisting it would fail before the loop
+    r = run_sdr(GUARDED)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "s 19\n"
+
+def test_access_under_while_and_nested_for_runs(run_sdr):
+    r = run_sdr("""\
+fn main() -> i64:
+    let a = [1, 2, 3, 4]
+    var s = 0
+    for i in 0..4:
+        var go = 3 - i
+        while go:
+            s = s + a[i + 1]
+            go = 0
+        for j in 0..3 - i:
+            s = s + a[i + 1]
+    say("s", s)
+    return 0
+""")
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "s 25\n"
+
+def test_unconditional_overrun_fails_before_the_loop(run_sdr):
+    r = run_sdr("""\
+fn main() -> i64:
+    let a = [1, 2, 3, 4]
+    var s = 0
+    for i in 0..4:
+        say("i", i)
+        s = s + a[i + 1]
+    return s
+""")
+    assert r.returncode != 0
+    assert "index 4 out of bounds for length 4" in r.stderr
+    assert "i 0" not in r.stdout
@@ -0,0 +1,29 @@
+import os
+
+MAIN = "fn main() -> i32:\n    return 0\n"
+
+def _tree(tmp_path, *names):
+    for name in names:
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True); path.write_text(MAIN)
+    return [str(tmp_path / n) for n in names]
+
+def test_same_name_in_two_places_is_an_error(sdrc, tmp_path):
+    a, b = _tree(tmp_path, "a/x.sdr", "b/x.sdr")
+    out = tmp_path / "out"
+    r = sdrc("build", a, b, "--no-cache", "-o", str(out))
+    assert r.returncode == 1
+    assert f"{a}, {b} all build to {os.path.join(out, 'x.ll')}" in r.stderr
+    assert not out.exists()
+
+def test_same_name_below_two_directories_is_an_error(sdrc, tmp_path):
+    _tree(tmp_path, "a/sub/x.sdr", "b/sub/x.sdr")
+    r = sdrc("build", str(tmp_path / "a"), str(tmp_path / "b"), "--no-cache", "-o", str(tmp_path / "out"))
+    assert r.returncode == 1 and "all build to" in r.stderr
+
+def test_directory_keeps_relative_paths(sdrc, tmp_path):
+    _tree(tmp_path, "src/x.sdr", "src/sub/x.sdr")
+    out = tmp_path / "out"
+    r = sdrc("build", str(tmp_path / "src"), str(tmp_path / "src" / "x.sdr"), "--no-cache", "-o", str(out))
+    assert r.returncode == 0, r.stderr
+    assert (out / "x.ll").exists() and (out / "sub" / "x.ll").exists()
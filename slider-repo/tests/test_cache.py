@@ -0,0 +1,57 @@
+import os
+import pytest
+from sdrc import driver
+from sdrc.cache import BuildCache
+
+PROG = "fn main() -> i32:\n    say({})\n    return 0\n"
+
+@pytest.fixture
+def build(tmp_path, capsys):
+    """Build with a cache under tmp_path; returns True for a cache hit."""
+    cache = BuildCache(str(tmp_path / "cache"))
+    def build(src, **options):
+        out = str(tmp_path / "out.ll")
+        driver.build(src, out, cache=cache, **{"opt_level": 0, **options})
+        return "(cached)" in capsys.readouterr().out
+    return build
+
+def test_unchanged_source_hits(build, write_sdr):
+    src = write_sdr(PROG.format(1))
+    assert not build(src)
+    assert build(src)
+
+def test_source_and_flags_are_in_the_key(build, write_sdr):
+    src = write_sdr(PROG.format(1))
+    assert not build(src)
+    write_sdr(PROG.format(2))
+    assert not build(src)
+    assert not build(src, opt_level=2)
+    assert not build(src, opt_level=2, emit_kind="asm")
+    assert build(src, opt_level=2)
+
+def test_decls_contents_are_in_the_key(build, write_sdr, tmp_path):
+    src = write_sdr("fn main() -> i32:\n    say(twice(2))\n    return 0\n")
+    h = tmp_path / "twice.h"
+    h.write_text("long twice(long x);\n")
+    assert not build(src, decls=[str(h)])
+    assert build(src, decls=[str(h)])
+    h.write_text("int twice(int x);\n")     # same path, different prototype
+    assert not build(src, decls=[str(h)])
+    assert 'declare i32 @"twice"(i32' in (tmp_path / "out.ll").read_text()
+
+def _put(cache, tmp_path, name, size, mtime):
+    data = tmp_path / name; data.write_bytes(b"x" * size)
+    key = cache.key(name.encode())
+    cache.store(key, "o", str(data))
+    os.utime(cache._path(key, "o"), (mtime, mtime))
+    return key
+
+def test_evicts_least_recently_used_past_the_cap(tmp_path):
+    cache = BuildCache(str(tmp_path / "cache"), max_bytes=3000)
+    a = _put(cache, tmp_path, "a", 1000, 100)
+    b = _put(cache, tmp_path, "b", 1000, 200)
+    c = _put(cache, tmp_path, "c", 1000, 300)
+    assert cache.fetch(a, "o", str(tmp_path / "got"))    # a is now the most recent
+    d = _put(cache, tmp_path, "d", 1000, 400)             # 4000 bytes: one must go
+    present = {k for k in (a, b, c, d) if os.path.exists(cache._path(k, "o"))}
+    assert present == {a, c, d}
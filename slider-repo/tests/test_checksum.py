@@ -0,0 +1,40 @@
+import ctypes, os, random, shutil, struct, zlib
+import pytest
+from bench.checksum import build_ref, jit_fns
+
+def signed(v): return v - (1 << 64) if v >> 63 else v
+
+CHECK32, CHECK64 = 0xcbf43926, signed(0x995dc9bbdf1939fa)   # of "123456789"
+
+@pytest.fixture(scope="module")
+def fns():
+    engine, fns = jit_fns()
+    yield fns
+    del engine
+
+@pytest.fixture(scope="module")
+def ref(tmp_path_factory):
+    if shutil.which(os.environ.get("CC", "cc")) is None: pytest.skip("no C compiler for bench/c/checksum_ref.c")
+    lib = build_ref(str(tmp_path_factory.mktemp("ref")))
+    for f in (lib.ref_crc32, lib.ref_crc64):
+        f.restype = ctypes.c_int64; f.argtypes = [ctypes.c_void_p, ctypes.c_int64]
+    return lib
+
+def test_check_values(run_sdr):
+    r = run_sdr('fn main() -> i32:\n    let s = "123456789"\n    say(checksum32(s), checksum64(s), checksum32(s, 4))\n    return 0\n')
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == f"{CHECK32} {CHECK64} {zlib.crc32(b'1234')}\n"
+
+def test_arrays_hash_their_elements_bytes(run_sdr):
+    r = run_sdr('fn main() -> i32:\n    let a = [1, 2, 0 - 3]\n    let f = [1.5, 2.0]\n    say(checksum32(a), checksum32(f))\n    return 0\n')
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == f"{zlib.crc32(struct.pack('<3q', 1, 2, -3))} {zlib.crc32(struct.pack('<2d', 1.5, 2.0))}\n"
+
+def test_matches_the_c_reference(fns, ref):
+    data = random.Random(12).randbytes((1 << 20) + 77)
+    buf = ctypes.create_string_buffer(data, len(data)); base = ctypes.addressof(buf)
+    cases = [(off, n) for off in range(8) for n in range(70)] + [(3, len(data) - 3), (0, 1 << 20)]
+    for off, n in cases:
+        p = base + off
+        assert fns["crc32"](p, n) == ref.ref_crc32(p, n) == zlib.crc32(data[off:off + n]), (off, n)
+        assert fns["crc64"](p, n) == ref.ref_crc64(p, n), (off, n)
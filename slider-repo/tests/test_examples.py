@@ -0,0 +1,17 @@
+import glob, os, shutil
+import pytest
+
+EXAMPLES = sorted(glob.glob(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "examples", "*.sdr")))
+
+@pytest.mark.parametrize("path", EXAMPLES, ids=os.path.basename)
+def test_example_type_checks(sdrc, path):
+    r = sdrc("check", path)
+    assert r.returncode == 0, r.stderr
+
+@pytest.mark.skipif(shutil.which(os.environ.get("CC", "cc")) is None, reason="no C compiler for the ACS runtime")
+def test_acs_demo_ticks(sdrc):
+    r = sdrc("run", "examples/demo_acs_v1.sdr")
+    assert r.returncode == 0, r.stderr
+    lines = r.stdout.splitlines()
+    assert lines[0].startswith("ACS v1 demo") and len(lines) == 9
+    assert all(line.startswith(("ix: 2 val: ", "[timeout]")) for line in lines[1:])
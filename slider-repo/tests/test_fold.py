@@ -0,0 +1,50 @@
+from sdrc import ast as A
+from sdrc.driver import analyze
+from sdrc.typesys import F64, I32, I64
+
+def body(write_sdr, src):
+    return analyze(write_sdr(src)).funcs[0].body
+
+def test_folds_integer_arithmetic(write_sdr):
+    let, = body(write_sdr, "fn main():\n    let y = 7 / 2 * 2t.b12 + 1\n")
+    assert isinstance(let.expr, A.IntLit) and let.expr.text == "103" and let.expr.ty == I64
+
+def test_wraps_at_the_operand_width(write_sdr):
+    a, b = body(write_sdr, "fn main():\n    let a:i32 = 2147483647 + 1\n    let b = 9223372036854775807 + 1\n")
+    assert (a.expr.text, a.expr.ty) == ("-2147483648", I32)
+    assert b.expr.text == "-9223372036854775808"
+
+def test_leaves_f64_division_of_integer_literals(write_sdr):
+    let, = body(write_sdr, "fn main():\n    let x:f64 = 7 / 2\n")
+    assert isinstance(let.expr, A.BinOp) and let.expr.ty == F64
+
+def test_leaves_division_by_zero_to_run_time(write_sdr):
+    let, = body(write_sdr, "fn main():\n    let x = 1 / 0\n")
+    assert isinstance(let.expr, A.BinOp)
+
+def test_drops_dead_branches_and_code_after_return(write_sdr):
+    stmts = body(write_sdr, """\
+fn main() -> i64:
+    if 2 - 2:
+        say("dead")
+    else:
+        say("live")
+    while 0:
+        say("never")
+    return 0
+    say("after")
+""")
+    assert [type(s) for s in stmts] == [A.ExprStmt, A.Return]
+    assert stmts[0].expr.args[0].value == "live"
+
+def test_folded_values_at_run_time(run_sdr):
+    r = run_sdr("""\
+fn main() -> i64:
+    let x:f64 = 7 / 2
+    let y = 7 / 2
+    let z:i32 = 2147483647 + 1
+    say(x, y, z)
+    return 0
+""")
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "3.5 3 -2147483648\n"
@@ -0,0 +1,39 @@
+import re
+from sdrc.driver import compile_module
+
+ACCUMULATE = """\
+fn main() -> i32:
+    let n = 10007
+    let x = [i64](n)
+    let y = [i64](n)
+    for i in 0..n:
+        x[i] = i
+    var s = 0
+    var p = 1
+    @noalias @vec(4)
+    for i in 0..n:
+        s = s + x[i]
+        p = p * 3 + x[i]
+        y[i] = x[i] * 2
+    say(s, p, y[n - 1])
+    free(x)
+    free(y)
+    return 0
+"""
+
+def test_noalias_tags_only_array_elements(write_sdr, tmp_path):
+    # the slots of i, s and p and the profile counters carry values across
+    # iterations, so only the four element accesses may join the access group
+    text = str(compile_module(write_sdr(ACCUMULATE), profile_generate=str(tmp_path / "p.sdrprof")))
+    tagged = [line for line in text.splitlines() if "!llvm.access.group" in line]
+    assert len(tagged) == 4
+    assert all(re.search(r"(load|store) i64", line) for line in tagged)
+
+def test_noalias_loop_with_accumulators_at_O3(run_sdr):
+    n = 10007; p = 1
+    for i in range(n): p = (p * 3 + i) & ((1 << 64) - 1)
+    p = p - (1 << 64) if p >> 63 else p
+    for opt in ("-O0", "-O3"):
+        r = run_sdr(ACCUMULATE, opt)
+        assert r.returncode == 0, r.stderr
+        assert r.stdout == f"{n * (n - 1) // 2} {p} {2 * (n - 1)}\n"
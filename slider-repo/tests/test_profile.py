@@ -0,0 +1,60 @@
+import re
+from sdrc.profile import Layout, Profile
+from sdrc.driver import analyze
+
+PROG = """\
+fn step(i: i64) -> i64:
+    if i - i / 10 * 10:
+        return 1
+    return 0
+
+fn main() -> i32:
+    var n = 0
+    for i in 0..1000:
+        n = n + step(i)
+    say(n)
+    return 0
+"""
+
+# step with one more branch site: the profile of the old shape no longer applies
+CHANGED = PROG.replace("    if i - i / 10 * 10:\n", "    if i - i / 7 * 7:\n        if i - i / 3 * 3:\n            return 2\n    if i - i / 10 * 10:\n")
+
+def _generate(sdrc, write_sdr, tmp_path):
+    prof = tmp_path / "t.sdrprof"
+    r = sdrc("run", write_sdr(PROG), "--profile-generate", str(prof))
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "900\n"
+    return prof
+
+def _use(sdrc, src, prof, tmp_path, *args):
+    out = tmp_path / "t.ll"
+    r = sdrc("build", src, "--profile-use", str(prof), "--no-cache", "--emit=ll", "-o", str(out), *args)
+    return r, out.read_text() if out.exists() else ""
+
+def test_generate_then_use(sdrc, write_sdr, tmp_path):
+    prof = _generate(sdrc, write_sdr, tmp_path)
+    layout = Layout(analyze(write_sdr(PROG)))
+    p = Profile.load(str(prof))
+    _first, _k, shape = layout.funcs["step"]
+    assert p.counts("step", shape) == [1000, 900, 100]   # entries, then/else of the if
+    r, ir = _use(sdrc, write_sdr(PROG), prof, tmp_path, "-O2")
+    assert r.returncode == 0, r.stderr
+    assert "stale" not in r.stderr
+    assert re.search(r'!"branch_weights", i32 \d+, i32 \d+', ir)
+    assert "function_entry_count" in ir and "ProfileSummary" in ir
+
+def test_changed_function_is_reported_and_built_without_profile(sdrc, write_sdr, tmp_path):
+    prof = _generate(sdrc, write_sdr, tmp_path)
+    r, ir = _use(sdrc, write_sdr(CHANGED), prof, tmp_path, "-O0")
+    assert r.returncode == 0, r.stderr
+    assert "profile is stale or missing for 1 function(s): step" in r.stderr
+    step = ir[ir.index('define i64 @"step"'):]
+    step = step[:step.index("\n}\n")]
+    assert "!prof" not in step                        # neither entry count nor branch weights
+    assert 'define i32 @"main"() !prof' in ir         # main did not change: still profiled
+
+
+def test_not_a_profile_is_an_error(sdrc, write_sdr, tmp_path):
+    bad = tmp_path / "bad.sdrprof"; bad.write_bytes(b"not a profile at all")
+    r, _ir = _use(sdrc, write_sdr(PROG), bad, tmp_path)
+    assert r.returncode == 1 and "not an sdrc profile" in r.stderr
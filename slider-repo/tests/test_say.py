@@ -0,0 +1,105 @@
+import ctypes, os, shutil, subprocess, threading, time
+import pytest
+from sdrc import jit
+from sdrc.driver import compile_module
+
+needs_cc = pytest.mark.skipif(shutil.which(os.environ.get("CC", "cc")) is None, reason="no C compiler to link with")
+
+ORDER = """\
+fn main() -> i32:
+    say("one")
+    printf("two %d\\n", 2)
+    say("three", 3)
+    printf("four\\n")
+    return 0
+"""
+
+def test_interleaves_with_printf_in_the_jit(run_sdr):
+    r = run_sdr(ORDER)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "one\ntwo 2\nthree 3\nfour\n"
+
+@needs_cc
+def test_interleaves_with_printf_in_an_executable(sdrc, write_sdr, tmp_path):
+    exe = str(tmp_path / "order")
+    r = sdrc("build", write_sdr(ORDER), "--emit=exe", "-o", exe)
+    assert r.returncode == 0, r.stderr
+    out = tmp_path / "out.txt"
+    with open(out, "w") as f:   # a file, so stdio buffers fully
+        assert subprocess.run([exe], stdout=f).returncode == 0
+    assert out.read_text() == "one\ntwo 2\nthree 3\nfour\n"
+
+def test_formats_values(run_sdr):
+    r = run_sdr("""\
+fn main() -> i32:
+    let n = 0 - 9223372036854775807 - 1
+    let x:f64 = 1.5
+    let big:i32 = 7
+    say("n", n, 10.b12, x / 4.0, 0.1, big, bool(2), x / 0.0)
+    return 0
+""")
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "n -9223372036854775808 12 0.375 0.1 7 1 inf\n"
+
+def test_lines_longer_than_the_buffer(run_sdr):
+    long = "x" * 10000
+    r = run_sdr(f'fn main() -> i32:\n    for i in 0..3:\n        say(i, "{long}", i)\n    return 0\n')
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == "".join(f"{i} {long} {i}\n" for i in range(3))
+
+def test_output_before_a_failure_is_kept(run_sdr):
+    r = run_sdr("""\
+fn main() -> i32:
+    let a = [1, 2]
+    say("before")
+    printf("c-before\\n")
+    var i = 5
+    say(a[i])
+    return 0
+""")
+    assert r.returncode != 0
+    assert r.stdout == "before\nc-before\n"
+    assert "index 5 out of bounds for length 2" in r.stderr
+
+HELLO = """\
+fn hello(n: i64):
+    say("thread", n)
+
+fn main() -> i32:
+    return 0
+"""
+
+def _jit_hello(write_sdr):
+    engine = jit.jit_compile(compile_module(write_sdr(HELLO)), 0)
+    hello = ctypes.CFUNCTYPE(None, ctypes.c_int64)(engine.get_function_address("hello"))
+    var = lambda name, cty: cty.from_address(engine.get_global_value_address(name))
+    return engine, hello, var("__sdr_out_keyed", ctypes.c_int32), var("__sdr_out_live", ctypes.c_int64)
+
+def _until(cond):
+    deadline = time.monotonic() + 10
+    while not cond() and time.monotonic() < deadline: time.sleep(0.01)
+    return cond()
+
+def test_threads_racing_to_the_first_say(write_sdr, capfd):
+    engine, hello, keyed, live = _jit_hello(write_sdr)
+    go = threading.Barrier(8)
+    def worker(i): go.wait(); hello(i)     # ctypes drops the GIL for the call
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    assert _until(lambda: live.value == 0)  # key destructors run as the threads exit
+    engine.run_static_destructors()
+    assert keyed.value == 0                 # no thread holds a buffer: the key is gone
+    assert sorted(capfd.readouterr().out.splitlines()) == [f"thread {i}" for i in range(8)]
+
+def test_exit_keeps_the_key_while_a_thread_owns_a_buffer(write_sdr, capfd):
+    engine, hello, keyed, live = _jit_hello(write_sdr)
+    said, done = threading.Event(), threading.Event()
+    def worker(): hello(1); said.set(); done.wait()
+    t = threading.Thread(target=worker); t.start()
+    said.wait()
+    engine.run_static_destructors()
+    assert keyed.value == 2 and live.value == 1
+    done.set(); t.join()
+    assert _until(lambda: live.value == 0)
+    assert capfd.readouterr().out == "thread 1\n"
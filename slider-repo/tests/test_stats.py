@@ -0,0 +1,19 @@
+from sdrc import driver
+from sdrc.stats import Stats, format_table
+
+def test_phases_report_python_heap_and_rss(write_sdr, tmp_path):
+    st = Stats()
+    driver.build(write_sdr("fn main() -> i32:\n    say(1)\n    return 0\n"), str(tmp_path / "t.o"), emit_kind="obj", stats=st)
+    data = st.as_dict()
+    phases = {p["name"]: p for p in data["phases"]}
+    assert {"parse", "typecheck", "irgen", "optimize", "emit"} <= set(phases)
+    for p in phases.values():
+        assert p["seconds"] >= 0 and p["peak_bytes"] > 0 and p["rss_growth_bytes"] >= 0
+    header = format_table("t.sdr", data).splitlines()[1]
+    assert "py heap peak" in header and "rss growth" in header
+
+def test_max_rss_is_in_kib():
+    from sdrc.stats import _max_rss
+    before = _max_rss(); kib = Stats().as_dict()["max_rss_kb"]; after = _max_rss()
+    assert before // 1024 <= kib <= after // 1024   # peak RSS only grows
+    assert 1024 < kib < 1 << 30     # a Python process: more than 1 MiB, less than 1 TiB
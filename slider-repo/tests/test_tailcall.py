@@ -0,0 +1,27 @@
+import os, shutil, subprocess
+import pytest
+
+# 1 MiB of stack: 10M frames of even the smallest function need hundreds of MiB
+SMALL_STACK = "ulimit -s 1024"
+EXPECTED = "count: 50000005000000\nping: 1\n"
+
+def test_tailrec_example_runs_in_constant_stack(sdrc):
+    r = sdrc("run", "examples/tailrec.sdr", "-O0", shell_prefix=SMALL_STACK)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == EXPECTED
+
+@pytest.mark.skipif(shutil.which(os.environ.get("CC", "cc")) is None, reason="no C compiler to link with")
+def test_tailrec_example_executable_runs_in_constant_stack(sdrc, tmp_path):
+    exe = str(tmp_path / "tailrec")
+    r = sdrc("build", "examples/tailrec.sdr", "-O0", "--emit=exe", "-o", exe)
+    assert r.returncode == 0, r.stderr
+    r = subprocess.run(["sh", "-c", f'{SMALL_STACK}; exec "$0"', exe], capture_output=True, text=True, timeout=60)
+    assert r.returncode == 0, r.stderr
+    assert r.stdout == EXPECTED
+
+def test_recursion_not_in_tail_position_overflows_that_stack(sdrc, write_sdr):
+    # the control: without the tail call the same depth cannot fit
+    src = write_sdr("fn count(n) -> i64:\n    if n:\n        return 1 + count(n - 1)\n    return 0\n"
+                    "fn main() -> i32:\n    printf(\"count: %lld\\n\", count(10000000))\n    return 0\n")
+    r = sdrc("run", src, "-O0", shell_prefix=SMALL_STACK)
+    assert r.returncode != 0 and "count:" not in r.stdout
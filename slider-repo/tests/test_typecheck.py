@@ -0,0 +1,73 @@
+import re
+import pytest
+from sdrc.driver import analyze, compile_module
+from sdrc.typesys import F64, I64
+
+def ir(write_sdr, src):
+    return str(compile_module(write_sdr(src)))
+
+def test_lowers_through_the_checked_types(write_sdr):
+    text = ir(write_sdr, """\
+fn half(x:f64) -> f64:
+    return x / 2
+fn narrow(n:i32) -> i32:
+    return n * 3
+fn main() -> i32:
+    let h = half(f64(narrow(7)))
+    if h:
+        return 1
+    return 0
+""")
+    assert 'define double @"half"(double' in text and "fdiv double" in text
+    assert 'define i32 @"narrow"(i32' in text and "mul i32" in text
+    assert "sitofp i32" in text and "fcmp une double" in text
+
+@pytest.mark.parametrize("src, msg", [
+    ("fn main():\n    let x:f64 = 1.5\n    let y = x + 1.0\n    let z:i64 = y\n", "z: expected i64, got f64"),
+    ("fn main():\n    let x = 1\n    let x:f64 = 2.0\n", "cannot rebind x:i64 as f64"),
+    ("fn f(a, b) -> i64:\n    return a\nfn main():\n    let y = f(1)\n", "f() takes 2 argument(s), got 1"),
+    ("fn main():\n    let x:i32 = 1\n    let y = x + i64(x)\n", "right operand of +: expected i32, got i64"),
+])
+def test_rejects(write_sdr, src, msg):
+    with pytest.raises(TypeError, match=re.escape(msg)):
+        analyze(write_sdr(src))
+
+def test_types_each_operand_once(write_sdr):
+    # typing an operand again for each enclosing BinOp is exponential in this depth
+    chain = " + ".join(["x"] * 100)
+    mod = analyze(write_sdr(f"fn main():\n    let x:f64 = 1\n    let y = {chain}\n"))
+    assert mod.funcs[0].body[1].expr.ty == F64
+
+def test_literals_take_their_context(write_sdr):
+    x, y = analyze(write_sdr("fn main():\n    let x:f64 = 1\n    let y = 2\n")).funcs[0].body
+    assert (x.type_name, x.expr.ty, y.expr.ty) == ("f64", F64, I64)
+
+MK = """\
+fn mk() -> [i64]:
+{body}
+fn clobber(n) -> i64:
+    let b = [9, 9, 9, 9, 9, 9, 9, 9]
+    return b[n] + n
+fn main() -> i32:
+    let x = mk()
+    let y = clobber(1)
+    say(x[0], x[1], x[2], x[3])
+    return 0
+"""
+
+@pytest.mark.parametrize("body", [
+    "    let a = [1, 2, 3, 4]\n    return a",
+    "    return [1, 2, 3, 4]",
+    "    var a = [i64](4)\n    let b = a\n    a = [1, 2, 3, 4]\n    return b",
+    "    return [0; 4]",
+])
+def test_rejects_returning_a_frame_array(write_sdr, body):
+    with pytest.raises(TypeError, match="cannot return a fixed-size array"):
+        analyze(write_sdr(MK.format(body=body)))
+
+def test_returned_heap_array_survives_another_call(run_sdr):
+    body = "    let a = [i64](4)\n    for i in 0..4:\n        a[i] = i + 1\n    return a"
+    for opt in ("-O0", "-O2"):
+        r = run_sdr(MK.format(body=body), opt)
+        assert r.returncode == 0, r.stderr
+        assert r.stdout == "1 2 3 4\n"